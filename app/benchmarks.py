@@ -0,0 +1,371 @@
+"""
+Benchmarks for the campaign hot paths.
+
+These run against whatever database and cache the project is configured
+with and write real rows, so point them at a disposable environment. SQLite
+serialises all writers, so contention numbers are only meaningful on
+Postgres.
+"""
+
+import math
+import random
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+
+from app.models import Campaign
+from app.services import budget_shards
+from app.services.cache_service import (
+    get_cached_active_campaigns,
+    invalidate_campaign_cache,
+)
+from app.services.campaign_service import CampaignService
+
+User = get_user_model()
+
+BENCH_USERS = 50
+
+
+def run_redeem_contention(
+    strategy: str,
+    threads: int,
+    redemptions: int,
+    shards: int = 8,
+) -> dict:
+    """
+    Hammer one campaign with `redemptions` redeems from `threads` threads.
+
+    The campaign has budget for every attempt, so the numbers measure lock
+    contention rather than rejections.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    users = User.objects.bulk_create(
+        User(username=f"bench_{run_id}_{i}") for i in range(BENCH_USERS)
+    )
+    now = timezone.now()
+    campaign = Campaign.objects.create(
+        name=f"Benchmark {run_id}",
+        discount_type=Campaign.TYPE_FIXED,
+        discount_value=Decimal("1.00"),
+        # Headroom so shard fragmentation never turns into rejections.
+        total_budget=Decimal(redemptions * 2),
+        max_transactions_per_user_day=redemptions,
+        start_date=now - timezone.timedelta(hours=1),
+        end_date=now + timezone.timedelta(hours=1),
+    )
+    if strategy == "sharded":
+        budget_shards.provision(campaign.pk, shards)
+
+    succeeded = []
+    failed = []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(t: int) -> None:
+        ok = errors = 0
+        try:
+            barrier.wait()
+            for i in range(t, redemptions, threads):
+                try:
+                    CampaignService.redeem_campaign(
+                        campaign_id=campaign.pk,
+                        user=users[i % len(users)],
+                        order_id=f"bench-{run_id}-{i}",
+                        cart_total=Decimal("10.00"),
+                        delivery_fee=Decimal("0.00"),
+                    )
+                    ok += 1
+                except Exception:  # noqa: BLE001
+                    # Rejections, but also e.g. SQLite's "database table is
+                    # locked": count them instead of losing the thread.
+                    errors += 1
+        finally:
+            succeeded.append(ok)
+            failed.append(errors)
+            connection.close()
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    with override_settings(CAMPAIGN_REDEEM_STRATEGY=strategy):
+        for w in workers:
+            w.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started
+
+    campaign.delete()
+    User.objects.filter(pk__in=[u.pk for u in users]).delete()
+
+    return {
+        "strategy": strategy,
+        "threads": threads,
+        "redemptions": redemptions,
+        "succeeded": sum(succeeded),
+        "failed": sum(failed),
+        "seconds": round(elapsed, 4),
+        "per_second": round(sum(succeeded) / elapsed, 1) if elapsed else None,
+    }
+
+
+# ---------------- AVAILABLE / REDEEM ---------------- #
+
+BENCH_TARGETS = ("available", "redeem", "api_available", "api_redeem")
+
+
+def seed_benchmark_data(
+    run_id: str,
+    users: int,
+    campaigns: int,
+    targeting_ratio: float,
+    rng: random.Random,
+) -> tuple:
+    """
+    Create `users` users and `campaigns` live campaigns for one run.
+
+    A `targeting_ratio` share of the campaigns is targeted at a random tenth
+    of the users. Budgets and daily limits are generous so that redeems
+    measure the write path rather than rejections.
+    """
+    created_users = User.objects.bulk_create(
+        (User(username=f"bench_{run_id}_{i}") for i in range(users)),
+        batch_size=1000,
+    )
+    now = timezone.now()
+    created_campaigns = Campaign.objects.bulk_create(
+        (
+            Campaign(
+                name=f"Benchmark {run_id} #{i}",
+                scope=rng.choice([Campaign.SCOPE_CART, Campaign.SCOPE_DELIVERY]),
+                discount_type=rng.choice(
+                    [Campaign.TYPE_FIXED, Campaign.TYPE_PERCENTAGE],
+                ),
+                discount_value=Decimal(rng.randint(1, 20)),
+                max_discount_cap=Decimal("25.00"),
+                total_budget=Decimal("1000000.00"),
+                max_transactions_per_user_day=1_000_000,
+                start_date=now - timezone.timedelta(hours=1),
+                end_date=now + timezone.timedelta(days=1),
+            )
+            for i in range(campaigns)
+        ),
+        batch_size=1000,
+    )
+
+    targeted = rng.sample(created_campaigns, round(campaigns * targeting_ratio))
+    audience = max(1, users // 10)
+    Campaign.target_users.through.objects.bulk_create(
+        (
+            Campaign.target_users.through(campaign_id=c.pk, user_id=u.pk)
+            for c in targeted
+            for u in rng.sample(created_users, audience)
+        ),
+        batch_size=1000,
+    )
+    # bulk_create sends no signals.
+    invalidate_campaign_cache()
+
+    untargeted = [c for c in created_campaigns if c not in targeted]
+    return created_users, created_campaigns, untargeted
+
+
+class _RequestCounters:
+    """Counts DB queries and shared-cache reads/hits made by one thread."""
+
+    def __init__(self) -> None:
+        self.queries = self.cache_reads = self.cache_hits = 0
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: ANN001, ANN204
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def instrument_cache(self):  # noqa: ANN201
+        """Wrap this thread's cache client; returns an undo callable."""
+        backend = caches["default"]
+        get, get_many = backend.get, backend.get_many
+        missing = object()
+
+        def counted_get(key, default=None, **kwargs):  # noqa: ANN001, ANN003, ANN202
+            value = get(key, missing, **kwargs)
+            self.cache_reads += 1
+            if value is missing:
+                return default
+            self.cache_hits += 1
+            return value
+
+        def counted_get_many(keys, **kwargs):  # noqa: ANN001, ANN003, ANN202
+            keys = list(keys)
+            found = get_many(keys, **kwargs)
+            self.cache_reads += len(keys)
+            self.cache_hits += len(found)
+            return found
+
+        backend.get, backend.get_many = counted_get, counted_get_many
+        return lambda: (vars(backend).pop("get"), vars(backend).pop("get_many"))
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def run_endpoint_benchmark(  # noqa: PLR0913
+    target: str,
+    threads: int,
+    requests: int,
+    users: int = 200,
+    campaigns: int = 50,
+    targeting_ratio: float = 0.2,
+    seed: int = 0,
+) -> dict:
+    """
+    Drive `target` with `requests` calls spread over `threads` threads.
+
+    ``available`` and ``redeem`` call `CampaignService` directly;
+    ``api_available`` and ``api_redeem`` go through the full DRF stack with
+    an in-process test client. Rate throttling is switched off for the run
+    so it doesn't cut the load short. Seeded data is deleted afterwards.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    run_id = uuid.uuid4().hex[:8]
+    bench_users, bench_campaigns, untargeted = seed_benchmark_data(
+        run_id,
+        users,
+        campaigns,
+        targeting_ratio,
+        rng,
+    )
+    redeemable = untargeted or bench_campaigns
+    # (user, campaign, cart_total, delivery_fee) per request, fixed by `seed`.
+    plan = [
+        (
+            rng.choice(bench_users),
+            rng.choice(redeemable),
+            Decimal(rng.randint(1000, 20000)) / 100,
+            Decimal(rng.randint(0, 1000)) / 100,
+        )
+        for _ in range(requests)
+    ]
+
+    samples = [[] for _ in range(threads)]
+    counters = [_RequestCounters() for _ in range(threads)]
+    failures = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def call(client, i: int) -> bool:  # noqa: ANN001
+        user, campaign, cart_total, delivery_fee = plan[i]
+        order_id = f"bench-{run_id}-{i}"
+        if target == "available":
+            CampaignService.get_available_discounts(user, cart_total, delivery_fee)
+            return True
+        if target == "redeem":
+            try:
+                CampaignService.redeem_campaign(
+                    campaign_id=campaign.pk,
+                    user=user,
+                    order_id=order_id,
+                    cart_total=cart_total,
+                    delivery_fee=delivery_fee,
+                )
+            except ValidationError:
+                return False
+            return True
+
+        client.force_authenticate(user)
+        if target == "api_available":
+            response = client.get(
+                "/api/campaigns/available/",
+                {"cart_total": cart_total, "delivery_fee": delivery_fee},
+            )
+        else:
+            response = client.post(
+                "/api/campaigns/redeem/",
+                {
+                    "campaign_id": campaign.pk,
+                    "order_id": order_id,
+                    "cart_total": cart_total,
+                    "delivery_fee": delivery_fee,
+                },
+                format="json",
+            )
+        return response.status_code == 200  # noqa: PLR2004
+
+    def worker(t: int) -> None:
+        client = APIClient()
+        counter = counters[t]
+        undo = counter.instrument_cache()
+        try:
+            with connection.execute_wrapper(counter):
+                barrier.wait()
+                for i in range(t, requests, threads):
+                    started = time.perf_counter()
+                    try:
+                        succeeded = call(client, i)
+                    except Exception:  # noqa: BLE001
+                        # e.g. SQLite's "database table is locked": a failed
+                        # request, not a reason to lose the thread.
+                        succeeded = False
+                    if not succeeded:
+                        failures[t] += 1
+                    samples[t].append(time.perf_counter() - started)
+        finally:
+            undo()
+            connection.close()
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    with (
+        override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]),
+        mock.patch.object(UserRateThrottle, "get_rate", lambda _self: None),
+    ):
+        # Build the snapshot up front; it is shared by every thread.
+        get_cached_active_campaigns()
+        for w in workers:
+            w.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started
+
+    Campaign.objects.filter(pk__in=[c.pk for c in bench_campaigns]).delete()
+    User.objects.filter(pk__in=[u.pk for u in bench_users]).delete()
+    invalidate_campaign_cache()
+
+    latencies = sorted(sample for thread in samples for sample in thread)
+    done = len(latencies)
+    return {
+        "target": target,
+        "threads": threads,
+        "requests": requests,
+        "succeeded": done - sum(failures),
+        "failed": sum(failures),
+        "seconds": round(elapsed, 4),
+        "per_second": round(done / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            name: round(_percentile(latencies, pct) * 1000, 3)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "queries_per_request": _per_request(counters, "queries", done),
+        "cache_reads_per_request": _per_request(counters, "cache_reads", done),
+        "cache_hits_per_request": _per_request(counters, "cache_hits", done),
+    }
+
+
+def _per_request(counters: list, name: str, done: int):  # noqa: ANN202
+    if not done:
+        return None
+    return round(sum(getattr(c, name) for c in counters) / done, 2)
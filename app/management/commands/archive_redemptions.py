@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import redemption_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll redemptions older than --keep-months into per-campaign daily "
+        "summaries, then drop (or detach) their monthly partitions."
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            default=12,
+            help="Full months of raw redemptions to keep, besides the current "
+            "one (default: 12).",
+        )
+        parser.add_argument(
+            "--detach-only",
+            action="store_true",
+            help="Detach archived partitions instead of dropping them.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the months that would be archived.",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["keep_months"] < 0:
+            msg = "--keep-months cannot be negative."
+            raise CommandError(msg)
+
+        months = redemption_partitions.archivable_months(options["keep_months"])
+        for month in months:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {month:%Y-%m}")
+                continue
+            summaries = redemption_partitions.archive_month(
+                month,
+                drop=not options["detach_only"],
+            )
+            self.stdout.write(f"Archived {month:%Y-%m}: {summaries} summary row(s)")
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(months)} month(s)."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import daily_usage
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-user daily usage counters from recorded redemptions. "
+        "Run once after migrating; redemptions keep the counters up to date "
+        "from then on."
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=daily_usage.KEEP_DAYS,
+            help=f"Days to rebuild, today included (default: {daily_usage.KEEP_DAYS}).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per INSERT (default: 5000).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["days"] < 1:
+            msg = "--days must be at least 1."
+            raise CommandError(msg)
+
+        rows = daily_usage.backfill(options["days"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {rows} daily usage row(s)."))
@@ -0,0 +1,101 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from app.benchmarks import BENCH_TARGETS, run_endpoint_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark available/redeem through CampaignService and the API at "
+        "several concurrency levels, reporting latency percentiles, "
+        "throughput, and DB queries and cache hits per request"
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--targets",
+            nargs="+",
+            default=list(BENCH_TARGETS),
+            choices=BENCH_TARGETS,
+        )
+        parser.add_argument("--threads", nargs="+", type=int, default=[1, 8])
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests per run (default: 500).",
+        )
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--campaigns", type=int, default=50)
+        parser.add_argument(
+            "--targeting-ratio",
+            type=float,
+            default=0.2,
+            help="Share of campaigns targeted at a subset of users (default: 0.2).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", dest="json_path", help="Also write results here.")
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["requests"] < 1 or options["users"] < 1 or options["campaigns"] < 1:
+            msg = "--requests, --users and --campaigns must be at least 1."
+            raise CommandError(msg)
+        if not 0 <= options["targeting_ratio"] <= 1:
+            msg = "--targeting-ratio must be between 0 and 1."
+            raise CommandError(msg)
+
+        results = []
+        self.stdout.write(
+            f"{'target':<16}{'threads':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'queries':>9}{'cache':>7}{'hits':>7}{'failed':>8}",
+        )
+        for target in options["targets"]:
+            for threads in options["threads"]:
+                result = run_endpoint_benchmark(
+                    target,
+                    threads,
+                    options["requests"],
+                    users=options["users"],
+                    campaigns=options["campaigns"],
+                    targeting_ratio=options["targeting_ratio"],
+                    seed=options["seed"],
+                )
+                results.append(result)
+                latency = result["latency_ms"]
+                self.stdout.write(
+                    # Rates are None when nothing completed; !s prints that.
+                    f"{target:<16}{threads:>8}{result['per_second']!s:>10}"
+                    f"{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}"
+                    f"{result['queries_per_request']!s:>9}"
+                    f"{result['cache_reads_per_request']!s:>7}"
+                    f"{result['cache_hits_per_request']!s:>7}{result['failed']:>8}",
+                )
+
+        if options["json_path"]:
+            report = {
+                "started_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "cache": settings.CACHES["default"]["BACKEND"],
+                "redeem_strategy": getattr(
+                    settings,
+                    "CAMPAIGN_REDEEM_STRATEGY",
+                    "row_lock",
+                ),
+                "options": {
+                    key: options[key]
+                    for key in (
+                        "requests",
+                        "users",
+                        "campaigns",
+                        "targeting_ratio",
+                        "seed",
+                    )
+                },
+                "results": results,
+            }
+            with open(options["json_path"], "w") as fh:  # noqa: PTH123
+                json.dump(report, fh, indent=2)
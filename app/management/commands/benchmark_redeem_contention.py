@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from app.benchmarks import run_redeem_contention
+from app.services.campaign_service import CampaignService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare redemption throughput of the redeem strategies on one hot "
+        "campaign at several concurrency levels"
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--strategies",
+            nargs="+",
+            default=["row_lock", "sharded", "coalesced"],
+            choices=sorted(CampaignService.REDEEM_STRATEGIES),
+        )
+        parser.add_argument("--threads", nargs="+", type=int, default=[1, 8, 32])
+        parser.add_argument(
+            "--redemptions",
+            type=int,
+            default=500,
+            help="Redemptions per run (default: 500).",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=8,
+            help="Budget shards for the 'sharded' strategy (default: 8).",
+        )
+        parser.add_argument("--json", dest="json_path", help="Also write results here.")
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        results = []
+        self.stdout.write(
+            f"{'strategy':<20}{'threads':>8}{'ok':>8}{'failed':>8}{'sec':>10}{'redeem/s':>12}",
+        )
+        for strategy in options["strategies"]:
+            for threads in options["threads"]:
+                result = run_redeem_contention(
+                    strategy,
+                    threads,
+                    options["redemptions"],
+                    shards=options["shards"],
+                )
+                results.append(result)
+                self.stdout.write(
+                    f"{strategy:<20}{threads:>8}{result['succeeded']:>8}"
+                    f"{result['failed']:>8}{result['seconds']:>10}"
+                    f"{result['per_second']:>12}",
+                )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:  # noqa: PTH123
+                json.dump(results, fh, indent=2)
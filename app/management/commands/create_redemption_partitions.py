@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import redemption_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly redemption partitions ahead of time. Schedule it "
+        "at least monthly; redemptions for months without a partition land "
+        "in the default partition."
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Months after the current one to cover (default: 3).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["months_ahead"] < 0:
+            msg = "--months-ahead cannot be negative."
+            raise CommandError(msg)
+        if not redemption_partitions.is_partitioned():
+            self.stdout.write("Redemptions are not partitioned, nothing to do.")
+            return
+
+        created = redemption_partitions.create_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {len(created)} partition(s)."),
+        )
@@ -1,30 +1,119 @@
+import random
+from array import array
 from decimal import Decimal
+from itertools import islice
 
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from app.models import Campaign, Redemption
+from app.services import daily_usage
+from app.services.cache_service import invalidate_campaign_cache
 
 User = get_user_model()
 
+SYNTHETIC_USER_PREFIX = "synthetic_user_"
+SYNTHETIC_CAMPAIGN_PREFIX = "Synthetic campaign "
+SYNTHETIC_ORDER_PREFIX = "SYN-"
+# Each targeted campaign is restricted to this share of the users.
+TARGET_AUDIENCE_SHARE = 0.01
+# Synthetic redemptions are spread over this many past days.
+HISTORY_DAYS = 30
+
+
+def batched(iterable, size: int):  # noqa: ANN001, ANN201
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 class Command(BaseCommand):
     help = "Load sample data for campaigns, users, and redemptions"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=0,
+            help="Synthetic users to generate on top of the sample data.",
+        )
+        parser.add_argument(
+            "--campaigns",
+            type=int,
+            default=0,
+            help="Synthetic campaigns to generate.",
+        )
+        parser.add_argument(
+            "--redemptions",
+            type=int,
+            default=0,
+            help="Synthetic redemptions to generate.",
+        )
+        parser.add_argument(
+            "--targeting-ratio",
+            type=float,
+            default=0.2,
+            help="Share of synthetic campaigns with a target audience (default: 0.2).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per INSERT (default: 5000).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if min(options["users"], options["campaigns"], options["redemptions"]) < 0:
+            msg = "--users, --campaigns and --redemptions cannot be negative."
+            raise CommandError(msg)
+        if not 0 <= options["targeting_ratio"] <= 1:
+            msg = "--targeting-ratio must be between 0 and 1."
+            raise CommandError(msg)
+        if options["batch_size"] < 1:
+            msg = "--batch-size must be at least 1."
+            raise CommandError(msg)
+        if options["redemptions"] and not (options["users"] and options["campaigns"]):
+            msg = "--redemptions needs --users and --campaigns."
+            raise CommandError(msg)
+
+        # The last sample row created; if it is there, so is the rest.
+        if Redemption.objects.filter(order_id="ORD004").exists():
+            self.stdout.write("Sample data already loaded, skipping.")
+        else:
+            self.load_sample_data()
+
+        if options["users"] or options["campaigns"] or options["redemptions"]:
+            self.load_synthetic_data(
+                users=options["users"],
+                campaigns=options["campaigns"],
+                redemptions=options["redemptions"],
+                targeting_ratio=options["targeting_ratio"],
+                rng=random.Random(options["seed"]),  # noqa: S311
+                batch_size=options["batch_size"],
+            )
+
+    def load_sample_data(self) -> None:
         now = timezone.now()
 
         # ---------------- USERS ----------------
         self.stdout.write("Creating sample users...")
         user1, _ = User.objects.get_or_create(
-            username="user1", defaults={"password": "pass123"}
+            username="user1",
+            defaults={"password": "pass123"},
         )
         user2, _ = User.objects.get_or_create(
-            username="user2", defaults={"password": "pass123"}
+            username="user2",
+            defaults={"password": "pass123"},
         )
         user3, _ = User.objects.get_or_create(
-            username="user3", defaults={"password": "pass123"}
+            username="user3",
+            defaults={"password": "pass123"},
         )
 
         # ---------------- CAMPAIGNS ----------------
@@ -118,4 +207,222 @@ class Command(BaseCommand):
             defaults={"applied_discount": Decimal("100.00")},
         )
 
+        # Redemptions were inserted directly; count them against the limits.
+        daily_usage.backfill()
+
         self.stdout.write(self.style.SUCCESS("Sample data loaded successfully!"))
+
+    # ---------------- SYNTHETIC DATA ----------------
+
+    def load_synthetic_data(  # noqa: PLR0913
+        self,
+        users: int,
+        campaigns: int,
+        redemptions: int,
+        targeting_ratio: float,
+        rng: random.Random,
+        batch_size: int,
+    ) -> None:
+        """
+        Top the synthetic users, campaigns and redemptions up to the targets.
+
+        Rows are numbered, so a second run with the same targets only counts
+        what exists and returns. Everything is generated lazily and inserted
+        with `bulk_create` in batches; only primary keys are kept in memory,
+        as compact arrays.
+        """
+        existing_users = User.objects.filter(
+            username__startswith=SYNTHETIC_USER_PREFIX,
+        ).count()
+        existing_campaigns = Campaign.objects.filter(
+            name__startswith=SYNTHETIC_CAMPAIGN_PREFIX,
+        ).count()
+        existing_redemptions = Redemption.objects.filter(
+            order_id__startswith=SYNTHETIC_ORDER_PREFIX,
+        ).count()
+        if (
+            existing_users >= users
+            and existing_campaigns >= campaigns
+            and existing_redemptions >= redemptions
+        ):
+            self.stdout.write("Synthetic data already loaded, skipping.")
+            return
+
+        self.create_users(range(existing_users, users), batch_size)
+        user_ids = array(
+            "q",
+            User.objects.filter(username__startswith=SYNTHETIC_USER_PREFIX)
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=batch_size),
+        )
+
+        new_campaign_ids = self.create_campaigns(
+            range(existing_campaigns, campaigns),
+            rng,
+            batch_size,
+        )
+        self.create_targeting(
+            new_campaign_ids,
+            user_ids,
+            targeting_ratio,
+            rng,
+            batch_size,
+        )
+        campaign_ids = array(
+            "q",
+            Campaign.objects.filter(name__startswith=SYNTHETIC_CAMPAIGN_PREFIX)
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=batch_size),
+        )
+
+        self.create_redemptions(
+            range(existing_redemptions, redemptions),
+            user_ids,
+            campaign_ids,
+            rng,
+            batch_size,
+        )
+        self.settle_spend()
+        daily_usage.backfill(batch_size=batch_size)
+
+        # bulk_create and queryset updates send no signals.
+        invalidate_campaign_cache()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Synthetic data loaded: {len(user_ids)} users, "
+                f"{len(campaign_ids)} campaigns, "
+                f"{max(redemptions, existing_redemptions)} redemptions.",
+            ),
+        )
+
+    def create_users(self, numbers: range, batch_size: int) -> None:
+        if not numbers:
+            return
+        self.stdout.write(f"Creating {len(numbers)} synthetic users...")
+        # Hashing is slow by design; every synthetic user shares one hash.
+        password = make_password("pass123")
+        for batch in batched(
+            (
+                User(username=f"{SYNTHETIC_USER_PREFIX}{i}", password=password)
+                for i in numbers
+            ),
+            batch_size,
+        ):
+            User.objects.bulk_create(batch)
+
+    def create_campaigns(
+        self,
+        numbers: range,
+        rng: random.Random,
+        batch_size: int,
+    ) -> list:
+        if not numbers:
+            return []
+        self.stdout.write(f"Creating {len(numbers)} synthetic campaigns...")
+        now = timezone.now()
+
+        def generate():  # noqa: ANN202
+            for i in numbers:
+                percentage = rng.random() < 0.5  # noqa: PLR2004
+                # Mostly running campaigns, with some finished and upcoming ones.
+                start = now + timezone.timedelta(days=rng.randint(-60, 10))
+                yield Campaign(
+                    name=f"{SYNTHETIC_CAMPAIGN_PREFIX}{i}",
+                    sponsor_type=rng.choice(
+                        [Campaign.SPONSOR_PLATFORM, Campaign.SPONSOR_VENDOR],
+                    ),
+                    vendor_id=rng.randint(1, 1000),
+                    scope=rng.choice([Campaign.SCOPE_CART, Campaign.SCOPE_DELIVERY]),
+                    discount_type=(
+                        Campaign.TYPE_PERCENTAGE if percentage else Campaign.TYPE_FIXED
+                    ),
+                    discount_value=Decimal(rng.randint(5, 30)),
+                    max_discount_cap=Decimal(rng.randint(10, 100))
+                    if percentage
+                    else None,
+                    start_date=start,
+                    end_date=start + timezone.timedelta(days=rng.randint(7, 90)),
+                    total_budget=Decimal(rng.randint(1_000, 1_000_000)),
+                    max_transactions_per_user_day=rng.randint(1, 3),
+                    is_active=rng.random() < 0.9,  # noqa: PLR2004
+                )
+
+        created = []
+        for batch in batched(generate(), batch_size):
+            created.extend(c.pk for c in Campaign.objects.bulk_create(batch))
+        return created
+
+    def create_targeting(  # noqa: PLR0913
+        self,
+        campaign_ids: list,
+        user_ids: array,
+        targeting_ratio: float,
+        rng: random.Random,
+        batch_size: int,
+    ) -> None:
+        targeted = [pk for pk in campaign_ids if rng.random() < targeting_ratio]
+        if not targeted or not user_ids:
+            return
+        audience = max(1, round(len(user_ids) * TARGET_AUDIENCE_SHARE))
+        self.stdout.write(
+            f"Targeting {len(targeted)} campaigns at {audience} users each...",
+        )
+        through = Campaign.target_users.through
+        for batch in batched(
+            (
+                through(campaign_id=campaign_id, user_id=user_ids[i])
+                for campaign_id in targeted
+                for i in rng.sample(range(len(user_ids)), audience)
+            ),
+            batch_size,
+        ):
+            through.objects.bulk_create(batch)
+
+    def create_redemptions(  # noqa: PLR0913
+        self,
+        numbers: range,
+        user_ids: array,
+        campaign_ids: array,
+        rng: random.Random,
+        batch_size: int,
+    ) -> None:
+        if not numbers:
+            return
+        self.stdout.write(f"Creating {len(numbers)} synthetic redemptions...")
+        today = timezone.now()
+
+        for batch in batched(
+            (
+                Redemption(
+                    campaign_id=rng.choice(campaign_ids),
+                    user_id=rng.choice(user_ids),
+                    order_id=f"{SYNTHETIC_ORDER_PREFIX}{i}",
+                    applied_discount=Decimal(rng.randint(100, 5000)) / 100,
+                )
+                for i in numbers
+            ),
+            batch_size,
+        ):
+            with transaction.atomic():
+                created = Redemption.objects.bulk_create(batch)
+                # redeemed_at is auto_now_add, so history is written afterwards,
+                # one day per batch.
+                Redemption.objects.filter(pk__in=[r.pk for r in created]).update(
+                    redeemed_at=today
+                    - timezone.timedelta(days=rng.randrange(HISTORY_DAYS)),
+                )
+
+    def settle_spend(self) -> None:
+        """Derive synthetic campaigns' current_spend from their redemptions."""
+        redeemed = (
+            Redemption.objects.filter(campaign=OuterRef("pk"))
+            .values("campaign")
+            .annotate(total=Sum("applied_discount"))
+            .values("total")
+        )
+        synthetic = Campaign.objects.filter(name__startswith=SYNTHETIC_CAMPAIGN_PREFIX)
+        synthetic.update(current_spend=Coalesce(Subquery(redeemed), F("current_spend")))
+        # Campaigns that redeemed past their budget are simply exhausted.
+        synthetic.filter(current_spend__gt=F("total_budget")).update(
+            total_budget=F("current_spend"),
+        )
@@ -0,0 +1,63 @@
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge the profiles written by SamplingProfilerMiddleware into one "
+        "hot-function report per endpoint"
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--dir",
+            default=settings.CAMPAIGN_PROFILE_DIR,
+            help="Profile directory (default: CAMPAIGN_PROFILE_DIR).",
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            help="Only report these URL names (e.g. campaigns-available).",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "ncalls"],
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=25,
+            help="Functions listed per endpoint (default: 25).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        root = Path(options["dir"])
+        endpoints = sorted(p for p in root.glob("*") if p.is_dir())
+        if options["endpoint"]:
+            endpoints = [p for p in endpoints if p.name in options["endpoint"]]
+
+        reported = 0
+        for directory in endpoints:
+            profiles = sorted(directory.glob("*.prof"))
+            if not profiles:
+                continue
+            reported += 1
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{directory.name}: {len(profiles)} profiled requests",
+                ),
+            )
+            stats = pstats.Stats(str(profiles[0]), stream=self.stdout)
+            for profile in profiles[1:]:
+                stats.add(str(profile))
+            stats.strip_dirs().sort_stats(options["sort"]).print_stats(
+                options["limit"],
+            )
+
+        if not reported:
+            msg = f"No profiles found under {root}."
+            raise CommandError(msg)
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Campaign
+from app.services import budget_reservation
+
+
+class Command(BaseCommand):
+    help = (
+        "Realign Redis budget reservations with the spend recorded in Postgres. "
+        "Reservations still in flight while this runs are counted as unspent, "
+        "so prefer quiet periods; the guarded Postgres update prevents overspend "
+        "either way."
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--campaign",
+            type=int,
+            action="append",
+            dest="campaign_ids",
+            help="Only reconcile this campaign id (repeatable).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without changing Redis.",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        campaigns = Campaign.objects.filter(is_active=True)
+        if options["campaign_ids"]:
+            campaigns = campaigns.filter(pk__in=options["campaign_ids"])
+
+        drifted = 0
+        for campaign_id, total_budget, current_spend in campaigns.values_list(
+            "id",
+            "total_budget",
+            "current_spend",
+        ).iterator():
+            expected = total_budget - current_spend
+            actual = budget_reservation.get_remaining(campaign_id)
+
+            # Unseeded campaigns are seeded from Postgres on first use.
+            if actual is None or actual == expected:
+                continue
+
+            drifted += 1
+            self.stdout.write(
+                f"Campaign {campaign_id}: Redis {actual} != Postgres {expected} "
+                f"(drift {actual - expected})",
+            )
+            if not options["dry_run"]:
+                budget_reservation.set_remaining(campaign_id, expected)
+
+        verb = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {drifted} drifted campaign(s)."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app.services import budget_shards
+
+
+class Command(BaseCommand):
+    help = "Roll sharded campaign spend up into Campaign.current_spend"
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--campaign",
+            type=int,
+            action="append",
+            dest="campaign_ids",
+            help="Only roll up this campaign id (repeatable).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        updated = budget_shards.rollup(options["campaign_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {updated} campaign(s)."))
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import campaign_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold redemptions made since the last run into the hourly campaign "
+        "stats served by /campaigns/<id>/stats/. Schedule it every minute."
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Redemptions per transaction (default: 10000).",
+        )
+        parser.add_argument(
+            "--lag-seconds",
+            type=int,
+            default=int(campaign_stats.ROLLUP_LAG.total_seconds()),
+            help="Leave redemptions younger than this for the next run (default: 60).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["batch_size"] < 1:
+            msg = "--batch-size must be at least 1."
+            raise CommandError(msg)
+        if options["lag_seconds"] < 0:
+            msg = "--lag-seconds cannot be negative."
+            raise CommandError(msg)
+
+        rolled = campaign_stats.rollup(
+            options["batch_size"],
+            timedelta(seconds=options["lag_seconds"]),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {rolled} redemption(s)."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import budget_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Split a campaign's remaining budget across N shard rows for the "
+        "'sharded' redeem strategy"
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument("campaign_id", type=int)
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=8,
+            help="Number of budget shards (default: 8).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["shards"] < 1:
+            msg = "--shards must be at least 1."
+            raise CommandError(msg)
+
+        shards = budget_shards.provision(options["campaign_id"], options["shards"])
+        for shard in shards:
+            self.stdout.write(f"Shard {shard.index}: {shard.spend}/{shard.budget}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Campaign {options['campaign_id']} split into {len(shards)} shards.",
+            ),
+        )
@@ -0,0 +1,70 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services import campaign_simulation
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a JSON lines log of available/redeem events against the "
+        "campaigns in memory and project spend, budget exhaustion and "
+        "rejections"
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument("events", help="JSON lines event log, sorted by ts.")
+        parser.add_argument(
+            "--campaigns",
+            help=(
+                "JSON file with the campaigns to simulate. Defaults to a "
+                "one-off snapshot of the active campaigns in the database."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes to shard campaigns across (default: 1).",
+        )
+        parser.add_argument("--json", dest="json_path", help="Also write results here.")
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["workers"] < 1:
+            msg = "--workers must be at least 1."
+            raise CommandError(msg)
+
+        if options["campaigns"]:
+            campaigns = campaign_simulation.load_campaigns(options["campaigns"])
+        else:
+            campaigns = campaign_simulation.snapshot_campaigns()
+
+        started = time.perf_counter()
+        result = campaign_simulation.simulate(
+            options["events"],
+            campaigns,
+            workers=options["workers"],
+        )
+        elapsed = time.perf_counter() - started
+
+        events = sum(result["events"].values())
+        self.stdout.write(
+            f"{events} events in {elapsed:.1f}s "
+            f"({events / elapsed if elapsed else 0:.0f}/s)",
+        )
+        self.stdout.write(
+            f"{'campaign':>10}{'redeemed':>10}{'offered':>10}{'spend':>14}"
+            f"{'budget':>14}  exhausted at",
+        )
+        for pk, c in result["campaigns"].items():
+            self.stdout.write(
+                f"{pk:>10}{c['redemptions']:>10}{c['offered']:>10}"
+                f"{c['spend']:>14}{c['total_budget']:>14}  {c['exhausted_at'] or '-'}",
+            )
+        for reason, count in sorted(result["rejections"].items()):
+            self.stdout.write(f"rejected ({reason}): {count}")
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:  # noqa: PTH123
+                json.dump(result, fh, indent=2, default=str)
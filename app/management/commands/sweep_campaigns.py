@@ -0,0 +1,43 @@
+import contextlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.campaign_lifecycle import CampaignSweeper
+
+
+class Command(BaseCommand):
+    help = (
+        "Deactivate campaigns past their end date or out of budget. Schedule "
+        "it every minute, or run it with --loop as a long-lived process that "
+        "also wakes up at every campaign end."
+    )
+
+    def add_arguments(self, parser):  # noqa: ANN001, ANN201
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep sweeping until interrupted.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="With --loop, longest wait between sweeps in seconds (default: 60).",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002, ANN003, ANN201, ARG002
+        if options["interval"] <= 0:
+            msg = "--interval must be positive."
+            raise CommandError(msg)
+
+        sweeper = CampaignSweeper(interval=options["interval"])
+        with contextlib.suppress(KeyboardInterrupt):
+            sweeper.run(None if options["loop"] else 1, on_sweep=self._report)
+
+    def _report(self, result: dict) -> None:
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deactivated {len(result['expired'])} expired and "
+                f"{len(result['exhausted'])} exhausted campaign(s).",
+            ),
+        )
@@ -0,0 +1,172 @@
+"""
+In-process metrics for the campaign hot paths, rendered in Prometheus text.
+
+Metrics live in plain dicts guarded by one lock each, so recording is a
+few hundred nanoseconds and the module is cheap enough to leave on.
+Values are per process: with several gunicorn workers every scrape sees
+the worker that answered it, so scrape each worker or aggregate upstream.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Self
+
+# Seconds; tuned for sub-millisecond cache reads up to slow lock waits.
+TIME_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        lines.extend(
+            f"{self.name}{_labels(self.labelnames, labels)} {value}"
+            for labels, value in sorted(values.items())
+        )
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple,
+        buckets: tuple = TIME_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][i] += 1
+            series[1] += value
+
+    def collect(self) -> list:
+        with self._lock:
+            values = {labels: (list(c), s) for labels, (c, s) in self._values.items()}
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += count
+                bucket_labels = _labels(
+                    (*self.labelnames, "le"),
+                    (*labels, str(bound)),
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series_labels} {total}")
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "campaign_request_seconds",
+    "Time spent handling a request.",
+    ("endpoint", "method"),
+)
+REQUESTS = Counter(
+    "campaign_requests_total",
+    "Requests handled, by response status.",
+    ("endpoint", "method", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "campaign_request_db_queries",
+    "Database queries made while handling a request.",
+    ("endpoint",),
+    buckets=QUERY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "campaign_stage_seconds",
+    "Time spent in each stage of the available/redeem pipelines.",
+    ("stage",),
+)
+CACHE_LOOKUPS = Counter(
+    "campaign_cache_lookups_total",
+    "Campaign cache lookups by layer and result.",
+    ("cache", "result"),
+)
+
+REGISTRY = (REQUEST_SECONDS, REQUESTS, REQUEST_QUERIES, STAGE_SECONDS, CACHE_LOOKUPS)
+
+
+class span:  # noqa: N801
+    """Time a pipeline stage into `STAGE_SECONDS`: ``with span("pricing"):``."""
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self) -> Self:
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:  # noqa: ANN002
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.stage)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
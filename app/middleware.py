@@ -0,0 +1,150 @@
+import cProfile
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from app import metrics
+
+
+class _QueryCounter:
+    __slots__ = ("queries",)
+
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: ANN001, ANN204
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, status and DB query count of every request.
+
+    Requests are labelled by URL name (e.g. ``campaigns-available``), never
+    by raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self, get_response) -> None:  # noqa: ANN001
+        self.get_response = get_response
+
+    def __call__(self, request):  # noqa: ANN001, ANN204
+        counter = _QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        endpoint = match.view_name if match is not None else "unmatched"
+        metrics.REQUEST_SECONDS.observe(elapsed, endpoint, request.method)
+        metrics.REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        metrics.REQUEST_QUERIES.observe(counter.queries, endpoint)
+        return response
+
+
+PROFILE_HEADER = "HTTP_X_CAMPAIGN_PROFILE"
+# Request attribute holding the profiler of a request being profiled.
+PROFILER_ATTR = "_campaign_profiler"
+
+
+class SamplingProfilerMiddleware:
+    """
+    Profile a sample of requests to views marked ``profiled = True``.
+
+    One in ``CAMPAIGN_PROFILE_SAMPLE_RATE`` requests is profiled (0 turns
+    sampling off), plus any request from a staff user sending
+    ``X-Campaign-Profile: 1``; the header is ignored for anyone else.
+    Profiles are written under ``CAMPAIGN_PROFILE_DIR/<url name>/`` and the
+    oldest ones are deleted once the directory exceeds
+    ``CAMPAIGN_PROFILE_MAX_MB``. Read them with ``manage.py profile_report``.
+
+    The profiler is started in `process_view`, once the view is known, and
+    stopped when the response comes back, so Django still calls the view
+    itself: ATOMIC_REQUESTS, later middlewares and ``process_exception``
+    apply to profiled requests as to any other. Only one request per
+    process is profiled at a time; others run as usual.
+    """
+
+    _busy = threading.Lock()
+
+    def __init__(self, get_response) -> None:  # noqa: ANN001
+        self.get_response = get_response
+
+    def __call__(self, request):  # noqa: ANN001, ANN204
+        try:
+            return self.get_response(request)
+        finally:
+            profiler = getattr(request, PROFILER_ATTR, None)
+            if profiler is not None:
+                try:
+                    profiler.disable()
+                    self.save(profiler, request.resolver_match.url_name)
+                finally:
+                    self._busy.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> None:  # noqa: ANN001, ARG002
+        view_class = getattr(view_func, "cls", None)
+        if not getattr(view_class, "profiled", False):
+            return
+
+        rate = getattr(settings, "CAMPAIGN_PROFILE_SAMPLE_RATE", 0)
+        sampled = rate > 0 and random.randrange(rate) == 0  # noqa: S311
+        requested = (
+            not sampled
+            and request.META.get(PROFILE_HEADER) == "1"
+            and self.is_staff(request, view_class)
+        )
+        if (requested or sampled) and self._busy.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            setattr(request, PROFILER_ATTR, profiler)
+            profiler.enable()
+
+    @staticmethod
+    def is_staff(request, view_class) -> bool:  # noqa: ANN001
+        """
+        Whether the request comes from a staff user.
+
+        A session user set by AuthenticationMiddleware is reused; otherwise
+        the request is authenticated the way the DRF view is about to.
+        """
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+
+        drf_request = Request(
+            request,
+            authenticators=view_class().get_authenticators(),
+        )
+        try:
+            return drf_request.user.is_staff
+        except APIException:
+            return False
+
+    @staticmethod
+    def save(profiler: cProfile.Profile, endpoint: str) -> None:
+        root = Path(settings.CAMPAIGN_PROFILE_DIR)
+        directory = root / endpoint
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(directory / f"{time.time_ns()}.prof")
+        prune_profiles(root, settings.CAMPAIGN_PROFILE_MAX_MB * 1024 * 1024)
+
+
+def prune_profiles(root: Path, max_bytes: int) -> None:
+    """Delete the oldest profiles under `root` until it fits in `max_bytes`."""
+    profiles = sorted(
+        ((path.stat(), path) for path in root.glob("*/*.prof")),
+        key=lambda item: item[0].st_mtime_ns,
+    )
+    total = sum(stat.st_size for stat, _ in profiles)
+    for stat, path in profiles:
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= stat.st_size
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-16 09:12
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CampaignBudgetShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("index", models.PositiveSmallIntegerField()),
+                ("budget", models.DecimalField(decimal_places=2, max_digits=12)),
+                (
+                    "spend",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=12
+                    ),
+                ),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="budget_shards",
+                        to="app.campaign",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("campaign", "index")},
+            },
+        ),
+    ]
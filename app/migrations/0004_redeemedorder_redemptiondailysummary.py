@@ -0,0 +1,105 @@
+# Generated by Django 6.0 on 2026-10-16 13:05
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_order_keys(apps, schema_editor):
+    schema_editor.execute(
+        "INSERT INTO app_redeemedorder (campaign_id, order_id) "
+        "SELECT campaign_id, order_id FROM app_redemption",
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0003_usercampaigndailyusage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RedeemedOrder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("order_id", models.CharField(max_length=255)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RedemptionDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("redemptions", models.PositiveIntegerField(default=0)),
+                ("users", models.PositiveIntegerField(default=0)),
+                (
+                    "discount_total",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="redemption",
+            name="app_redempt_user_id_0becb2_idx",
+        ),
+        migrations.AlterUniqueTogether(
+            name="redemption",
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name="redemption",
+            name="campaign",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="redemptions",
+                to="app.campaign",
+            ),
+        ),
+        migrations.AddField(
+            model_name="redeemedorder",
+            name="campaign",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="redeemed_orders",
+                to="app.campaign",
+            ),
+        ),
+        migrations.AddField(
+            model_name="redemptiondailysummary",
+            name="campaign",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_summaries",
+                to="app.campaign",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="redeemedorder",
+            unique_together={("campaign", "order_id")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="redemptiondailysummary",
+            unique_together={("campaign", "day")},
+        ),
+        migrations.RunPython(copy_order_keys, migrations.RunPython.noop),
+    ]
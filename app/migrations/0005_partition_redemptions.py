@@ -0,0 +1,110 @@
+# Generated by Django 6.0 on 2026-10-16 13:06
+
+import datetime
+
+from django.db import migrations
+
+# Monthly partitions are created this far ahead; after that the
+# create_redemption_partitions command keeps them coming.
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_redemptions(apps, schema_editor):
+    """
+    Rebuild app_redemption as a table partitioned by month on redeemed_at.
+
+    Postgres only; other databases keep the plain table. The primary key
+    becomes (id, redeemed_at), as Postgres requires for partitioned tables,
+    and the remaining indexes and foreign keys are recreated under their
+    original names, so later migrations still find them.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor,
+            "app_redemption",
+        )
+        cursor.execute("SELECT min(redeemed_at) FROM app_redemption")
+        (first,) = cursor.fetchone()
+
+    (pkey,) = (name for name, c in constraints.items() if c["primary_key"])
+    indexes = {
+        name: c["columns"]
+        for name, c in constraints.items()
+        if c["index"] and not c["primary_key"] and not c["unique"]
+    }
+    foreign_keys = {
+        name: (c["columns"][0], *c["foreign_key"])
+        for name, c in constraints.items()
+        if c["foreign_key"]
+    }
+
+    today = datetime.datetime.now(tz=datetime.UTC).date().replace(day=1)
+    month = (first.date() if first else today).replace(day=1)
+    months = []
+    while month <= _add_months(today, MONTHS_AHEAD):
+        months.append(month)
+        month = _add_months(month, 1)
+
+    schema_editor.execute("ALTER TABLE app_redemption RENAME TO app_redemption_old")
+    schema_editor.execute(
+        f"ALTER TABLE app_redemption_old RENAME CONSTRAINT {pkey} TO {pkey}_old",
+    )
+    for name in indexes:
+        schema_editor.execute(f"DROP INDEX {name}")
+
+    schema_editor.execute(
+        "CREATE TABLE app_redemption ("
+        "LIKE app_redemption_old INCLUDING DEFAULTS INCLUDING IDENTITY, "
+        f"CONSTRAINT {pkey} PRIMARY KEY (id, redeemed_at)"
+        ") PARTITION BY RANGE (redeemed_at)",
+    )
+    # Catches rows for months nobody created a partition for, so redeem
+    # never fails on a missing partition.
+    schema_editor.execute(
+        "CREATE TABLE app_redemption_default PARTITION OF app_redemption DEFAULT",
+    )
+    for month in months:
+        schema_editor.execute(
+            f"CREATE TABLE app_redemption_p{month:%Y_%m} PARTITION OF app_redemption "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') "
+            f"TO ('{_add_months(month, 1).isoformat()} 00:00+00')",
+        )
+    for name, columns in indexes.items():
+        schema_editor.execute(
+            f"CREATE INDEX {name} ON app_redemption ({', '.join(columns)})",
+        )
+
+    schema_editor.execute("INSERT INTO app_redemption SELECT * FROM app_redemption_old")
+    schema_editor.execute(
+        "SELECT setval(pg_get_serial_sequence('app_redemption', 'id'), "
+        "coalesce(max(id), 1), max(id) IS NOT NULL) FROM app_redemption",
+    )
+    schema_editor.execute("DROP TABLE app_redemption_old")
+
+    for name, (column, to_table, to_column) in foreign_keys.items():
+        schema_editor.execute(
+            f"ALTER TABLE app_redemption ADD CONSTRAINT {name} "
+            f"FOREIGN KEY ({column}) REFERENCES {to_table} ({to_column}) "
+            "DEFERRABLE INITIALLY DEFERRED",
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0004_redeemedorder_redemptiondailysummary"),
+    ]
+
+    operations = [
+        # Not reversible: turning the partitions back into one table is a
+        # manual job.
+        migrations.RunPython(partition_redemptions),
+    ]
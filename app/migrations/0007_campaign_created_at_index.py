@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-16 13:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0006_campaignhourlystats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="campaign",
+            index=models.Index(
+                fields=["created_at", "id"], name="app_campaig_created_72a810_idx"
+            ),
+        ),
+    ]
@@ -5,7 +5,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
 # Create your models here.
-from django.db import models
+from django.db import models, transaction
 
 
 class Campaign(models.Model):
@@ -83,6 +83,8 @@ class Campaign(models.Model):
     class Meta:
         indexes = [  # noqa: RUF012
             models.Index(fields=["start_date", "end_date", "is_active"]),
+            # Keyset pagination of the campaign list
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self) -> str:
@@ -104,17 +106,38 @@ class Campaign(models.Model):
             raise ValidationError("Current spend cannot exceed total budget.")
 
 
+class RedemptionQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):  # noqa: ANN001, ANN002, ANN003, ANN201
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            RedeemedOrder.objects.using(self.db).bulk_create(
+                [
+                    RedeemedOrder(campaign_id=r.campaign_id, order_id=r.order_id)
+                    for r in objs
+                ],
+                batch_size=kwargs.get("batch_size"),
+            )
+            return super().bulk_create(objs, *args, **kwargs)
+
+
 class Redemption(models.Model):
     """
     Stores each successful discount redemption.
 
     Ensures tracking per user, per campaign, per order.
+
+    On Postgres the table is range-partitioned by month on `redeemed_at`
+    (see `app.services.redemption_partitions`), so it cannot carry a unique
+    constraint on ``(campaign, order_id)``; every new redemption claims its
+    order in `RedeemedOrder` instead, in the same transaction.
     """
 
     campaign = models.ForeignKey(
         "Campaign",
         on_delete=models.CASCADE,
         related_name="redemptions",
+        # Covered by the (campaign, redeemed_at) index.
+        db_index=False,
     )
 
     user = models.ForeignKey(
@@ -136,15 +159,187 @@ class Redemption(models.Model):
 
     redeemed_at = models.DateTimeField(auto_now_add=True)
 
+    objects = RedemptionQuerySet.as_manager()
+
     class Meta:
         indexes = [  # noqa: RUF012
-            models.Index(fields=["user", "campaign", "redeemed_at"]),
             models.Index(fields=["campaign", "redeemed_at"]),
             models.Index(fields=["order_id"]),
         ]
+
+    def __str__(self) -> str:
+        return f"{self.user} redeemed {self.applied_discount} on {self.campaign}"
+
+    def save(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        # Prevent redeeming same order twice
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            RedeemedOrder.objects.create(
+                campaign_id=self.campaign_id,
+                order_id=self.order_id,
+            )
+            super().save(*args, **kwargs)
+
+
+class RedeemedOrder(models.Model):
+    """
+    The ``(campaign, order_id)`` pairs already redeemed.
+
+    Holds the uniqueness `Redemption` cannot enforce across partitions.
+    Rows go away when their month is archived, and are not removed when a
+    single redemption is deleted.
+    """
+
+    campaign = models.ForeignKey(
+        "Campaign",
+        on_delete=models.CASCADE,
+        related_name="redeemed_orders",
+    )
+    order_id = models.CharField(max_length=255)
+
+    class Meta:
         unique_together = [  # noqa: RUF012
-            ("campaign", "order_id"),  # Prevent redeeming same order twice
+            ("campaign", "order_id"),
         ]
 
     def __str__(self) -> str:
-        return f"{self.user} redeemed {self.applied_discount} on {self.campaign}"
+        return f"{self.campaign} order {self.order_id}"
+
+
+class RedemptionDailySummary(models.Model):
+    """Per-campaign totals of one (UTC) day of archived redemptions."""
+
+    campaign = models.ForeignKey(
+        "Campaign",
+        on_delete=models.CASCADE,
+        related_name="daily_summaries",
+    )
+    day = models.DateField()
+    redemptions = models.PositiveIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+    discount_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+
+    class Meta:
+        unique_together = [  # noqa: RUF012
+            ("campaign", "day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} on {self.day}: {self.redemptions} redemptions"
+
+
+class CampaignBudgetShard(models.Model):
+    """
+    One slice of a campaign's budget.
+
+    Used by the ``sharded`` redeem strategy: each redemption locks a single
+    shard instead of the campaign row, and ``Campaign.current_spend`` is
+    rolled up from the shards periodically.
+    """
+
+    campaign = models.ForeignKey(
+        "Campaign",
+        on_delete=models.CASCADE,
+        related_name="budget_shards",
+    )
+    index = models.PositiveSmallIntegerField()
+
+    budget = models.DecimalField(max_digits=12, decimal_places=2)
+    spend = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+
+    class Meta:
+        unique_together = [  # noqa: RUF012
+            ("campaign", "index"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} shard {self.index}: {self.spend}/{self.budget}"
+
+
+class UserCampaignDailyUsage(models.Model):
+    """
+    How many times a user redeemed a campaign on one (UTC) day.
+
+    Kept in step with `Redemption` inside the redeem transaction, so the
+    daily limit is one unique-key lookup instead of a count over a user's
+    redemptions. Only recent days are kept.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="campaign_daily_usage",
+    )
+    campaign = models.ForeignKey(
+        "Campaign",
+        on_delete=models.CASCADE,
+        related_name="daily_usage",
+    )
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [  # noqa: RUF012
+            ("user", "campaign", "day"),
+        ]
+        indexes = [  # noqa: RUF012
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} redeemed {self.campaign} {self.count}x on {self.day}"
+
+
+class CampaignHourlyStats(models.Model):
+    """
+    Redemption totals of a campaign for one UTC hour.
+
+    Rolled up incrementally from `Redemption` (see
+    `app.services.campaign_stats`). Distinct users are kept as a
+    HyperLogLog sketch, so hours can be merged into days or ranges
+    without reading redemptions again.
+    """
+
+    campaign = models.ForeignKey(
+        "Campaign",
+        on_delete=models.CASCADE,
+        related_name="hourly_stats",
+    )
+    hour = models.DateTimeField()
+    redemptions = models.PositiveIntegerField(default=0)
+    discount_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    users_sketch = models.BinaryField()
+
+    class Meta:
+        unique_together = [  # noqa: RUF012
+            ("campaign", "hour"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} at {self.hour}: {self.redemptions} redemptions"
+
+
+class RollupCursor(models.Model):
+    """How far a background rollup has read its source table."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} at {self.position}"
@@ -1,16 +1,155 @@
+import copy
+from datetime import timedelta
 from decimal import Decimal
 
-from rest_framework import serializers
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from rest_framework import permissions, serializers
 
 from app.models import Campaign
 
 
-class CampaignSerializer(serializers.ModelSerializer):
+class FieldSelectionMixin:
+    """
+    Lets GET requests pick the fields returned: ``?fields=id,name``.
+
+    Unknown names are rejected; writes always use every field.
+    """
+
+    fields_query_param = "fields"
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get("request"))
+        if selected is None:
+            return
+
+        unknown = selected - set(self.fields)
+        if unknown:
+            msg = f"Unknown field(s): {', '.join(sorted(unknown))}."
+            raise serializers.ValidationError({self.fields_query_param: msg})
+        for name in set(self.fields) - selected:
+            self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):  # noqa: ANN001, ANN206
+        """The requested field names, or None for all of them."""
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        value = request.query_params.get(cls.fields_query_param)
+        if not value:
+            return None
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class CampaignSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    target_user_count = serializers.SerializerMethodField()
+
     class Meta:
         model = Campaign
         fields = "__all__"
         read_only_fields = ("current_spend", "created_at")
 
+    def get_target_user_count(self, campaign: Campaign) -> int:
+        # Annotated by the list view; one COUNT query otherwise.
+        count = getattr(campaign, "target_user_count", None)
+        if count is None:
+            count = campaign.target_users.count()
+        return count
+
+
+class CampaignBulkItemSerializer(CampaignSerializer):
+    """
+    One campaign of a bulk create or update.
+
+    Runs `Campaign.clean` too. Target users are plain ids, checked for
+    existence once for the whole request by `validate_bulk_campaigns`.
+    """
+
+    target_users = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        campaign = copy.copy(self.instance) if self.instance else Campaign()
+        for name, value in attrs.items():
+            if name != "target_users":
+                setattr(campaign, name, value)
+        try:
+            campaign.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages) from e
+        return attrs
+
+
+class CampaignBulkRequestSerializer(serializers.Serializer):
+    MAX_CAMPAIGNS = 1000
+
+    campaigns = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=MAX_CAMPAIGNS,
+    )
+
+
+class CampaignIdsRequestSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1,
+        max_length=CampaignBulkRequestSerializer.MAX_CAMPAIGNS,
+    )
+
+
+def validate_bulk_campaigns(items: list, instances: list | None = None) -> list:
+    """
+    Validate every item of a bulk request in one pass.
+
+    With `instances` (aligned with `items`) the items are partial updates.
+    Returns the validated data, or raises a ValidationError holding one
+    error dict per item, empty for the valid ones.
+    """
+    serializers_ = [
+        CampaignBulkItemSerializer(
+            instance,
+            data=item,
+            partial=instance is not None,
+        )
+        for item, instance in zip(items, instances or [None] * len(items), strict=True)
+    ]
+    errors = [{} if s.is_valid() else dict(s.errors) for s in serializers_]
+
+    user_ids = {
+        user_id
+        for s in serializers_
+        if not s.errors
+        for user_id in s.validated_data.get("target_users", ())
+    }
+    known = set(
+        get_user_model().objects.filter(pk__in=user_ids).values_list("pk", flat=True),
+    )
+    for s, item_errors in zip(serializers_, errors, strict=True):
+        if item_errors:
+            continue
+        missing = set(s.validated_data.get("target_users", ())) - known
+        if missing:
+            item_errors["target_users"] = [
+                f"Unknown user id(s): {', '.join(map(str, sorted(missing)))}.",
+            ]
+
+    if any(errors):
+        raise serializers.ValidationError({"campaigns": errors})
+    return [s.validated_data for s in serializers_]
+
+
+class CampaignListSerializer(CampaignSerializer):
+    """Campaign without the target user ids, which can run to millions."""
+
+    class Meta(CampaignSerializer.Meta):
+        fields = None
+        exclude = ("target_users",)
+
 
 class AvailableDiscountRequestSerializer(serializers.Serializer):
     cart_total = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
@@ -31,6 +170,16 @@ class DiscountResponseSerializer(serializers.Serializer):
     amount = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
+class AvailableBatchRequestSerializer(serializers.Serializer):
+    carts = AvailableDiscountRequestSerializer(many=True, min_length=1, max_length=50)
+
+
+class AvailableBatchResultSerializer(serializers.Serializer):
+    cart_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    delivery_fee = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discounts = DiscountResponseSerializer(many=True)
+
+
 class RedeemRequestSerializer(serializers.Serializer):
     campaign_id = serializers.IntegerField()
     order_id = serializers.CharField()
@@ -42,3 +191,83 @@ class RedeemRequestSerializer(serializers.Serializer):
         required=False,
         default=Decimal("0.0"),
     )
+
+
+class RedeemBatchRequestSerializer(serializers.Serializer):
+    campaign_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1,
+        max_length=10,
+    )
+    order_id = serializers.CharField()
+    cart_total = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
+    delivery_fee = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        min_value=0,
+        required=False,
+        default=Decimal("0.0"),
+    )
+
+    def validate_campaign_ids(self, value: list) -> list:
+        if len(set(value)) != len(value):
+            msg = "Campaign ids must be unique."
+            raise serializers.ValidationError(msg)
+        return value
+
+
+class RedeemBatchResultSerializer(serializers.Serializer):
+    campaign_id = serializers.IntegerField()
+    discount_applied = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class CampaignStatsRequestSerializer(serializers.Serializer):
+    # Keeps a response to at most a month of hours or a year of days.
+    MAX_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=366)}  # noqa: RUF012
+
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    bucket = serializers.ChoiceField(choices=["hour", "day"], default="hour")
+
+    def validate(self, attrs: dict) -> dict:
+        until = attrs.get("until") or timezone.now()
+        since = attrs.get("since") or until - timedelta(days=1)
+        if since > until:
+            msg = "since must not be after until."
+            raise serializers.ValidationError(msg)
+        if until - since > self.MAX_RANGE[attrs["bucket"]]:
+            msg = f"Range too long for {attrs['bucket']} buckets."
+            raise serializers.ValidationError(msg)
+        return {**attrs, "since": since, "until": until}
+
+
+class CampaignStatsPointSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    redemptions = serializers.IntegerField()
+    discount_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    users = serializers.IntegerField(help_text="Approximate distinct users")
+
+
+class CampaignStatsSerializer(serializers.Serializer):
+    campaign_id = serializers.IntegerField()
+    bucket = serializers.CharField()
+    redemptions = serializers.IntegerField()
+    discount_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    users = serializers.IntegerField(help_text="Approximate distinct users")
+    rolled_up_at = serializers.DateTimeField(allow_null=True)
+    series = CampaignStatsPointSerializer(many=True)
+
+
+class RedemptionExportRequestSerializer(serializers.Serializer):
+    campaign = serializers.IntegerField(required=False)
+    vendor = serializers.IntegerField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    # Not "format": DRF reserves it for renderer selection.
+    output = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+
+    def validate(self, attrs: dict) -> dict:
+        if "since" in attrs and "until" in attrs and attrs["since"] > attrs["until"]:
+            msg = "since must not be after until."
+            raise serializers.ValidationError(msg)
+        return attrs
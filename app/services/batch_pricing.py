@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import numpy as np
+
+from app.models import Campaign
+
+# Percentages are held in hundredths of a percent, so a discount is
+# cents * value / PERCENT_SCALE, computed exactly in integers.
+PERCENT_SCALE = 10_000
+NO_CAP = -1
+
+
+def to_cents(amount: Decimal) -> int:
+    return int(Decimal(amount) * 100)
+
+
+def price_campaigns(campaigns: list, carts: list) -> tuple:
+    """
+    Price every campaign against every ``(cart_total, delivery_fee)`` pair.
+
+    Returns ``(amounts, applicable)``: two campaigns x carts arrays holding
+    the discount in integer cents and whether the discount is positive.
+    Amounts equal `CampaignService._calculate_discount_struct`, which rounds
+    to cents half-even; all arithmetic is done on int64 cents, never floats.
+    """
+    is_cart = np.array([c["scope"] == Campaign.SCOPE_CART for c in campaigns])
+    is_fixed = np.array([c["discount_type"] == Campaign.TYPE_FIXED for c in campaigns])
+    # Fixed discounts in cents; percentages in hundredths of a percent.
+    value = np.array([to_cents(c["discount_value"]) for c in campaigns], dtype=np.int64)
+    cap = np.array(
+        [
+            to_cents(c["max_discount_cap"]) if c.get("max_discount_cap") else NO_CAP
+            for c in campaigns
+        ],
+        dtype=np.int64,
+    )
+
+    cart_totals = np.array([to_cents(total) for total, _ in carts], dtype=np.int64)
+    delivery_fees = np.array([to_cents(fee) for _, fee in carts], dtype=np.int64)
+
+    base = np.where(is_cart[:, None], cart_totals[None, :], delivery_fees[None, :])
+
+    # Percentage discounts, rounded half-even to the cent.
+    numerator = base * value[:, None]
+    quotient, remainder = np.divmod(numerator, PERCENT_SCALE)
+    round_up = (2 * remainder > PERCENT_SCALE) | (
+        (2 * remainder == PERCENT_SCALE) & (quotient % 2 == 1)
+    )
+    percent = quotient + round_up
+    percent = np.where(
+        cap[:, None] != NO_CAP,
+        np.minimum(percent, cap[:, None]),
+        percent,
+    )
+
+    amounts = np.where(is_fixed[:, None], value[:, None], percent)
+    amounts = np.minimum(amounts, base)
+    amounts = np.where(base > 0, amounts, 0)
+
+    # A discount that rounds to zero cents cannot be redeemed either.
+    return amounts, amounts > 0
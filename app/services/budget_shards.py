@@ -0,0 +1,135 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from app.models import Campaign, CampaignBudgetShard
+
+
+def provision(campaign_id: int, shards: int) -> list:
+    """
+    Split a campaign's budget across `shards` rows.
+
+    Existing shards are rolled up and rewritten in place, so a redemption
+    waiting on one re-checks its room against the new budget instead of
+    finding it gone. What has already been spent stays on shard 0 (as both
+    budget and spend), so the shard totals always add up to the campaign's
+    ``total_budget`` and ``current_spend``.
+    """
+    with transaction.atomic():
+        # NO KEY UPDATE: redemptions take KEY SHARE on the campaign when
+        # they insert rows referencing it while holding a shard lock.
+        campaign = Campaign.objects.select_for_update(no_key=True).get(
+            pk=campaign_id,
+        )
+        existing = {
+            shard.index: shard
+            for shard in CampaignBudgetShard.objects.select_for_update().filter(
+                campaign=campaign,
+            )
+        }
+        if existing:
+            spent = sum(shard.spend for shard in existing.values())
+        else:
+            spent = campaign.current_spend
+
+        remaining_cents = int((campaign.total_budget - spent) * 100)
+        share, extra = divmod(max(remaining_cents, 0), shards)
+
+        provisioned = []
+        for i in range(shards):
+            shard = existing.pop(i, None) or CampaignBudgetShard(
+                campaign=campaign,
+                index=i,
+            )
+            shard.budget = Decimal(share + (extra if i == 0 else 0)) / 100 + (
+                spent if i == 0 else 0
+            )
+            shard.spend = spent if i == 0 else Decimal("0.00")
+            provisioned.append(shard)
+
+        CampaignBudgetShard.objects.filter(
+            pk__in=[shard.pk for shard in existing.values()],
+        ).delete()
+        CampaignBudgetShard.objects.bulk_update(
+            [shard for shard in provisioned if shard.pk is not None],
+            ["budget", "spend"],
+        )
+        CampaignBudgetShard.objects.bulk_create(
+            [shard for shard in provisioned if shard.pk is None],
+        )
+
+        Campaign.objects.filter(pk=campaign.pk).update(current_spend=spent)
+        return provisioned
+
+
+def sync_total_budgets(campaigns: list) -> list:
+    """
+    Re-provision sharded campaigns whose shards no longer match their budget.
+
+    Called after ``total_budget`` may have changed, so lowering it stops
+    redemptions at the new total and raising it takes effect at once. The
+    number of shards is kept. Returns the ids of re-provisioned campaigns.
+    """
+    totals = {campaign.pk: campaign.total_budget for campaign in campaigns}
+    sharded = (
+        CampaignBudgetShard.objects.filter(campaign_id__in=totals)
+        .values("campaign_id")
+        .annotate(count=Count("pk"), budget=Sum("budget"), spend=Sum("spend"))
+    )
+    resized = []
+    for shards in sharded:
+        campaign_id = shards["campaign_id"]
+        # Shards never hold less than what was already spent.
+        if shards["budget"] != max(totals[campaign_id], shards["spend"]):
+            provision(campaign_id, shards["count"])
+            resized.append(campaign_id)
+    return resized
+
+
+def lock_shard_with_room(campaign_id: int, amount: Decimal):  # noqa: ANN201
+    """
+    Lock and return one shard that can still absorb `amount`, or None.
+
+    Shards locked by other redemptions are skipped first so concurrent
+    callers spread across shards; only when every shard with room is busy
+    do we wait for one. Postgres re-checks the room condition after the
+    wait, so a shard drained meanwhile is never returned.
+    """
+    with_room = CampaignBudgetShard.objects.filter(
+        campaign_id=campaign_id,
+        spend__lte=F("budget") - amount,
+    ).order_by("?")
+
+    shard = with_room.select_for_update(skip_locked=True).first()
+    if shard is None:
+        shard = with_room.select_for_update().first()
+    return shard
+
+
+def debit(shard: CampaignBudgetShard, amount: Decimal) -> None:
+    CampaignBudgetShard.objects.filter(pk=shard.pk).update(
+        spend=F("spend") + amount,
+    )
+
+
+def has_shards(campaign_id: int) -> bool:
+    return CampaignBudgetShard.objects.filter(campaign_id=campaign_id).exists()
+
+
+def rollup(campaign_ids=None) -> int:  # noqa: ANN001
+    """Set ``Campaign.current_spend`` to the sum of its shards' spend."""
+    shard_spend = (
+        CampaignBudgetShard.objects.filter(campaign=OuterRef("pk"))
+        .values("campaign")
+        .annotate(total=Sum("spend"))
+        .values("total")
+    )
+    campaigns = Campaign.objects.filter(budget_shards__isnull=False).distinct()
+    if campaign_ids is not None:
+        campaigns = campaigns.filter(pk__in=campaign_ids)
+
+    return Campaign.objects.filter(pk__in=campaigns.values("pk")).update(
+        current_spend=Coalesce(Subquery(shard_spend), F("current_spend")),
+    )
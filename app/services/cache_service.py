@@ -1,43 +1,313 @@
+import contextlib
+import math
+import random
+import time
+import uuid
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+
 from django.core.cache import cache
+from django.db.models import F, Min, Q
+from django.utils import timezone
 
+from app.metrics import CACHE_LOOKUPS
 from app.models import Campaign
+from app.services.campaign_index import CampaignIntervalIndex, CampaignTargetingIndex
 
 CACHE_KEY = "active_campaigns"
+VERSION_KEY = "active_campaigns:version"
+LOCK_KEY = "active_campaigns:lock"
+SPEND_KEY_PREFIX = "campaign_spend"
 TTL = 300
 
+# How long a snapshot is kept in Redis. Past its version or TTL it is only
+# served as a stale copy while one worker rebuilds.
+STALE_TTL = TTL * 12
+# Upper bound on a rebuild; the lock expires on its own if a worker dies.
+LOCK_TTL = 30
+# How long a worker with nothing to serve waits for another worker's rebuild.
+REBUILD_WAIT = 5
+REBUILD_POLL_INTERVAL = 0.05
+# Higher values refresh earlier (XFetch "beta"); 1.0 is the usual default.
+EARLY_REFRESH_BETA = 1.0
+
+
+class _LocalSnapshot:
+    """Per-process (L1) copy of the last snapshot fetched from Redis (L2)."""
+
+    entry = None
+
+
+_local = _LocalSnapshot()
+
 
 def get_cached_active_campaigns():  # noqa: ANN201
-    campaigns = cache.get(CACHE_KEY)
-    if campaigns is not None:
-        return campaigns
+    """
+    Return the cached configuration of every campaign live right now.
+
+    Inactive, expired, not yet started and budget-exhausted campaigns are
+    left out, and a snapshot expires at the next start or end of an active
+    campaign, so it never holds a campaign past its end for long nor misses
+    one that has just started.
+
+    Only slow-changing fields live here; the live spend of each campaign is
+    kept in a separate per-campaign layer (see `get_campaign_spends`) so that
+    redemptions never invalidate this list.
+
+    Each process keeps the last snapshot in memory and only checks a small
+    version counter in Redis per call. The full list is fetched from Redis
+    again only when that version moves, and rebuilt from the database only
+    when Redis has nothing current either.
+
+    Rebuilds are single-flight: one worker holds a short lock in the cache
+    and rebuilds while everyone else keeps serving the last snapshot. Entries
+    are also refreshed probabilistically shortly before they expire so that
+    a hot key rarely misses at all.
+    """
+    return _get_snapshot()["campaigns"]
+
+
+def get_campaign_snapshot() -> dict:
+    """
+    Resolve the current snapshot, checking the version in Redis once.
+
+    Pass it to the accessors below when one request reads several parts of
+    the snapshot; each of them resolves it again otherwise.
+    """
+    return _get_snapshot()
+
+
+def get_live_campaigns(now: datetime, snapshot: dict | None = None) -> list:
+    """Return the cached campaigns whose active period contains `now`."""
+    if snapshot is None:
+        snapshot = _get_snapshot()
+    return snapshot["index"].live_at(now.timestamp())
+
+
+def get_targeting_index(snapshot: dict | None = None) -> CampaignTargetingIndex:
+    """Return the reverse user -> campaign targeting index of the snapshot."""
+    if snapshot is None:
+        snapshot = _get_snapshot()
+    return snapshot["targeting"]
+
+
+def _get_snapshot() -> dict:
+    version = _get_version()
+
+    entry = _local.entry
+    if _is_fresh(entry, version):
+        CACHE_LOOKUPS.inc("snapshot", "local_hit")
+        return entry
+
+    shared = cache.get(CACHE_KEY)
+    if _is_fresh(shared, version):
+        CACHE_LOOKUPS.inc("snapshot", "shared_hit")
+        _local.entry = shared
+        return shared
+
+    CACHE_LOOKUPS.inc("snapshot", "miss")
+    stale = entry if entry is not None else shared
+    return _rebuild_single_flight(version, stale)
+
+
+def invalidate_campaign_cache() -> None:
+    """
+    Bump the snapshot version so every process drops its copy.
+
+    The snapshot itself is kept on purpose: it is served while one worker
+    rebuilds.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        _get_version()
+
+
+def clear_local_snapshot() -> None:
+    _local.entry = None
+
+
+def _get_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a flushed Redis never repeats an old version.
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
 
+def _is_fresh(entry, version: int) -> bool:  # noqa: ANN001
+    return (
+        entry is not None
+        and entry["version"] == version
+        and not _should_refresh_early(entry)
+    )
+
+
+def _should_refresh_early(entry: dict) -> bool:
+    """
+    Probabilistic early expiration (XFetch).
+
+    The closer the entry is to expiring, and the longer it took to build, the
+    more likely a reader is to volunteer for a refresh.
+    """
+    jitter = -entry["delta"] * EARLY_REFRESH_BETA * math.log(1.0 - random.random())  # noqa: S311
+    return time.time() + jitter >= entry["expires_at"]
+
+
+def _rebuild_single_flight(version: int, stale) -> dict:  # noqa: ANN001
+    token = uuid.uuid4().hex
+    if cache.add(LOCK_KEY, token, LOCK_TTL):
+        try:
+            return _rebuild(version)
+        finally:
+            if cache.get(LOCK_KEY) == token:
+                cache.delete(LOCK_KEY)
+
+    if stale is not None:
+        return stale
+
+    # Cold cache and someone else is rebuilding: wait for their result.
+    deadline = time.monotonic() + REBUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        entry = cache.get(CACHE_KEY)
+        if entry is not None and entry["version"] == version:
+            _local.entry = entry
+            return entry
+
+    # The lock holder is gone or too slow; rebuilding beats failing the request.
+    return _rebuild(version)
+
+
+def _rebuild(version: int) -> dict:
+    # `version` was read before loading, so a change committed mid-rebuild
+    # leaves this snapshot already outdated rather than wrongly current.
+    started = time.monotonic()
+    now = timezone.now()
+    campaigns, targeting, boundary = _load_active_campaigns(now)
+    expires_at = time.time() + TTL
+    if boundary is not None:
+        # Rebuild as soon as a campaign starts or ends.
+        expires_at = min(expires_at, boundary.timestamp())
+    entry = {
+        "version": version,
+        "campaigns": campaigns,
+        "index": CampaignIntervalIndex(campaigns),
+        "targeting": targeting,
+        "expires_at": expires_at,
+        "delta": time.monotonic() - started,
+    }
+
+    cache.set(CACHE_KEY, entry, STALE_TTL)
+    _local.entry = entry
+    return entry
+
+
+def next_campaign_boundary(now: datetime):  # noqa: ANN201
+    """The next `start_date` or `end_date` of an active campaign after `now`."""
+    boundaries = Campaign.objects.filter(is_active=True).aggregate(
+        next_start=Min("start_date", filter=Q(start_date__gt=now)),
+        next_end=Min("end_date", filter=Q(end_date__gt=now)),
+    )
+    return min((b for b in boundaries.values() if b is not None), default=None)
+
+
+def _load_active_campaigns(now: datetime) -> tuple:
     campaigns = []
-    for c in Campaign.objects.filter(is_active=True):
+    for c in Campaign.objects.filter(
+        is_active=True,
+        start_date__lte=now,
+        end_date__gte=now,
+        current_spend__lt=F("total_budget"),
+    ):
         campaigns.append(
             {
                 "id": c.id,
                 "name": c.name,
                 "discount_type": c.discount_type,
-                "discount_value": float(c.discount_value),
-                "max_discount_cap": float(c.max_discount_cap)
-                if c.max_discount_cap
-                else None,
+                "discount_value": c.discount_value,
+                "max_discount_cap": c.max_discount_cap,
                 "scope": c.scope,
                 "sponsor_type": c.sponsor_type,
                 "vendor_id": c.vendor_id,
                 "start_date": c.start_date,
                 "end_date": c.end_date,
-                "total_budget": float(c.total_budget),
-                "current_spend": float(c.current_spend),
+                "starts_at": c.start_date.timestamp(),
+                "ends_at": c.end_date.timestamp(),
+                "total_budget": c.total_budget,
                 "max_transactions_per_user_day": c.max_transactions_per_user_day,
                 "is_active": c.is_active,
-                "target_users": list(c.target_users.values_list("id", flat=True)),
             },
         )
 
-    cache.set(CACHE_KEY, campaigns, TTL)
-    return campaigns
+    # One bulk read of the M2M through table instead of a query per campaign.
+    campaign_ids = [c["id"] for c in campaigns]
+    pairs = (
+        Campaign.target_users.through.objects.filter(campaign_id__in=campaign_ids)
+        .values_list("campaign_id", "user_id")
+        .iterator()
+        if campaign_ids
+        else ()
+    )
+    return (
+        campaigns,
+        CampaignTargetingIndex(campaign_ids, pairs),
+        next_campaign_boundary(now),
+    )
 
 
-def invalidate_campaign_cache() -> None:
-    cache.delete(CACHE_KEY)
+# ---------------- LIVE SPEND ---------------- #
+
+
+def _spend_key(campaign_id: int) -> str:
+    return f"{SPEND_KEY_PREFIX}:{campaign_id}"
+
+
+def _to_cents(amount: Decimal) -> int:
+    # Rounded, never truncated, so the layer cannot fall behind current_spend.
+    return int((Decimal(amount) * 100).to_integral_value(ROUND_HALF_EVEN))
+
+
+def get_campaign_spends(campaign_ids) -> dict:  # noqa: ANN001
+    """
+    Return ``{campaign_id: current_spend}`` for the given campaigns.
+
+    Spend is stored per campaign in integer cents. Missing entries are read
+    from the database in one query and added back without overwriting a
+    value a concurrent redemption may have written in the meantime.
+    """
+    keys = {_spend_key(campaign_id): campaign_id for campaign_id in campaign_ids}
+    if not keys:
+        return {}
+
+    cached = cache.get_many(list(keys))
+    spends = {keys[key]: Decimal(cents) / 100 for key, cents in cached.items()}
+
+    missing = [
+        campaign_id for campaign_id in keys.values() if campaign_id not in spends
+    ]
+    CACHE_LOOKUPS.inc("spend", "hit", amount=len(spends))
+    CACHE_LOOKUPS.inc("spend", "miss", amount=len(missing))
+    if missing:
+        for campaign_id, current_spend in Campaign.objects.filter(
+            pk__in=missing,
+        ).values_list("id", "current_spend"):
+            cache.add(_spend_key(campaign_id), _to_cents(current_spend), TTL)
+            spends[campaign_id] = current_spend
+
+    return spends
+
+
+def set_campaign_spend(campaign_id: int, current_spend: Decimal) -> None:
+    cache.set(_spend_key(campaign_id), _to_cents(current_spend), TTL)
+
+
+def delete_campaign_spend(campaign_id: int) -> None:
+    cache.delete(_spend_key(campaign_id))
+
+
+def adjust_campaign_spend(campaign_id: int, delta: Decimal) -> None:
+    """Add `delta` to a cached spend; absent entries are reloaded lazily."""
+    with contextlib.suppress(ValueError):
+        cache.incr(_spend_key(campaign_id), _to_cents(delta))
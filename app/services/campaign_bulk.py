@@ -0,0 +1,114 @@
+"""
+Create, edit and (de)activate many campaigns in one transaction.
+
+Rows are written with `bulk_create`/`bulk_update`/`update` and targeting
+with one insert into the M2M through table, none of which send signals,
+so the campaign cache is invalidated once, after commit, instead of once
+per campaign.
+"""
+
+from django.db import transaction
+from django.db.models import Count
+
+from app.models import Campaign
+from app.services import budget_reservation, budget_shards
+from app.services.cache_service import invalidate_campaign_cache
+
+Targets = Campaign.target_users.through
+
+
+def create_campaigns(items: list) -> list:
+    """Create campaigns from validated data, ``target_users`` as user ids."""
+    with transaction.atomic():
+        campaigns = Campaign.objects.bulk_create(
+            [
+                Campaign(**{k: v for k, v in item.items() if k != "target_users"})
+                for item in items
+            ],
+        )
+        _set_targets(
+            {
+                campaign.pk: item["target_users"]
+                for campaign, item in zip(campaigns, items, strict=True)
+                if "target_users" in item
+            },
+        )
+        transaction.on_commit(invalidate_campaign_cache)
+    _annotate_target_counts(campaigns)
+    return campaigns
+
+
+def update_campaigns(campaigns: list, items: list) -> list:
+    """
+    Apply validated partial data to already loaded `campaigns`, in order.
+
+    Only the fields present in some item are written. Items that carry
+    ``target_users`` replace those campaigns' targeting.
+    """
+    fields = set()
+    targets = {}
+    with transaction.atomic():
+        for campaign, item in zip(campaigns, items, strict=True):
+            for name, value in item.items():
+                if name == "target_users":
+                    targets[campaign.pk] = value
+                else:
+                    setattr(campaign, name, value)
+                    fields.add(name)
+
+        if fields:
+            Campaign.objects.bulk_update(campaigns, sorted(fields), batch_size=500)
+        if "total_budget" in fields:
+            budget_shards.sync_total_budgets(campaigns)
+        _set_targets(targets, replace=True)
+        transaction.on_commit(lambda: _after_config_change(campaigns))
+    _annotate_target_counts(campaigns)
+    return campaigns
+
+
+def set_active(campaign_ids: list, *, is_active: bool) -> int:
+    """Flip `is_active` on the given campaigns; returns how many changed."""
+    with transaction.atomic():
+        changed = list(
+            Campaign.objects.filter(pk__in=campaign_ids)
+            .exclude(is_active=is_active)
+            .values_list("pk", flat=True),
+        )
+        Campaign.objects.filter(pk__in=changed).update(is_active=is_active)
+        if changed:
+            transaction.on_commit(invalidate_campaign_cache)
+    return len(changed)
+
+
+def _set_targets(targets: dict, *, replace: bool = False) -> None:
+    """Write ``{campaign_id: [user ids]}`` to the through table."""
+    if replace and targets:
+        Targets.objects.filter(campaign_id__in=targets).delete()
+    Targets.objects.bulk_create(
+        [
+            Targets(campaign_id=campaign_id, user_id=user_id)
+            for campaign_id, user_ids in targets.items()
+            for user_id in dict.fromkeys(user_ids)
+        ],
+        batch_size=5000,
+    )
+
+
+def _after_config_change(campaigns: list) -> None:
+    invalidate_campaign_cache()
+    if budget_reservation.is_enabled():
+        # Budget config may have changed: reseed the counters from Postgres.
+        for campaign in campaigns:
+            budget_reservation.forget(campaign.pk)
+
+
+def _annotate_target_counts(campaigns: list) -> None:
+    """Set ``target_user_count`` on every campaign with one query."""
+    counts = dict(
+        Targets.objects.filter(campaign_id__in=[c.pk for c in campaigns])
+        .values("campaign_id")
+        .annotate(count=Count("*"))
+        .values_list("campaign_id", "count"),
+    )
+    for campaign in campaigns:
+        campaign.target_user_count = counts.get(campaign.pk, 0)
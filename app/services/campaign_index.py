@@ -0,0 +1,73 @@
+import math
+from bisect import bisect_left, bisect_right
+
+
+class CampaignIntervalIndex:
+    """
+    Answers "which campaigns are live at time t" over cached campaign dicts.
+
+    Every campaign's ``[starts_at, ends_at]`` bounds (epoch seconds) cut the
+    timeline into segments in which the live set does not change. A lookup
+    is a binary search over the sorted boundaries; the live set of the
+    segment last asked for is memoised, so the steady state is one bisect
+    and expired or future campaigns are not touched at all.
+    """
+
+    def __init__(self, campaigns: list) -> None:
+        self._by_start = sorted(campaigns, key=lambda c: c["starts_at"])
+        self._starts = [c["starts_at"] for c in self._by_start]
+        self._boundaries = sorted(
+            {c["starts_at"] for c in campaigns} | {c["ends_at"] for c in campaigns},
+        )
+        # (lower, upper, live campaigns) for the open segment (lower, upper).
+        self._segment = None
+
+    def __getstate__(self) -> dict:
+        # The memo is per process; never ship it through Redis.
+        return {**self.__dict__, "_segment": None}
+
+    def live_at(self, ts: float) -> list:
+        segment = self._segment
+        if segment is not None and segment[0] < ts < segment[1]:
+            return segment[2]
+
+        i = bisect_left(self._boundaries, ts)
+        if i < len(self._boundaries) and self._boundaries[i] == ts:
+            # Exactly on a boundary: bounds are inclusive, so don't memoise.
+            return self._collect(ts)
+
+        lower = self._boundaries[i - 1] if i else -math.inf
+        upper = self._boundaries[i] if i < len(self._boundaries) else math.inf
+        live = self._collect(ts)
+        self._segment = (lower, upper, live)
+        return live
+
+    def _collect(self, ts: float) -> list:
+        started = self._by_start[: bisect_right(self._starts, ts)]
+        return [c for c in started if c["ends_at"] >= ts]
+
+
+class CampaignTargetingIndex:
+    """
+    Reverse targeting index: which campaigns is a given user offered.
+
+    Untargeted campaigns are open to everyone and kept as one global set;
+    targeted ones are indexed by user id, so eligibility is a set lookup
+    instead of a membership test over a campaign's whole target segment.
+    """
+
+    def __init__(self, campaign_ids, pairs) -> None:  # noqa: ANN001
+        by_user = {}
+        targeted = set()
+        for campaign_id, user_id in pairs:
+            by_user.setdefault(user_id, set()).add(campaign_id)
+            targeted.add(campaign_id)
+
+        self._by_user = by_user
+        self._untargeted = frozenset(campaign_ids) - targeted
+
+    def is_eligible(self, user_id: int, campaign_id: int) -> bool:
+        return campaign_id in self._untargeted or campaign_id in self._by_user.get(
+            user_id,
+            (),
+        )
@@ -0,0 +1,92 @@
+"""
+Deactivate campaigns that can no longer be redeemed.
+
+`sweep` flips active campaigns past their `end_date`, or whose spend has
+reached the budget, to inactive with one guarded `UPDATE` each, and
+invalidates the campaign cache once after commit. The cache snapshot
+itself only holds campaigns live at build time and expires at the next
+start or end boundary (see `cache_service`), so sweeping keeps the table
+and the admin views honest rather than the hot path.
+
+`CampaignSweeper` repeats the sweep, sleeping until the next boundary or
+the interval, whichever comes first. Its clock and sleep are injected so
+tests can drive it without waiting.
+"""
+
+import datetime
+import time
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from app.models import Campaign
+from app.services.cache_service import (
+    invalidate_campaign_cache,
+    next_campaign_boundary,
+)
+
+
+def _deactivate(condition: Q) -> list:
+    rows = Campaign.objects.filter(condition, is_active=True)
+    ids = list(rows.values_list("pk", flat=True))
+    if ids:
+        # The condition is checked again by the UPDATE itself, so a budget
+        # raised or an end date moved since the read is not undone.
+        rows.filter(pk__in=ids).update(is_active=False)
+    return ids
+
+
+def sweep(now: datetime.datetime | None = None) -> dict:
+    """
+    Deactivate expired and budget-exhausted campaigns.
+
+    Returns the ids deactivated for each reason, as
+    ``{"expired": [...], "exhausted": [...]}``.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        result = {
+            "expired": _deactivate(Q(end_date__lt=now)),
+            "exhausted": _deactivate(Q(current_spend__gte=F("total_budget"))),
+        }
+        if result["expired"] or result["exhausted"]:
+            transaction.on_commit(invalidate_campaign_cache)
+    return result
+
+
+class CampaignSweeper:
+    """Run `sweep` until stopped, waking up at campaign boundaries."""
+
+    def __init__(
+        self,
+        interval: float = 60,
+        clock=timezone.now,  # noqa: ANN001
+        sleep=time.sleep,  # noqa: ANN001
+    ) -> None:
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+
+    def run_once(self) -> dict:
+        return sweep(self.clock())
+
+    def seconds_until_next_run(self) -> float:
+        now = self.clock()
+        boundary = next_campaign_boundary(now)
+        if boundary is None:
+            return self.interval
+        # Wake up just past the boundary; end_date itself is still live.
+        wait = (boundary - now).total_seconds() + 0.001
+        return max(min(wait, self.interval), 0)
+
+    def run(self, iterations: int | None = None, on_sweep=None) -> None:  # noqa: ANN001
+        """Sweep `iterations` times, or forever when it is None."""
+        done = 0
+        while iterations is None or done < iterations:
+            result = self.run_once()
+            if on_sweep is not None:
+                on_sweep(result)
+            done += 1
+            if iterations is None or done < iterations:
+                self.sleep(self.seconds_until_next_run())
@@ -1,12 +1,31 @@
-from datetime import datetime
-from decimal import Decimal
+import time
+from decimal import ROUND_HALF_EVEN, Decimal
 
-from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
+from app.metrics import STAGE_SECONDS, span
 from app.models import Campaign, Redemption
-from app.services.cache_service import get_cached_active_campaigns
+from app.services import (
+    batch_pricing,
+    budget_reservation,
+    budget_shards,
+    daily_usage,
+    redemption_results,
+)
+from app.services.cache_service import (
+    adjust_campaign_spend,
+    get_campaign_snapshot,
+    get_campaign_spends,
+    get_live_campaigns,
+    get_targeting_index,
+)
+from app.services.redemption_coalescer import RedemptionCoalescer
+
+CENT = Decimal("0.01")
 
 
 class CampaignService:
@@ -16,59 +35,107 @@ class CampaignService:
         cart_total: Decimal,
         delivery_fee: Decimal = Decimal("0.00"),
     ):
-        now = timezone.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # --- 1. Load active campaigns from Redis ---
-        active_campaigns = get_cached_active_campaigns()
-
-        # --- 2. Filter in Python ---
-        candidates = [
-            c
-            for c in active_campaigns
-            if datetime.fromisoformat(c["start_date"])
-            <= now
-            <= datetime.fromisoformat(c["end_date"])
-            and c["current_spend"] < c["total_budget"]
-            and c["is_active"] is True
-        ]
-
         applicable_campaigns = []
+        campaigns = CampaignService._get_eligible_campaigns(user)
+
+        with span("pricing"):
+            for c in campaigns:
+                # --- 5. Calculate discount ---
+                discount = CampaignService._calculate_discount_struct(
+                    c,
+                    cart_total,
+                    delivery_fee,
+                )
 
-        for c in candidates:
-            # --- 3. Targeting ---
-            if c["target_users"] and user.pk not in c["target_users"]:
-                continue
+                if discount > 0:
+                    applicable_campaigns.append(
+                        {
+                            "id": c["id"],
+                            "name": c["name"],
+                            "scope": c["scope"],
+                            "sponsor": c["sponsor_type"],
+                            "amount": discount,
+                        },
+                    )
 
-            # --- 4. Real-time daily limits (DB read) ---
-            daily_usage = Redemption.objects.filter(
-                campaign_id=c["id"],
-                user=user,
-                redeemed_at__gte=today_start,
-            ).count()
+        return applicable_campaigns
 
-            if daily_usage >= c["max_transactions_per_user_day"]:
-                continue
+    @staticmethod
+    def get_available_discounts_batch(user, carts) -> list:  # noqa: ANN001
+        """
+        Price many ``(cart_total, delivery_fee)`` pairs for one user at once.
 
-            # --- 5. Calculate discount ---
-            discount = CampaignService._calculate_discount_struct(
-                c,
-                cart_total,
-                delivery_fee,
-            )
+        Eligibility (snapshot, targeting, budget, daily usage) is resolved
+        once, then every pair is priced against every campaign in a single
+        vectorised pass. Returns one list of discounts per pair, in order,
+        with amounts already rounded to the cent.
+        """
+        campaigns = CampaignService._get_eligible_campaigns(user)
+        if not campaigns:
+            return [[] for _ in carts]
 
-            if discount > 0:
-                applicable_campaigns.append(
+        with span("pricing"):
+            amounts, applicable = batch_pricing.price_campaigns(campaigns, carts)
+
+        results = []
+        for k in range(len(carts)):
+            results.append(
+                [
                     {
                         "id": c["id"],
                         "name": c["name"],
                         "scope": c["scope"],
                         "sponsor": c["sponsor_type"],
-                        "amount": discount,
-                    },
-                )
+                        "amount": Decimal(int(amounts[i, k])).scaleb(-2),
+                    }
+                    for i, c in enumerate(campaigns)
+                    if applicable[i, k]
+                ],
+            )
+        return results
 
-        return applicable_campaigns
+    @staticmethod
+    def _get_eligible_campaigns(user) -> list:  # noqa: ANN001
+        """Cached campaigns `user` can redeem right now, before pricing."""
+        now = timezone.now()
+
+        # --- 1. Campaigns live at `now`, from the cached interval index ---
+        with span("cache_load"):
+            # One version check per request, shared by every lookup below.
+            snapshot = get_campaign_snapshot()
+            candidates = get_live_campaigns(now, snapshot)
+
+        # --- 2. Targeting (reverse user -> campaigns index) ---
+        with span("targeting"):
+            targeting = get_targeting_index(snapshot)
+            candidates = [
+                c for c in candidates if targeting.is_eligible(user.pk, c["id"])
+            ]
+
+        # --- 3. Remaining budget (live spend layer) ---
+        with span("candidate_filter"):
+            spends = get_campaign_spends([c["id"] for c in candidates])
+            candidates = [c for c in candidates if spends[c["id"]] < c["total_budget"]]
+
+        # --- 4. Real-time daily limits (one read of today's counters) ---
+        with span("usage_query"):
+            usage = CampaignService._get_daily_usage(
+                user,
+                [c["id"] for c in candidates],
+                now,
+            )
+        return [
+            c
+            for c in candidates
+            if usage.get(c["id"], 0) < c["max_transactions_per_user_day"]
+        ]
+
+    @staticmethod
+    def _get_daily_usage(user, campaign_ids, now):  # noqa: ANN001, ANN205
+        """Return ``{campaign_id: redemptions on the day of `now`}`` for one user."""
+        if not campaign_ids:
+            return {}
+        return daily_usage.get_usage(user.pk, campaign_ids, now.date())
 
     @staticmethod
     def _calculate_discount_struct(campaign_dict, cart_total, delivery_fee):  # noqa: ANN001, ANN205
@@ -90,65 +157,460 @@ class CampaignService:
             if campaign_dict.get("max_discount_cap"):
                 discount = min(discount, Decimal(campaign_dict["max_discount_cap"]))
 
-        return min(discount, base_value)
+        return min(discount, base_value).quantize(CENT, ROUND_HALF_EVEN)
 
     # ---------------- REDEEM — FIXED FOR CONCURRENCY ---------------- #
 
+    # settings.CAMPAIGN_REDEEM_STRATEGY -> implementation
+    REDEEM_STRATEGIES = {  # noqa: RUF012
+        "row_lock": "_redeem_with_row_lock",
+        "redis_reservation": "_redeem_with_redis_reservation",
+        "sharded": "_redeem_with_budget_shards",
+        "conditional_update": "_redeem_with_conditional_update",
+        "coalesced": "_redeem_with_coalescing",
+    }
+
     @staticmethod
     def redeem_campaign(campaign_id, user, order_id, cart_total, delivery_fee):  # noqa: ANN001, ANN205
         """
         Concurrency-safe redeem logic.
+
+        The budget is protected by the strategy named in
+        ``settings.CAMPAIGN_REDEEM_STRATEGY`` (see `REDEEM_STRATEGIES`).
+
+        Redeeming an order again is idempotent: the original discount is
+        returned, from the cache before any locking when possible.
+        Concurrent duplicates wait for the first request instead of
+        contending for the campaign lock.
+        """
+        strategy = getattr(settings, "CAMPAIGN_REDEEM_STRATEGY", "row_lock")
+        try:
+            redeem = getattr(
+                CampaignService,
+                CampaignService.REDEEM_STRATEGIES[strategy],
+            )
+        except KeyError:
+            msg = f"Unknown CAMPAIGN_REDEEM_STRATEGY: {strategy!r}"
+            raise ImproperlyConfigured(msg) from None
+
+        token = None
+        completed = redemption_results.get(campaign_id, order_id)
+        if completed is None:
+            token = redemption_results.claim(campaign_id, order_id)
+            if token is None:
+                # The same order is being redeemed right now: wait for it.
+                completed = redemption_results.wait(campaign_id, order_id)
+        if completed is not None:
+            return CampaignService._replay_redemption(completed, user)
+
+        try:
+            amount = redeem(campaign_id, user, order_id, cart_total, delivery_fee)
+        except (IntegrityError, ValidationError):
+            # A retry the cache did not know about, which may also have been
+            # rejected by a limit the first attempt used up: the row is the
+            # truth.
+            completed = (
+                Redemption.objects.filter(campaign_id=campaign_id, order_id=order_id)
+                .values_list("user_id", "applied_discount")
+                .first()
+            )
+            if completed is None:
+                raise
+            redemption_results.remember(campaign_id, order_id, *completed)
+            return CampaignService._replay_redemption(completed, user)
+        else:
+            transaction.on_commit(
+                lambda: redemption_results.remember(
+                    campaign_id,
+                    order_id,
+                    user.pk,
+                    amount,
+                ),
+            )
+            return amount
+        finally:
+            if token is not None:
+                redemption_results.release(campaign_id, order_id, token)
+
+    @staticmethod
+    def _replay_redemption(completed, user) -> Decimal:  # noqa: ANN001
+        user_id, amount = completed
+        if user_id != user.pk:
+            raise ValidationError("Order has already been redeemed.")
+        return amount
+
+    @staticmethod
+    def redeem_campaigns(campaign_ids, user, order_id, cart_total, delivery_fee):  # noqa: ANN001, ANN205
+        """
+        Redeem several campaigns for one order, all or nothing.
+
+        Campaign rows are locked in ascending id order so two overlapping
+        batches can never deadlock. Every campaign is validated before
+        anything is written, and all redemptions are saved in a single
+        transaction.
+
+        Each campaign's budget is debited the way CAMPAIGN_REDEEM_STRATEGY
+        debits it for a single redeem (see `_debit_in_batch`). Retrying a
+        batch that was already stored returns the stored redemptions.
+        """
+        ids = sorted(set(campaign_ids))
+        reserved = []
+        try:
+            with transaction.atomic():
+                now = timezone.now()
+
+                # Lock campaign rows, lowest id first
+                campaigns = list(
+                    Campaign.objects.select_for_update()
+                    .filter(pk__in=ids)
+                    .order_by("pk"),
+                )
+                missing = set(ids) - {c.pk for c in campaigns}
+                if missing:
+                    msg = (
+                        f"Unknown campaign(s): {', '.join(map(str, sorted(missing)))}."
+                    )
+                    raise ValidationError(msg)
+
+                # A retry of a stored batch: checked under the locks, so a
+                # concurrent duplicate sees the first batch's rows here.
+                stored = CampaignService._get_stored_batch(ids, order_id)
+                if stored:
+                    return CampaignService._replay_batch(stored, ids, user)
+
+                redemptions = []
+                spent = []
+                for campaign in campaigns:
+                    try:
+                        # 1-4. Eligibility, limits and discount
+                        discount_to_apply = CampaignService._validate_redemption(
+                            campaign,
+                            user,
+                            now,
+                            cart_total,
+                            delivery_fee,
+                        )
+
+                        # 5. Budget
+                        if CampaignService._debit_in_batch(
+                            campaign,
+                            discount_to_apply,
+                            reserved,
+                        ):
+                            spent.append((campaign, discount_to_apply))
+
+                        CampaignService._consume_daily_usage(campaign, user, now)
+                    except ValidationError as e:
+                        msg = f"Campaign {campaign.pk}: {e.messages[0]}"
+                        raise ValidationError(msg) from e
+
+                    redemptions.append(
+                        Redemption(
+                            campaign=campaign,
+                            user=user,
+                            order_id=order_id,
+                            applied_discount=discount_to_apply,
+                        ),
+                    )
+
+                # 6. Apply all redemptions at once
+                if spent:
+                    Campaign.objects.bulk_update(
+                        [campaign for campaign, _ in spent],
+                        ["current_spend"],
+                    )
+                Redemption.objects.bulk_create(redemptions)
+
+                # bulk_update sends no signals; patch the spend layer directly.
+                def publish_spends() -> None:
+                    for campaign, amount in spent:
+                        adjust_campaign_spend(campaign.pk, amount)
+
+                transaction.on_commit(publish_spends)
+        except IntegrityError:
+            # A duplicate that slipped past the check above.
+            stored = CampaignService._get_stored_batch(ids, order_id)
+            if not stored:
+                raise
+            return CampaignService._replay_batch(stored, ids, user)
+        except Exception:
+            for campaign_id, amount in reserved:
+                budget_reservation.release(campaign_id, amount)
+            raise
+
+        return [
+            {"campaign_id": r.campaign_id, "discount_applied": r.applied_discount}
+            for r in redemptions
+        ]
+
+    @staticmethod
+    def _debit_in_batch(campaign, amount, reserved) -> bool:  # noqa: ANN001
+        """
+        Take `amount` from a locked campaign's budget inside a batch.
+
+        Sharded campaigns are debited on a shard and Redis reservations are
+        taken as the configured strategy would, appending them to `reserved`
+        for the caller to release on failure. Returns whether
+        ``campaign.current_spend`` was raised and needs saving.
+        """
+        strategy = getattr(settings, "CAMPAIGN_REDEEM_STRATEGY", "row_lock")
+
+        if strategy == "sharded":
+            shard = budget_shards.lock_shard_with_room(campaign.pk, amount)
+            if shard is not None:
+                budget_shards.debit(shard, amount)
+                transaction.on_commit(
+                    lambda: adjust_campaign_spend(campaign.pk, amount),
+                )
+                return False
+            if budget_shards.has_shards(campaign.pk):
+                raise ValidationError("Campaign budget exhausted.")
+
+        if campaign.current_spend + amount > campaign.total_budget:
+            raise ValidationError("Campaign budget exhausted.")
+
+        if strategy == "redis_reservation":
+            if not budget_reservation.reserve(
+                campaign.pk,
+                amount,
+                remaining=campaign.total_budget - campaign.current_spend,
+            ):
+                raise ValidationError("Campaign budget exhausted.")
+            reserved.append((campaign.pk, amount))
+
+        campaign.current_spend += amount
+        return True
+
+    @staticmethod
+    def _get_stored_batch(campaign_ids, order_id) -> list:  # noqa: ANN001
+        return list(
+            Redemption.objects.filter(campaign_id__in=campaign_ids, order_id=order_id)
+            .order_by("campaign_id")
+            .values_list("campaign_id", "user_id", "applied_discount"),
+        )
+
+    @staticmethod
+    def _replay_batch(stored, campaign_ids, user) -> list:  # noqa: ANN001
+        if [campaign_id for campaign_id, _, _ in stored] != campaign_ids or any(
+            user_id != user.pk for _, user_id, _ in stored
+        ):
+            raise ValidationError("Order has already been redeemed.")
+        return [
+            {"campaign_id": campaign_id, "discount_applied": amount}
+            for campaign_id, _, amount in stored
+        ]
+
+    @staticmethod
+    def _redeem_with_row_lock(campaign_id, user, order_id, cart_total, delivery_fee):  # noqa: ANN001, ANN205
+        """
+        Concurrency-safe redeem logic.
         Uses SELECT ... FOR UPDATE and real commits.
         """  # noqa: D205
         # Ensure real DB commits (important for race tests)
         with transaction.atomic():
             now = timezone.now()
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
             # Lock campaign row
-            campaign = Campaign.objects.select_for_update().get(pk=campaign_id)
+            with span("lock_wait"):
+                campaign = Campaign.objects.select_for_update().get(pk=campaign_id)
+
+            # 1-4. Eligibility, limits and discount
+            discount_to_apply = CampaignService._validate_redemption(
+                campaign,
+                user,
+                now,
+                cart_total,
+                delivery_fee,
+            )
 
-            # 1. Active?
-            if not campaign.is_active:
-                raise ValidationError("Campaign is not active.")
+            # 5. Budget check
+            if campaign.current_spend + discount_to_apply > campaign.total_budget:
+                raise ValidationError("Campaign budget exhausted.")
 
-            # Date validity
-            if not (campaign.start_date <= now <= campaign.end_date):
-                raise ValidationError("Campaign is outside its active period.")
+            # 6. Apply the redemption
+            with span("write"):
+                CampaignService._consume_daily_usage(campaign, user, now)
+                campaign.current_spend += discount_to_apply
+                campaign.save(update_fields=["current_spend"])
+                transaction.on_commit(
+                    lambda: adjust_campaign_spend(campaign.pk, discount_to_apply),
+                )
 
-            # 2. Targeting
-            if (
-                campaign.target_users.exists()
-                and not campaign.target_users.filter(pk=user.pk).exists()
-            ):
-                raise ValidationError("User is not eligible.")
+                Redemption.objects.create(
+                    campaign=campaign,
+                    user=user,
+                    order_id=order_id,
+                    applied_discount=discount_to_apply,
+                )
 
-            # 3. Daily limit
-            usage = Redemption.objects.filter(
-                campaign=campaign,
-                user=user,
-                redeemed_at__gte=today_start,
-            ).count()
-            if usage >= campaign.max_transactions_per_user_day:
-                raise ValidationError("Daily redemption limit reached.")
+            # Important: ensures visibility in concurrent tests
+            transaction.on_commit(lambda: None)
+
+            commit_started = time.perf_counter()
 
-            # 4. Calculate discount
+        STAGE_SECONDS.observe(time.perf_counter() - commit_started, "commit")
+        return discount_to_apply
+
+    @staticmethod
+    def _redeem_with_redis_reservation(  # noqa: ANN205
+        campaign_id,  # noqa: ANN001
+        user,  # noqa: ANN001
+        order_id,  # noqa: ANN001
+        cart_total,  # noqa: ANN001
+        delivery_fee,  # noqa: ANN001
+    ):
+        """
+        Reserve budget atomically in Redis, then record it in Postgres.
+
+        No row lock is held while validating. The final UPDATE is still
+        guarded on the budget, so Postgres can never overspend even if
+        Redis and Postgres have drifted apart.
+        """
+        now = timezone.now()
+        campaign = Campaign.objects.get(pk=campaign_id)
+
+        # 1-4. Eligibility, limits and discount (unlocked read)
+        discount_to_apply = CampaignService._validate_redemption(
+            campaign,
+            user,
+            now,
+            cart_total,
+            delivery_fee,
+        )
+
+        # 5. Budget reservation
+        if not budget_reservation.reserve(
+            campaign.pk,
+            discount_to_apply,
+            remaining=campaign.total_budget - campaign.current_spend,
+        ):
+            raise ValidationError("Campaign budget exhausted.")
+
+        # 6. Apply the redemption
+        try:
+            with transaction.atomic():
+                if not CampaignService._debit_budget(campaign.pk, discount_to_apply):
+                    raise ValidationError("Campaign budget exhausted.")
+                CampaignService._consume_daily_usage(campaign, user, now)
+                Redemption.objects.create(
+                    campaign=campaign,
+                    user=user,
+                    order_id=order_id,
+                    applied_discount=discount_to_apply,
+                )
+        except Exception:
+            budget_reservation.release(campaign.pk, discount_to_apply)
+            raise
+
+        return discount_to_apply
+
+    @staticmethod
+    def _redeem_with_budget_shards(  # noqa: ANN205
+        campaign_id,  # noqa: ANN001
+        user,  # noqa: ANN001
+        order_id,  # noqa: ANN001
+        cart_total,  # noqa: ANN001
+        delivery_fee,  # noqa: ANN001
+    ):
+        """
+        Debit one of the campaign's budget shards instead of the campaign row.
+
+        Concurrent redemptions lock different shards, so a hot campaign is no
+        longer serialised on one row. Campaigns without shards fall back to
+        the row-lock strategy.
+        """
+        with transaction.atomic():
+            now = timezone.now()
+            campaign = Campaign.objects.get(pk=campaign_id)
+
+            # 1-4. Eligibility, limits and discount
+            discount_to_apply = CampaignService._validate_redemption(
+                campaign,
+                user,
+                now,
+                cart_total,
+                delivery_fee,
+            )
+
+            # 5. Budget check: lock a shard that still has room
+            shard = budget_shards.lock_shard_with_room(campaign.pk, discount_to_apply)
+            if shard is not None:
+                # 6. Apply the redemption
+                budget_shards.debit(shard, discount_to_apply)
+                CampaignService._consume_daily_usage(campaign, user, now)
+                Redemption.objects.create(
+                    campaign=campaign,
+                    user=user,
+                    order_id=order_id,
+                    applied_discount=discount_to_apply,
+                )
+                transaction.on_commit(
+                    lambda: adjust_campaign_spend(campaign.pk, discount_to_apply),
+                )
+                return discount_to_apply
+
+            if budget_shards.has_shards(campaign.pk):
+                raise ValidationError("Campaign budget exhausted.")
+
+        return CampaignService._redeem_with_row_lock(
+            campaign_id,
+            user,
+            order_id,
+            cart_total,
+            delivery_fee,
+        )
+
+    @staticmethod
+    def _redeem_with_conditional_update(  # noqa: ANN205
+        campaign_id,  # noqa: ANN001
+        user,  # noqa: ANN001
+        order_id,  # noqa: ANN001
+        cart_total,  # noqa: ANN001
+        delivery_fee,  # noqa: ANN001
+    ):
+        """
+        Debit the budget with one guarded UPDATE instead of SELECT ... FOR UPDATE.
+
+        The discount is priced from the campaign row, read without a lock
+        inside the transaction (never from the cached snapshot, which may
+        predate a vendor's edit). The UPDATE itself re-checks is_active, the
+        active period and the budget, so the row lock is only held from that
+        statement to the commit. The daily limit is a guarded increment of
+        the user's counter in the same transaction, which keeps it exact
+        under concurrency.
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            # 1. Pricing config and daily limit, as committed right now
+            campaign = Campaign.objects.get(pk=campaign_id)
             discount_to_apply = CampaignService._calculate_discount(
                 campaign,
                 cart_total,
                 delivery_fee,
             )
+
+            # 2. Targeting
+            if not CampaignService._is_targeted_user(campaign_id, user):
+                raise ValidationError("User is not eligible.")
+
             if discount_to_apply == 0:
                 raise ValidationError("No discount applicable.")
 
-            # 5. Budget check
-            if campaign.current_spend + discount_to_apply > campaign.total_budget:
-                raise ValidationError("Campaign budget exhausted.")
+            # 3. Active, in period and within budget: one guarded statement
+            if not CampaignService._debit_budget(
+                campaign_id,
+                discount_to_apply,
+                is_active=True,
+                start_date__lte=now,
+                end_date__gte=now,
+            ):
+                raise CampaignService._rejected_debit_error(campaign_id, now)
 
-            # 6. Apply the redemption
-            campaign.current_spend += discount_to_apply
-            campaign.save(update_fields=["current_spend"])
+            # 4. Daily limit
+            CampaignService._consume_daily_usage(campaign, user, now)
 
+            # 5. Record the redemption
             Redemption.objects.create(
                 campaign=campaign,
                 user=user,
@@ -156,10 +618,178 @@ class CampaignService:
                 applied_discount=discount_to_apply,
             )
 
-            # Important: ensures visibility in concurrent tests
-            transaction.on_commit(lambda: None)
+        return discount_to_apply
+
+    @staticmethod
+    def _redeem_with_coalescing(  # noqa: ANN205
+        campaign_id,  # noqa: ANN001
+        user,  # noqa: ANN001
+        order_id,  # noqa: ANN001
+        cart_total,  # noqa: ANN001
+        delivery_fee,  # noqa: ANN001
+    ):
+        """
+        Group-commit: queue concurrent redemptions of one campaign briefly.
+
+        The queued requests are then processed under a single row lock in a
+        single transaction (see `_redeem_locked_batch`). Each caller still
+        gets its own result or error.
+        """
+        window = getattr(settings, "CAMPAIGN_COALESCE_WINDOW_MS", 5) / 1000
+        return _coalescer.submit(
+            campaign_id,
+            (user, order_id, cart_total, delivery_fee),
+            window,
+        )
 
-            return discount_to_apply
+    @staticmethod
+    def _redeem_locked_batch(campaign_id, requests) -> list:  # noqa: ANN001
+        """
+        Apply many redemptions of one campaign under one lock and transaction.
+
+        Each request is validated and recorded in its own savepoint, so one
+        bad request never fails the others. Returns, per request, either the
+        discount applied or the exception to raise to that caller. Nothing
+        is returned before the transaction commits.
+        """
+        outcomes = []
+        with transaction.atomic():
+            now = timezone.now()
+
+            # Lock campaign row once for the whole batch
+            campaign = Campaign.objects.select_for_update().get(pk=campaign_id)
+            spend = campaign.current_spend
+
+            for user, order_id, cart_total, delivery_fee in requests:
+                try:
+                    with transaction.atomic():
+                        discount_to_apply = CampaignService._validate_redemption(
+                            campaign,
+                            user,
+                            now,
+                            cart_total,
+                            delivery_fee,
+                        )
+                        if spend + discount_to_apply > campaign.total_budget:
+                            raise ValidationError("Campaign budget exhausted.")  # noqa: TRY301
+
+                        CampaignService._consume_daily_usage(campaign, user, now)
+                        Redemption.objects.create(
+                            campaign=campaign,
+                            user=user,
+                            order_id=order_id,
+                            applied_discount=discount_to_apply,
+                        )
+                except Exception as exc:  # noqa: BLE001
+                    outcomes.append(exc)
+                    continue
+
+                spend += discount_to_apply
+                outcomes.append(discount_to_apply)
+
+            if spend != campaign.current_spend:
+                delta = spend - campaign.current_spend
+                campaign.current_spend = spend
+                campaign.save(update_fields=["current_spend"])
+                transaction.on_commit(
+                    lambda: adjust_campaign_spend(campaign_id, delta),
+                )
+
+        return outcomes
+
+    @staticmethod
+    def _debit_budget(campaign_id, amount, **conditions) -> bool:  # noqa: ANN001, ANN003
+        """
+        Add `amount` to current_spend only if it stays within total_budget.
+
+        Extra `conditions` are added to the same UPDATE. Returns whether the
+        row was updated.
+        """
+        with span("budget_update"):
+            updated = Campaign.objects.filter(
+                pk=campaign_id,
+                current_spend__lte=F("total_budget") - amount,
+                **conditions,
+            ).update(current_spend=F("current_spend") + amount)
+        if not updated:
+            return False
+
+        # Queryset updates send no signals; patch the spend layer directly.
+        transaction.on_commit(lambda: adjust_campaign_spend(campaign_id, amount))
+        return True
+
+    @staticmethod
+    def _rejected_debit_error(campaign_id, now) -> ValidationError:  # noqa: ANN001
+        """Work out why a guarded debit matched no row (failure path only)."""
+        campaign = Campaign.objects.get(pk=campaign_id)
+        if not campaign.is_active:
+            return ValidationError("Campaign is not active.")
+        if not (campaign.start_date <= now <= campaign.end_date):
+            return ValidationError("Campaign is outside its active period.")
+        return ValidationError("Campaign budget exhausted.")
+
+    @staticmethod
+    def _validate_redemption(campaign, user, now, cart_total, delivery_fee):  # noqa: ANN001, ANN205
+        """Run the per-request checks shared by every redeem strategy."""
+        # 1. Active?
+        if not campaign.is_active:
+            raise ValidationError("Campaign is not active.")
+
+        # Date validity
+        if not (campaign.start_date <= now <= campaign.end_date):
+            raise ValidationError("Campaign is outside its active period.")
+
+        # 2. Targeting
+        with span("targeting"):
+            eligible = CampaignService._is_targeted_user(campaign.pk, user)
+        if not eligible:
+            raise ValidationError("User is not eligible.")
+
+        # 3. Daily limit
+        with span("usage_query"):
+            usage = CampaignService._get_daily_usage(user, [campaign.pk], now)
+        if usage.get(campaign.pk, 0) >= campaign.max_transactions_per_user_day:
+            raise ValidationError("Daily redemption limit reached.")
+
+        # 4. Calculate discount
+        with span("pricing"):
+            discount_to_apply = CampaignService._calculate_discount(
+                campaign,
+                cart_total,
+                delivery_fee,
+            )
+        if discount_to_apply == 0:
+            raise ValidationError("No discount applicable.")
+
+        return discount_to_apply
+
+    @staticmethod
+    def _consume_daily_usage(campaign, user, now) -> None:  # noqa: ANN001
+        """
+        Count the redemption against the user's daily limit.
+
+        The check in `_validate_redemption` may have raced with another
+        request that holds no lock on this campaign; the guarded increment
+        is what keeps the limit exact. Must run in the redeem transaction.
+        """
+        if not daily_usage.consume(
+            user.pk,
+            campaign.pk,
+            now.date(),
+            campaign.max_transactions_per_user_day,
+        ):
+            raise ValidationError("Daily redemption limit reached.")
+
+    @staticmethod
+    def _is_targeted_user(campaign_id, user) -> bool:  # noqa: ANN001
+        # Always the database, never the cached targeting index: a stale
+        # snapshot may still list a user who was just removed from the
+        # campaign. One EXISTS: untargeted, or the user is a target.
+        return (
+            Campaign.objects.filter(pk=campaign_id)
+            .filter(Q(target_users=None) | Q(target_users=user.pk))
+            .exists()
+        )
 
     # ORM version of calculator
     @staticmethod
@@ -178,4 +808,10 @@ class CampaignService:
             if campaign.max_discount_cap:
                 discount = min(discount, campaign.max_discount_cap)
 
-        return min(discount, base_value)
+        # Whole cents, before any budget is debited or row written: every
+        # strategy then stores, caches and returns exactly this amount.
+        return min(discount, base_value).quantize(CENT, ROUND_HALF_EVEN)
+
+
+# Process-wide: redemptions of one campaign from concurrent threads share it.
+_coalescer = RedemptionCoalescer(CampaignService._redeem_locked_batch)
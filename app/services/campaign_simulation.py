@@ -0,0 +1,307 @@
+"""
+Offline replay of available/redeem events against a snapshot of campaigns.
+
+Nothing touches Postgres or Redis while replaying: the campaigns are read
+once (from the database or a JSON file) and the event log is streamed line
+by line, so it can be far larger than memory. Each event goes through the
+same checks and discount maths as `CampaignService`, on one serial timeline
+per campaign, so the numbers are a projection without any concurrency.
+
+The log is JSON lines, sorted by ``ts`` (ISO 8601 or epoch seconds)::
+
+    {"ts": "2026-11-11T10:00:00Z", "type": "available", "user_id": 7,
+     "cart_total": "120.00", "delivery_fee": "9.90"}
+    {"ts": "2026-11-11T10:00:04Z", "type": "redeem", "user_id": 7,
+     "campaign_id": 3, "order_id": "o-1", "cart_total": "120.00",
+     "delivery_fee": "9.90"}
+"""
+
+import json
+from collections import Counter
+from datetime import UTC, datetime
+from decimal import Decimal
+from multiprocessing import Pool
+
+from app.models import Campaign
+from app.services.campaign_index import CampaignIntervalIndex, CampaignTargetingIndex
+from app.services.campaign_service import CampaignService
+
+SECONDS_PER_DAY = 86400
+
+# Rejection reasons, in the order `CampaignService` checks them.
+INACTIVE = "inactive"
+OUTSIDE_PERIOD = "outside_period"
+NOT_ELIGIBLE = "not_eligible"
+DAILY_LIMIT = "daily_limit"
+NO_DISCOUNT = "no_discount"
+BUDGET_EXHAUSTED = "budget_exhausted"
+DUPLICATE_ORDER = "duplicate_order"
+UNKNOWN_CAMPAIGN = "unknown_campaign"
+
+
+def snapshot_campaigns() -> list:
+    """Read every active campaign, with its spend and target users, once."""
+    targets = {}
+    for campaign_id, user_id in Campaign.target_users.through.objects.values_list(
+        "campaign_id",
+        "user_id",
+    ).iterator():
+        targets.setdefault(campaign_id, []).append(user_id)
+
+    return [
+        {
+            "id": c.id,
+            "name": c.name,
+            "discount_type": c.discount_type,
+            "discount_value": c.discount_value,
+            "max_discount_cap": c.max_discount_cap,
+            "scope": c.scope,
+            "start_date": c.start_date,
+            "end_date": c.end_date,
+            "total_budget": c.total_budget,
+            "current_spend": c.current_spend,
+            "max_transactions_per_user_day": c.max_transactions_per_user_day,
+            "is_active": c.is_active,
+            "target_users": targets.get(c.id, []),
+        }
+        for c in Campaign.objects.filter(is_active=True)
+    ]
+
+
+def load_campaigns(path: str) -> list:
+    """Read campaigns from a JSON list shaped like `snapshot_campaigns` output."""
+    with open(path) as fh:  # noqa: PTH123
+        return json.load(fh)
+
+
+def read_events(path: str):  # noqa: ANN201
+    """Yield the events of a JSON lines log one at a time."""
+    with open(path) as fh:  # noqa: PTH123
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _to_timestamp(value) -> float:  # noqa: ANN001
+    if isinstance(value, int | float):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+def _money(value) -> Decimal:  # noqa: ANN001
+    return Decimal(str(value)) if value is not None else Decimal("0.00")
+
+
+def _prepare(campaign: dict) -> dict:
+    cap = campaign.get("max_discount_cap")
+    return {
+        **campaign,
+        "discount_value": _money(campaign["discount_value"]),
+        "max_discount_cap": _money(cap) if cap is not None else None,
+        "total_budget": _money(campaign["total_budget"]),
+        "current_spend": _money(campaign.get("current_spend")),
+        "starts_at": _to_timestamp(campaign["start_date"]),
+        "ends_at": _to_timestamp(campaign["end_date"]),
+        "is_active": campaign.get("is_active", True),
+        "max_transactions_per_user_day": campaign.get(
+            "max_transactions_per_user_day",
+            1,
+        ),
+    }
+
+
+class CampaignSimulator:
+    """
+    Replays events against in-memory campaign state.
+
+    Daily usage is kept for the current UTC day only and dropped when the
+    log moves on to the next one, which is why events must be in time order.
+    """
+
+    def __init__(self, campaigns: list) -> None:
+        self.campaigns = {c["id"]: _prepare(c) for c in campaigns}
+        self.live = CampaignIntervalIndex(list(self.campaigns.values()))
+        self.targeting = CampaignTargetingIndex(
+            self.campaigns,
+            (
+                (c["id"], user_id)
+                for c in self.campaigns.values()
+                for user_id in c.get("target_users") or ()
+            ),
+        )
+        self.spend = {pk: c["current_spend"] for pk, c in self.campaigns.items()}
+        self.redemptions = Counter()
+        self.offered = Counter()
+        self.rejections = {pk: Counter() for pk in self.campaigns}
+        self.exhausted_at = {}
+        # Campaigns that can still show up in "available" results.
+        self._open = {
+            pk
+            for pk, c in self.campaigns.items()
+            if c["is_active"]
+            and c["discount_value"] > 0
+            and self.spend[pk] < c["total_budget"]
+        }
+        self.events = Counter()
+        self.unknown = 0
+
+        self._day = None
+        self._usage = Counter()
+        self._orders = set()
+
+    def feed(self, event: dict) -> None:
+        ts = _to_timestamp(event["ts"])
+        day = int(ts // SECONDS_PER_DAY)
+        if day != self._day:
+            self._day = day
+            self._usage.clear()
+
+        kind = event["type"]
+        self.events[kind] += 1
+        if kind == "redeem":
+            self._redeem(event, ts)
+        elif kind == "available":
+            self._available(event, ts)
+
+    def _discount(self, campaign: dict, event: dict) -> Decimal:
+        return CampaignService._calculate_discount_struct(  # noqa: SLF001
+            campaign,
+            _money(event.get("cart_total")),
+            _money(event.get("delivery_fee")),
+        )
+
+    def _available(self, event: dict, ts: float) -> None:
+        # Only whether each discount is positive matters here, and that
+        # depends on the sign of the base, not on the exact amount.
+        user_id = event["user_id"]
+        has_cart = _money(event.get("cart_total")) > 0
+        has_delivery = _money(event.get("delivery_fee")) > 0
+        for c in self.live.live_at(ts):
+            pk = c["id"]
+            if (
+                pk in self._open
+                and (has_cart if c["scope"] == Campaign.SCOPE_CART else has_delivery)
+                and self._usage[pk, user_id] < c["max_transactions_per_user_day"]
+                and self.targeting.is_eligible(user_id, pk)
+            ):
+                self.offered[pk] += 1
+
+    def _redeem(self, event: dict, ts: float) -> None:
+        pk = event["campaign_id"]
+        campaign = self.campaigns.get(pk)
+        if campaign is None:
+            self.unknown += 1
+            return
+
+        user_id = event["user_id"]
+        order_id = event.get("order_id")
+        if not campaign["is_active"]:
+            reason = INACTIVE
+        elif not (campaign["starts_at"] <= ts <= campaign["ends_at"]):
+            reason = OUTSIDE_PERIOD
+        elif not self.targeting.is_eligible(user_id, pk):
+            reason = NOT_ELIGIBLE
+        elif self._usage[pk, user_id] >= campaign["max_transactions_per_user_day"]:
+            reason = DAILY_LIMIT
+        elif (amount := self._discount(campaign, event)) == 0:
+            reason = NO_DISCOUNT
+        elif (pk, order_id) in self._orders:
+            reason = DUPLICATE_ORDER
+        elif self.spend[pk] + amount > campaign["total_budget"]:
+            reason = BUDGET_EXHAUSTED
+            self.exhausted_at.setdefault(pk, ts)
+        else:
+            reason = None
+
+        if reason is not None:
+            self.rejections[pk][reason] += 1
+            return
+
+        self.spend[pk] += amount
+        self.redemptions[pk] += 1
+        self._usage[pk, user_id] += 1
+        if order_id is not None:
+            self._orders.add((pk, order_id))
+        if self.spend[pk] >= campaign["total_budget"]:
+            self.exhausted_at.setdefault(pk, ts)
+            self._open.discard(pk)
+
+    def result(self) -> dict:
+        campaigns = {}
+        for pk, c in self.campaigns.items():
+            exhausted_at = self.exhausted_at.get(pk)
+            campaigns[pk] = {
+                "name": c.get("name", ""),
+                "total_budget": c["total_budget"],
+                "spend": self.spend[pk],
+                "remaining": c["total_budget"] - self.spend[pk],
+                "redemptions": self.redemptions[pk],
+                "offered": self.offered[pk],
+                "exhausted_at": (
+                    datetime.fromtimestamp(exhausted_at, UTC).isoformat()
+                    if exhausted_at is not None
+                    else None
+                ),
+                "rejections": dict(self.rejections[pk]),
+            }
+
+        rejections = Counter()
+        for counts in self.rejections.values():
+            rejections.update(counts)
+        if self.unknown:
+            rejections[UNKNOWN_CAMPAIGN] += self.unknown
+
+        return {
+            "events": dict(self.events),
+            "rejections": dict(rejections),
+            "campaigns": campaigns,
+        }
+
+
+def _simulate_shard(args: tuple) -> dict:
+    path, campaigns, shard, shards = args
+    simulator = CampaignSimulator(campaigns)
+    for event in read_events(path):
+        # "available" events concern every campaign, so every shard sees them.
+        if event["type"] != "redeem" or event["campaign_id"] % shards == shard:
+            simulator.feed(event)
+    return simulator.result()
+
+
+def simulate(path: str, campaigns: list, workers: int = 1) -> dict:
+    """
+    Replay the log at `path` against `campaigns` and return the projection.
+
+    With ``workers > 1`` campaigns are split by ``id % workers`` and every
+    worker process streams the whole log, keeping only the events of its own
+    campaigns. Campaigns never share state, so the shards merge exactly.
+    """
+    if workers <= 1:
+        simulator = CampaignSimulator(campaigns)
+        for event in read_events(path):
+            simulator.feed(event)
+        return simulator.result()
+
+    shards = [
+        (path, [c for c in campaigns if c["id"] % workers == shard], shard, workers)
+        for shard in range(workers)
+    ]
+    with Pool(workers) as pool:
+        parts = pool.map(_simulate_shard, shards)
+
+    # Redeems were split between shards; everything else was seen by all.
+    events = {**parts[0]["events"], "redeem": 0}
+    rejections, merged = Counter(), {}
+    for part in parts:
+        events["redeem"] += part["events"].get("redeem", 0)
+        rejections.update(part["rejections"])
+        merged.update(part["campaigns"])
+    return {
+        "events": events,
+        "rejections": dict(rejections),
+        "campaigns": dict(sorted(merged.items())),
+    }
@@ -0,0 +1,177 @@
+"""
+Per-campaign hourly redemption stats, rolled up incrementally.
+
+`rollup` reads redemptions past a stored cursor (by id) and folds them
+into `CampaignHourlyStats` rows, so every run only touches new rows and
+redeem itself never writes stats. `get_series` answers from the rollup
+table alone: its cost depends on the number of buckets requested, not on
+how many redemptions the campaign has.
+
+Redemptions younger than `ROLLUP_LAG` are left for the next run, and the
+cursor stops at the first of them: ids are assigned before commit, so a
+lower id can still show up a moment after a higher one. Redeem
+transactions are expected to commit well within the lag.
+"""
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import CampaignHourlyStats, Redemption, RollupCursor
+from app.services.hyperloglog import HyperLogLog
+
+CURSOR_NAME = "campaign_hourly_stats"
+ROLLUP_LAG = datetime.timedelta(seconds=60)
+BUCKETS = {
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1),
+}
+
+
+def _floor(moment: datetime.datetime, bucket: str) -> datetime.datetime:
+    moment = moment.astimezone(datetime.UTC).replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def rollup(batch_size: int = 10000, lag: datetime.timedelta = ROLLUP_LAG) -> int:
+    """Fold new redemptions into the hourly stats; returns how many were read."""
+    rolled = 0
+    while True:
+        count = _rollup_batch(batch_size, timezone.now() - lag)
+        rolled += count
+        if count < batch_size:
+            return rolled
+
+
+def _rollup_batch(batch_size: int, cutoff: datetime.datetime) -> int:
+    with transaction.atomic():
+        cursor, _ = RollupCursor.objects.select_for_update().get_or_create(
+            name=CURSOR_NAME,
+        )
+        rows = []
+        for row in (
+            Redemption.objects.filter(pk__gt=cursor.position)
+            .order_by("pk")
+            .values_list(
+                "pk",
+                "campaign_id",
+                "user_id",
+                "applied_discount",
+                "redeemed_at",
+            )[:batch_size]
+        ):
+            if row[4] >= cutoff:
+                break
+            rows.append(row)
+        if not rows:
+            return 0
+
+        # [redemptions, discount_total, users sketch] per (campaign, hour)
+        totals = defaultdict(lambda: [0, Decimal("0.00"), HyperLogLog()])
+        for _, campaign_id, user_id, amount, redeemed_at in rows:
+            bucket = totals[campaign_id, _floor(redeemed_at, "hour")]
+            bucket[0] += 1
+            bucket[1] += amount
+            bucket[2].add(user_id)
+
+        existing = CampaignHourlyStats.objects.select_for_update().filter(
+            campaign_id__in={campaign_id for campaign_id, _ in totals},
+            hour__in={hour for _, hour in totals},
+        )
+        for stats in existing:
+            bucket = totals.get((stats.campaign_id, stats.hour))
+            if bucket is not None:
+                bucket[0] += stats.redemptions
+                bucket[1] += stats.discount_total
+                bucket[2].merge(HyperLogLog(stats.users_sketch))
+
+        CampaignHourlyStats.objects.bulk_create(
+            [
+                CampaignHourlyStats(
+                    campaign_id=campaign_id,
+                    hour=hour,
+                    redemptions=redemptions,
+                    discount_total=discount_total,
+                    users_sketch=users.to_bytes(),
+                )
+                for (campaign_id, hour), (redemptions, discount_total, users) in (
+                    totals.items()
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["campaign", "hour"],
+            update_fields=["redemptions", "discount_total", "users_sketch"],
+        )
+
+        cursor.position = rows[-1][0]
+        cursor.save(update_fields=["position", "updated_at"])
+    return len(rows)
+
+
+def rolled_up_at():  # noqa: ANN201
+    """When the rollup last advanced, or None if it never ran."""
+    return (
+        RollupCursor.objects.filter(name=CURSOR_NAME)
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+
+
+def get_series(
+    campaign_id: int,
+    since: datetime.datetime,
+    until: datetime.datetime,
+    bucket: str = "hour",
+) -> dict:
+    """
+    Redemptions, discount and approximate distinct users per `bucket`.
+
+    Every bucket from the one containing `since` up to the one containing
+    `until` is returned, empty ones included, along with totals over the
+    whole range.
+    """
+    step = BUCKETS[bucket]
+    start = _floor(since, bucket)
+    end = _floor(until, bucket) + step
+
+    series = {}
+    moment = start
+    while moment < end:
+        series[moment] = [0, Decimal("0.00"), HyperLogLog()]
+        moment += step
+
+    total_users = HyperLogLog()
+    for stats in CampaignHourlyStats.objects.filter(
+        campaign_id=campaign_id,
+        hour__gte=start,
+        hour__lt=end,
+    ):
+        users = HyperLogLog(stats.users_sketch)
+        point = series[_floor(stats.hour, bucket)]
+        point[0] += stats.redemptions
+        point[1] += stats.discount_total
+        point[2].merge(users)
+        total_users.merge(users)
+
+    return {
+        "series": [
+            {
+                "start": moment,
+                "redemptions": redemptions,
+                "discount_total": discount_total,
+                "users": users.count(),
+            }
+            for moment, (redemptions, discount_total, users) in series.items()
+        ],
+        "redemptions": sum(point[0] for point in series.values()),
+        "discount_total": sum(
+            (point[1] for point in series.values()),
+            Decimal("0.00"),
+        ),
+        "users": total_users.count(),
+    }
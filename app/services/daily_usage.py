@@ -0,0 +1,102 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from app.models import Redemption, UserCampaignDailyUsage
+
+# Today plus yesterday, so a request straddling midnight still finds its day.
+KEEP_DAYS = 2
+PRUNED_KEY_PREFIX = "daily_usage:pruned"
+
+
+def get_usage(user_id: int, campaign_ids, day: datetime.date) -> dict:  # noqa: ANN001
+    """Return ``{campaign_id: redemptions on `day`}`` for one user."""
+    return dict(
+        UserCampaignDailyUsage.objects.filter(
+            user_id=user_id,
+            campaign_id__in=campaign_ids,
+            day=day,
+        ).values_list("campaign_id", "count"),
+    )
+
+
+def consume(user_id: int, campaign_id: int, day: datetime.date, limit: int) -> bool:
+    """
+    Count one more redemption on `day` if that stays within `limit`.
+
+    A single guarded UPDATE, so concurrent redemptions can never push the
+    count past the limit; the first redemption of the day inserts the row.
+    Call it inside the redeem transaction so a failed redemption rolls the
+    count back.
+    """
+    usage = UserCampaignDailyUsage.objects.filter(
+        user_id=user_id,
+        campaign_id=campaign_id,
+        day=day,
+        count__lt=limit,
+    )
+    if usage.update(count=F("count") + 1):
+        return True
+    if limit < 1:
+        return False
+
+    try:
+        with transaction.atomic():
+            UserCampaignDailyUsage.objects.create(
+                user_id=user_id,
+                campaign_id=campaign_id,
+                day=day,
+                count=1,
+            )
+    except IntegrityError:
+        # Already there: at the limit, or inserted by a concurrent request.
+        return bool(usage.update(count=F("count") + 1))
+
+    transaction.on_commit(lambda: _prune_once(day))
+    return True
+
+
+def _prune_once(day: datetime.date) -> None:
+    """Drop expired days, once per day across all processes."""
+    if cache.add(f"{PRUNED_KEY_PREFIX}:{day.isoformat()}", 1, 60 * 60 * 24):
+        prune(day)
+
+
+def prune(today: datetime.date) -> int:
+    """Delete usage older than `KEEP_DAYS` days before `today`."""
+    cutoff = today - datetime.timedelta(days=KEEP_DAYS - 1)
+    deleted, _ = UserCampaignDailyUsage.objects.filter(day__lt=cutoff).delete()
+    return deleted
+
+
+def backfill(days: int = KEEP_DAYS, batch_size: int = 5000) -> int:
+    """
+    Rebuild usage rows from the redemptions of the last `days` days.
+
+    Existing rows for those days are overwritten with the recount.
+    """
+    today = timezone.now().astimezone(datetime.UTC).date()
+    since = datetime.datetime.combine(
+        today - datetime.timedelta(days=days - 1),
+        datetime.time.min,
+        tzinfo=datetime.UTC,
+    )
+    counts = (
+        Redemption.objects.filter(redeemed_at__gte=since)
+        .annotate(day=TruncDate("redeemed_at", tzinfo=datetime.UTC))
+        .values("user_id", "campaign_id", "day")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    rows = UserCampaignDailyUsage.objects.bulk_create(
+        (UserCampaignDailyUsage(**row) for row in counts.iterator()),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user", "campaign", "day"],
+        update_fields=["count"],
+    )
+    return len(rows)
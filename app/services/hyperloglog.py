@@ -0,0 +1,54 @@
+"""
+HyperLogLog sketch for approximate distinct counts.
+
+2**11 one-byte registers (2 KiB) give a standard error of about 2.3%.
+Sketches of the same precision merge by taking the register-wise max, so
+per-hour sketches combine into any range without the underlying values.
+"""
+
+import hashlib
+
+import numpy as np
+
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+_VALUE_BITS = 64 - PRECISION
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+def _hash(value: int) -> int:
+    # Stable across processes, unlike hash(); ints would hash to themselves.
+    digest = hashlib.blake2b(value.to_bytes(8, "little", signed=True), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+class HyperLogLog:
+    def __init__(self, registers: bytes | None = None) -> None:
+        if registers:
+            self.registers = np.frombuffer(bytes(registers), dtype=np.uint8).copy()
+        else:
+            self.registers = np.zeros(REGISTERS, dtype=np.uint8)
+
+    def add(self, value: int) -> None:
+        h = _hash(value)
+        index = h >> _VALUE_BITS
+        # Position of the leftmost 1 bit among the remaining bits.
+        rank = _VALUE_BITS - (h & _VALUE_MASK).bit_length() + 1
+        self.registers[index] = max(self.registers[index], rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        estimate = (
+            _ALPHA * REGISTERS**2 / np.ldexp(1.0, -self.registers.astype(int)).sum()
+        )
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * REGISTERS and zeros:
+            # Small range: linear counting is more accurate.
+            estimate = REGISTERS * np.log(REGISTERS / zeros)
+        return round(float(estimate))
+
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class RedemptionCoalescer:
+    """
+    Group concurrent requests for the same key into one batch.
+
+    The first caller for a key becomes the batch leader: it waits `window`
+    seconds for more callers to join, then hands the whole batch to
+    `process_batch(key, payloads)`, which must return one outcome per payload
+    (a result, or an exception instance to raise in that caller). Every
+    caller blocks until its own outcome is ready.
+
+    Coalescing only happens between threads of one process, so it needs a
+    threaded server (e.g. gunicorn ``--threads``) to have any effect.
+    """
+
+    def __init__(self, process_batch) -> None:  # noqa: ANN001
+        self._process_batch = process_batch
+        self._lock = threading.Lock()
+        self._open = {}
+
+    def submit(self, key, payload, window: float):  # noqa: ANN001, ANN201
+        future = Future()
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = []
+            batch.append((payload, future))
+
+        if leader:
+            time.sleep(window)
+            with self._lock:
+                batch = self._open.pop(key)
+            self._run(key, batch)
+
+        return future.result()
+
+    def _run(self, key, batch: list) -> None:  # noqa: ANN001
+        try:
+            outcomes = self._process_batch(key, [payload for payload, _ in batch])
+        except Exception as exc:  # noqa: BLE001
+            outcomes = [exc] * len(batch)
+
+        for (_, future), outcome in zip(batch, outcomes, strict=True):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
@@ -0,0 +1,110 @@
+"""
+Streaming export of redemptions as CSV or NDJSON.
+
+Rows are read as tuples with `values_list(...).iterator()`, which uses a
+server-side cursor on Postgres, and are encoded and sent a chunk at a
+time, so memory stays flat however many rows are exported.
+"""
+
+import csv
+import json
+
+from app.models import Redemption
+
+CHUNK_SIZE = 2000
+COLUMNS = (
+    "id",
+    "redeemed_at",
+    "campaign_id",
+    "vendor_id",
+    "user_id",
+    "order_id",
+    "applied_discount",
+)
+_FIELDS = (
+    "id",
+    "redeemed_at",
+    "campaign_id",
+    "campaign__vendor_id",
+    "user_id",
+    "order_id",
+    "applied_discount",
+)
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def get_rows(campaign_id=None, vendor_id=None, since=None, until=None):  # noqa: ANN001, ANN201
+    """Yield matching redemptions as tuples in `COLUMNS` order, oldest first."""
+    rows = Redemption.objects.all()
+    if campaign_id is not None:
+        rows = rows.filter(campaign_id=campaign_id)
+    if vendor_id is not None:
+        rows = rows.filter(campaign__vendor_id=vendor_id)
+    if since is not None:
+        rows = rows.filter(redeemed_at__gte=since)
+    if until is not None:
+        rows = rows.filter(redeemed_at__lt=until)
+    return (
+        rows.order_by("redeemed_at", "id")
+        .values_list(*_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+class _Buffer:
+    """Collects what `csv.writer` writes, so it can be yielded."""
+
+    def __init__(self) -> None:
+        self.parts = []
+
+    def write(self, value: str) -> None:
+        self.parts.append(value)
+
+    def pop(self) -> str:
+        value = "".join(self.parts)
+        self.parts.clear()
+        return value
+
+
+def _chunks(rows):  # noqa: ANN001, ANN202
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(rows):  # noqa: ANN001, ANN201
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.pop()
+    for chunk in _chunks(rows):
+        writer.writerows(
+            (pk, redeemed_at.isoformat(), *rest) for pk, redeemed_at, *rest in chunk
+        )
+        yield buffer.pop()
+
+
+def stream_ndjson(rows):  # noqa: ANN001, ANN201
+    for chunk in _chunks(rows):
+        yield "".join(
+            json.dumps(
+                {
+                    **dict(zip(COLUMNS, row, strict=True)),
+                    "redeemed_at": row[1].isoformat(),
+                    "applied_discount": str(row[6]),
+                },
+            )
+            + "\n"
+            for row in chunk
+        )
+
+
+STREAMS = {"csv": stream_csv, "ndjson": stream_ndjson}
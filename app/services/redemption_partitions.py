@@ -0,0 +1,183 @@
+"""
+Monthly partitions of the redemption table, and archival of old months.
+
+On Postgres `Redemption` is range-partitioned on ``redeemed_at``, one
+partition per UTC month (``app_redemption_p2026_11``) plus a default
+partition that catches rows for months nobody created. Each partition has
+its own, small indexes, so inserts never maintain an index over the whole
+history, and an old month is removed by detaching its partition instead of
+deleting rows.
+
+On other databases the table is not partitioned: partitions are not
+created, and archiving deletes the rows of the month instead.
+"""
+
+import datetime
+
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Sum
+from django.db.models.functions import TruncDate
+
+from app.models import RedeemedOrder, Redemption, RedemptionDailySummary
+
+PARENT_TABLE = Redemption._meta.db_table  # noqa: SLF001
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    """First day of the month `months` after the month of `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> datetime.date:
+    return datetime.datetime.now(tz=datetime.UTC).date().replace(day=1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def _month_bounds(month: datetime.date) -> tuple:
+    start = datetime.datetime.combine(month, datetime.time.min, tzinfo=datetime.UTC)
+    end = datetime.datetime.combine(
+        add_months(month, 1),
+        datetime.time.min,
+        tzinfo=datetime.UTC,
+    )
+    return start, end
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [PARENT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> dict:
+    """Return ``{month: partition name}`` of the attached monthly partitions."""
+    if not is_partitioned():
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [PARENT_TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+
+    prefix = f"{PARENT_TABLE}_p"
+    partitions = {}
+    for name in names:
+        if name.startswith(prefix):
+            year, month = name.removeprefix(prefix).split("_")
+            partitions[datetime.date(int(year), int(month), 1)] = name
+    return dict(sorted(partitions.items()))
+
+
+def create_partitions(months_ahead: int) -> list:
+    """
+    Create the partitions from this month to `months_ahead` months ahead.
+
+    Returns the names of the partitions created; existing ones are skipped.
+    Fails if the default partition already holds rows for a missing month;
+    archive or move those rows first.
+    """
+    if not is_partitioned():
+        return []
+
+    existing = list_partitions()
+    created = []
+    for i in range(months_ahead + 1):
+        month = add_months(current_month(), i)
+        if month in existing:
+            continue
+        start, end = _month_bounds(month)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        created.append(partition_name(month))
+    return created
+
+
+def archivable_months(keep_months: int) -> list:
+    """Months holding redemptions or a partition, older than `keep_months`."""
+    cutoff = add_months(current_month(), -keep_months)
+    months = {month for month in list_partitions() if month < cutoff}
+
+    oldest = (
+        Redemption.objects.order_by("redeemed_at")
+        .values_list("redeemed_at", flat=True)
+        .first()
+    )
+    if oldest is not None:
+        month = oldest.astimezone(datetime.UTC).date().replace(day=1)
+        while month < cutoff:
+            months.add(month)
+            month = add_months(month, 1)
+    return sorted(months)
+
+
+def archive_month(month: datetime.date, *, drop: bool = True) -> int:
+    """
+    Roll the redemptions of `month` into `RedemptionDailySummary` rows.
+
+    Then the month's partition is detached and, with `drop`, dropped; left
+    detached, it can still be dumped or queried as a plain table. Order ids
+    of the month become redeemable again. Returns the number of summary
+    rows written.
+
+    Detaching briefly takes an exclusive lock on the redemption table, so
+    run this off-peak.
+    """
+    start, end = _month_bounds(month)
+    rows = Redemption.objects.filter(redeemed_at__gte=start, redeemed_at__lt=end)
+
+    with transaction.atomic():
+        summaries = (
+            rows.annotate(day=TruncDate("redeemed_at", tzinfo=datetime.UTC))
+            .values("campaign_id", "day")
+            .annotate(
+                redemptions=Count("id"),
+                users=Count("user_id", distinct=True),
+                discount_total=Sum("applied_discount"),
+            )
+            .order_by()
+        )
+        written = RedemptionDailySummary.objects.bulk_create(
+            (RedemptionDailySummary(**summary) for summary in summaries.iterator()),
+            batch_size=5000,
+            update_conflicts=True,
+            unique_fields=["campaign", "day"],
+            update_fields=["redemptions", "users", "discount_total"],
+        )
+
+        RedeemedOrder.objects.filter(
+            Exists(
+                rows.filter(
+                    campaign_id=OuterRef("campaign_id"),
+                    order_id=OuterRef("order_id"),
+                ),
+            ),
+        ).delete()
+
+        name = list_partitions().get(month)
+        if name is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+                if drop:
+                    cursor.execute(f"DROP TABLE {name}")
+
+        # Unpartitioned table, or stray rows in the default partition.
+        rows.delete()
+
+    return len(written)
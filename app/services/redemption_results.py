@@ -0,0 +1,80 @@
+"""
+Results of completed redemptions, keyed by ``(campaign_id, order_id)``.
+
+Once a redemption commits its result is cached, so a retried request is
+answered without touching the campaign row. Concurrent duplicates are
+collapsed with a short claim: the first request redeems and the others
+wait for its result.
+"""
+
+import time
+import uuid
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from django.core.cache import cache
+
+RESULT_KEY_PREFIX = "redemption_result"
+CLAIM_KEY_PREFIX = "redemption_claim"
+# Long enough to cover clients retrying after an app restart or a timeout.
+RESULT_TTL = 60 * 60 * 24
+# Upper bound on one redemption; a claim expires on its own if a worker dies.
+CLAIM_TTL = 30
+# How long a duplicate waits for the first request's result.
+CLAIM_WAIT = 5
+CLAIM_POLL_INTERVAL = 0.01
+
+
+def _result_key(campaign_id: int, order_id: str) -> str:
+    return f"{RESULT_KEY_PREFIX}:{campaign_id}:{order_id}"
+
+
+def _claim_key(campaign_id: int, order_id: str) -> str:
+    return f"{CLAIM_KEY_PREFIX}:{campaign_id}:{order_id}"
+
+
+def get(campaign_id: int, order_id: str):  # noqa: ANN201
+    """Return ``(user_id, discount_applied)`` of a completed redemption, or None."""
+    value = cache.get(_result_key(campaign_id, order_id))
+    if value is None:
+        return None
+    user_id, cents = value
+    return user_id, Decimal(cents).scaleb(-2)
+
+
+def remember(campaign_id: int, order_id: str, user_id: int, amount: Decimal) -> None:
+    # Discounts are priced in whole cents already; rounding only guards a
+    # caller passing more places, never truncating them.
+    cents = int((amount * 100).to_integral_value(ROUND_HALF_EVEN))
+    cache.set(_result_key(campaign_id, order_id), (user_id, cents), RESULT_TTL)
+
+
+def claim(campaign_id: int, order_id: str):  # noqa: ANN201
+    """Claim the redemption of an order; returns a token, or None if taken."""
+    token = uuid.uuid4().hex
+    if cache.add(_claim_key(campaign_id, order_id), token, CLAIM_TTL):
+        return token
+    return None
+
+
+def release(campaign_id: int, order_id: str, token: str) -> None:
+    key = _claim_key(campaign_id, order_id)
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def wait(campaign_id: int, order_id: str):  # noqa: ANN201
+    """
+    Wait for the claim holder's result.
+
+    Returns None once the claim is gone without a result (the first attempt
+    failed) or after `CLAIM_WAIT`, so the caller can redeem itself.
+    """
+    deadline = time.monotonic() + CLAIM_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(CLAIM_POLL_INTERVAL)
+        result = get(campaign_id, order_id)
+        if result is not None:
+            return result
+        if cache.get(_claim_key(campaign_id, order_id)) is None:
+            return get(campaign_id, order_id)
+    return None
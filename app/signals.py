@@ -1,13 +1,49 @@
 # campaign/signals.py
 
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
 from .models import Campaign
-from .services.cache_service import invalidate_campaign_cache
+from .services import budget_reservation, budget_shards
+from .services.cache_service import (
+    delete_campaign_spend,
+    invalidate_campaign_cache,
+)
+
+# Saves touching only these fields are live budget updates, not config edits.
+SPEND_FIELDS = frozenset({"current_spend"})
 
 
 @receiver(post_save, sender=Campaign)
+def sync_cache_on_save(sender, instance, update_fields=None, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    if update_fields is not None and frozenset(update_fields) <= SPEND_FIELDS:
+        # Redeem paths patch the spend layer themselves with an increment on
+        # commit; writing the absolute value here could go backwards when
+        # two commits run their callbacks out of order.
+        return
+
+    # total_budget may have changed: keep any budget shards in line with it.
+    budget_shards.sync_total_budgets([instance])
+
+    campaign_id = instance.pk
+    transaction.on_commit(lambda: delete_campaign_spend(campaign_id))
+    transaction.on_commit(invalidate_campaign_cache)
+    if budget_reservation.is_enabled():
+        # Budget config may have changed: reseed the counter from Postgres.
+        transaction.on_commit(lambda: budget_reservation.forget(campaign_id))
+
+
 @receiver(post_delete, sender=Campaign)
-def clear_cache_on_change(sender, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
-    invalidate_campaign_cache()
+def clear_cache_on_delete(sender, instance, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    delete_campaign_spend(instance.pk)
+    transaction.on_commit(invalidate_campaign_cache)
+    if budget_reservation.is_enabled():
+        campaign_id = instance.pk
+        transaction.on_commit(lambda: budget_reservation.forget(campaign_id))
+
+
+@receiver(m2m_changed, sender=Campaign.target_users.through)
+def clear_cache_on_targeting_change(sender, action, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG001
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(invalidate_campaign_cache)
@@ -1,21 +1,126 @@
+import datetime
+import json
+import os
+import random
+import shutil
+import tempfile
 import threading
+import time
 from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
+import fakeredis
 from django.contrib.auth import get_user_model
-from django.test import TransactionTestCase
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.handlers.base import BaseHandler
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection
+from django.db.models import F, Sum
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from rest_framework.test import APIClient
 
-from app.models import Campaign, Redemption
+from app import benchmarks, metrics
+from app.middleware import RequestMetricsMiddleware, prune_profiles
+from app.models import (
+    Campaign,
+    CampaignHourlyStats,
+    RedeemedOrder,
+    Redemption,
+    RedemptionDailySummary,
+    UserCampaignDailyUsage,
+)
+from app.services import (
+    batch_pricing,
+    budget_reservation,
+    budget_shards,
+    cache_service,
+    campaign_bulk,
+    campaign_lifecycle,
+    campaign_simulation,
+    campaign_stats,
+    daily_usage,
+    redemption_export,
+    redemption_partitions,
+)
+from app.services.cache_service import (
+    get_cached_active_campaigns,
+    get_campaign_spends,
+)
+from app.services.campaign_index import (
+    CampaignIntervalIndex,
+    CampaignTargetingIndex,
+)
 from app.services.campaign_service import CampaignService
+from app.services.hyperloglog import HyperLogLog
+from app.services.redemption_coalescer import RedemptionCoalescer
 
 User = get_user_model()
 
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+# In-process Redis that runs the reservation Lua scripts like the real one.
+FAKE_REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "redis://fakeredis:6379/0",
+        "OPTIONS": {
+            "CONNECTION_POOL_KWARGS": {
+                "connection_class": fakeredis.FakeConnection,
+                "server": fakeredis.FakeServer(),
+            },
+        },
+    },
+}
+
+
+def make_campaign(**overrides):  # noqa: ANN003, ANN201
+    now = timezone.now()
+    fields = {
+        "name": "Campaign",
+        "sponsor_type": Campaign.SPONSOR_PLATFORM,
+        "scope": Campaign.SCOPE_CART,
+        "discount_type": Campaign.TYPE_FIXED,
+        "discount_value": Decimal("10.00"),
+        "total_budget": Decimal("1000.00"),
+        "max_transactions_per_user_day": 1,
+        "start_date": now - timezone.timedelta(hours=1),
+        "end_date": now + timezone.timedelta(days=1),
+        "is_active": True,
+    }
+    fields.update(overrides)
+    return Campaign.objects.create(**fields)
+
 
 class ConcurrentBudgetTest(TransactionTestCase):
     """Tests that SELECT FOR UPDATE budget locking works under concurrency."""
 
     reset_sequences = True
 
+    def setUp(self) -> None:
+        # Ids restart with every test, so results cached by earlier tests
+        # would look like completed redemptions of this test's orders.
+        cache.clear()
+
+    def prepare_campaign(self, campaign: Campaign) -> None:
+        """Hook for strategy-specific setup of the contended campaign."""
+
+    def settle_budget(self, campaign: Campaign) -> None:
+        """Hook to fold strategy-specific spend back into current_spend."""
+
     def test_race_condition_on_budget(self) -> None:
         """Budget = $20, each redemption = $10 → Only 2 redemptions must succeed."""
         user = User.objects.create_user(username="tester", password="pass")  # noqa: S106
@@ -35,6 +140,7 @@ class ConcurrentBudgetTest(TransactionTestCase):
             end_date=timezone.now() + timezone.timedelta(days=1),
             is_active=True,
         )
+        self.prepare_campaign(campaign)
 
         results = []
         lock = threading.Lock()
@@ -65,6 +171,7 @@ class ConcurrentBudgetTest(TransactionTestCase):
             t.join()
 
         successes = results.count(True)
+        self.settle_budget(campaign)
         campaign.refresh_from_db()
 
         # Validate exactly 2 success
@@ -80,3 +187,1854 @@ class ConcurrentBudgetTest(TransactionTestCase):
         # Sanity check: DB must contain exactly 2 redemption rows
         redemption_count = Redemption.objects.filter(campaign=campaign).count()
         self.assertEqual(redemption_count, 2)  # noqa: PT009
+
+
+@override_settings(CAMPAIGN_REDEEM_STRATEGY="conditional_update")
+class ConditionalUpdateBudgetTest(ConcurrentBudgetTest):
+    """The no-overspend guarantee holds with the guarded single UPDATE."""
+
+    def test_prices_from_the_row_not_the_cached_snapshot(self) -> None:
+        user = User.objects.create_user(username="checkout")
+        campaign = make_campaign(max_transactions_per_user_day=5)
+        get_cached_active_campaigns()
+        # A queryset update fires no signal: the snapshot keeps the old
+        # discount and daily limit.
+        Campaign.objects.filter(pk=campaign.pk).update(
+            discount_value=Decimal("5.00"),
+            max_transactions_per_user_day=1,
+        )
+
+        def redeem(order_id: str) -> Decimal:
+            return CampaignService.redeem_campaign(
+                campaign_id=campaign.pk,
+                user=user,
+                order_id=order_id,
+                cart_total=Decimal("100.00"),
+                delivery_fee=Decimal("0.00"),
+            )
+
+        self.assertEqual(redeem("order_1"), Decimal("5.00"))  # noqa: PT009
+        with self.assertRaisesMessage(ValidationError, "Daily redemption"):
+            redeem("order_2")
+
+
+@override_settings(
+    CAMPAIGN_REDEEM_STRATEGY="coalesced",
+    CAMPAIGN_COALESCE_WINDOW_MS=200,
+)
+class CoalescedBudgetTest(ConcurrentBudgetTest):
+    """Group-committed redemptions keep the no-overspend guarantee."""
+
+    def test_concurrent_redemptions_share_one_transaction(self) -> None:
+        with mock.patch.object(
+            CampaignService,
+            "_redeem_locked_batch",
+            wraps=CampaignService._redeem_locked_batch,  # noqa: SLF001
+        ) as batch:
+            coalescer = RedemptionCoalescer(batch)
+            with mock.patch("app.services.campaign_service._coalescer", coalescer):
+                self.test_race_condition_on_budget()
+
+        self.assertEqual(batch.call_count, 1)  # noqa: PT009
+
+
+@override_settings(
+    CAMPAIGN_REDEEM_STRATEGY="redis_reservation",
+    CACHES=FAKE_REDIS_CACHES,
+)
+class RedisReservationBudgetTest(ConcurrentBudgetTest):
+    """The no-overspend guarantee holds when budget is reserved in Redis."""
+
+    def test_batch_redeem_takes_the_reservation(self) -> None:
+        user = User.objects.create_user(username="checkout")
+        campaign = make_campaign(total_budget=Decimal("50.00"))
+        budget_reservation.set_remaining(campaign.pk, Decimal("50.00"))
+
+        CampaignService.redeem_campaigns(
+            campaign_ids=[campaign.pk],
+            user=user,
+            order_id="order_1",
+            cart_total=Decimal("100.00"),
+            delivery_fee=Decimal("0.00"),
+        )
+
+        self.assertEqual(  # noqa: PT009
+            budget_reservation.get_remaining(campaign.pk),
+            Decimal("40.00"),
+        )
+
+    def test_fractional_reservation_matches_the_stored_spend(self) -> None:
+        user = User.objects.create_user(username="checkout")
+        campaign = make_campaign(
+            discount_type=Campaign.TYPE_PERCENTAGE,
+            discount_value=Decimal("10.00"),
+            total_budget=Decimal("50.00"),
+            max_transactions_per_user_day=2,
+        )
+
+        for order_id in ("order_1", "order_2"):
+            CampaignService.redeem_campaign(
+                campaign_id=campaign.pk,
+                user=user,
+                order_id=order_id,
+                cart_total=Decimal("41.25"),
+                delivery_fee=Decimal("0.00"),
+            )
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.current_spend, Decimal("8.24"))  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            budget_reservation.get_remaining(campaign.pk),
+            campaign.total_budget - campaign.current_spend,
+        )
+
+    def test_reconcile_fixes_drift(self) -> None:
+        campaign = make_campaign(total_budget=Decimal("50.00"))
+        budget_reservation.set_remaining(campaign.pk, Decimal("7.00"))
+
+        call_command("reconcile_budget_reservations", stdout=StringIO())
+
+        self.assertEqual(  # noqa: PT009
+            budget_reservation.get_remaining(campaign.pk),
+            Decimal("50.00"),
+        )
+
+
+@override_settings(CAMPAIGN_REDEEM_STRATEGY="sharded")
+class ShardedBudgetTest(ConcurrentBudgetTest):
+    """Budget split over two $10 shards: redemptions spill over when one is dry."""
+
+    def prepare_campaign(self, campaign: Campaign) -> None:
+        budget_shards.provision(campaign.pk, shards=2)
+
+    def settle_budget(self, campaign: Campaign) -> None:
+        budget_shards.rollup([campaign.pk])
+        self.assertEqual(  # noqa: PT009
+            sorted(campaign.budget_shards.values_list("spend", flat=True)),
+            [Decimal("10.00"), Decimal("10.00")],
+        )
+
+    def _sharded_campaign(self) -> Campaign:
+        self.user = User.objects.create_user(username="checkout")
+        campaign = make_campaign(
+            total_budget=Decimal("20.00"),
+            max_transactions_per_user_day=5,
+        )
+        budget_shards.provision(campaign.pk, shards=2)
+        return campaign
+
+    def _redeem(self, campaign: Campaign, order_id: str) -> Decimal:
+        return CampaignService.redeem_campaign(
+            campaign_id=campaign.pk,
+            user=self.user,
+            order_id=order_id,
+            cart_total=Decimal("100.00"),
+            delivery_fee=Decimal("0.00"),
+        )
+
+    def test_lowering_the_budget_reshards_it(self) -> None:
+        campaign = self._sharded_campaign()
+        self._redeem(campaign, "order_1")
+
+        campaign.refresh_from_db()
+        campaign.total_budget = Decimal("15.00")
+        campaign.save()
+
+        with self.assertRaisesMessage(ValidationError, "budget exhausted"):
+            self._redeem(campaign, "order_2")
+        self.assertEqual(  # noqa: PT009
+            campaign.budget_shards.aggregate(budget=Sum("budget"))["budget"],
+            Decimal("15.00"),
+        )
+
+    def test_raising_the_budget_in_bulk_reshards_it(self) -> None:
+        campaign = self._sharded_campaign()
+        self._redeem(campaign, "order_1")
+        self._redeem(campaign, "order_2")
+
+        campaign.refresh_from_db()
+        campaign_bulk.update_campaigns(
+            [campaign],
+            [{"total_budget": Decimal("40.00")}],
+        )
+
+        self.assertEqual(self._redeem(campaign, "order_3"), Decimal("10.00"))  # noqa: PT009
+        budget_shards.rollup([campaign.pk])
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.current_spend, Decimal("30.00"))  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IdempotentRedeemTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="retrier")
+        self.campaign = make_campaign(max_transactions_per_user_day=5)
+        self.redeem = {
+            "campaign_id": self.campaign.pk,
+            "order_id": "order_1",
+            "cart_total": Decimal("100.00"),
+            "delivery_fee": Decimal("0.00"),
+        }
+
+    def test_retry_is_answered_from_the_cache(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            first = CampaignService.redeem_campaign(user=self.user, **self.redeem)
+
+        with self.assertNumQueries(0):
+            retry = CampaignService.redeem_campaign(user=self.user, **self.redeem)
+
+        self.assertEqual(retry, first)  # noqa: PT009
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_spend, first)  # noqa: PT009
+
+    def test_retry_unknown_to_the_cache_replays_the_stored_row(self) -> None:
+        first = CampaignService.redeem_campaign(user=self.user, **self.redeem)
+        cache.clear()
+
+        retry = CampaignService.redeem_campaign(user=self.user, **self.redeem)
+
+        self.assertEqual(retry, first)  # noqa: PT009
+        self.assertEqual(Redemption.objects.count(), 1)  # noqa: PT009
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.current_spend, first)  # noqa: PT009
+        other = User.objects.create_user(username="other")
+        with self.assertRaisesMessage(ValidationError, "already been redeemed"):
+            CampaignService.redeem_campaign(user=other, **self.redeem)
+
+    def test_fractional_discount_is_the_same_on_every_retry(self) -> None:
+        campaign = make_campaign(
+            discount_type=Campaign.TYPE_PERCENTAGE,
+            discount_value=Decimal("5.00"),
+        )
+        # 5% of 99.99 is 4.9995.
+        redeem = {
+            **self.redeem,
+            "campaign_id": campaign.pk,
+            "cart_total": Decimal("99.99"),
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = CampaignService.redeem_campaign(user=self.user, **redeem)
+        cached = CampaignService.redeem_campaign(user=self.user, **redeem)
+        cache.clear()
+        stored = CampaignService.redeem_campaign(user=self.user, **redeem)
+
+        self.assertEqual(  # noqa: PT009
+            [str(first), str(cached), str(stored)],
+            ["5.00", "5.00", "5.00"],
+        )
+
+    def test_half_cent_tie_is_stored_as_returned(self) -> None:
+        campaign = make_campaign(
+            discount_type=Campaign.TYPE_PERCENTAGE,
+            discount_value=Decimal("10.00"),
+        )
+        # 10% of 41.25 is 4.125; Postgres alone would store 4.13.
+        redeem = {
+            **self.redeem,
+            "campaign_id": campaign.pk,
+            "cart_total": Decimal("41.25"),
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = CampaignService.redeem_campaign(user=self.user, **redeem)
+        cache.clear()
+        stored = CampaignService.redeem_campaign(user=self.user, **redeem)
+
+        campaign.refresh_from_db()
+        redemption = Redemption.objects.get(campaign=campaign)
+        self.assertEqual(  # noqa: PT009
+            [first, stored, redemption.applied_discount, campaign.current_spend],
+            [Decimal("4.12")] * 4,
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConcurrentDuplicateRedeemTest(TransactionTestCase):
+    def test_concurrent_duplicates_share_one_redemption(self) -> None:
+        cache.clear()
+        user = User.objects.create_user(username="retrier")
+        campaign = make_campaign(max_transactions_per_user_day=5)
+        barrier = threading.Barrier(5)
+        results = []
+
+        def redeem() -> None:
+            barrier.wait()
+            try:
+                results.append(
+                    CampaignService.redeem_campaign(
+                        campaign_id=campaign.pk,
+                        user=user,
+                        order_id="order_1",
+                        cart_total=Decimal("100.00"),
+                        delivery_fee=Decimal("0.00"),
+                    ),
+                )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=redeem) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [Decimal("10.00")] * 5)  # noqa: PT009
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.current_spend, Decimal("10.00"))  # noqa: PT009
+        self.assertEqual(Redemption.objects.count(), 1)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DailyUsageTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="regular")
+        self.today = timezone.now().date()
+
+    def _redeem(self, campaign, order_id, **overrides):  # noqa: ANN001, ANN003, ANN202
+        return CampaignService.redeem_campaign(
+            campaign_id=campaign.pk,
+            user=self.user,
+            order_id=order_id,
+            **{
+                "cart_total": Decimal("100.00"),
+                "delivery_fee": Decimal("0.00"),
+                **overrides,
+            },
+        )
+
+    def _usage(self, campaign) -> int:  # noqa: ANN001
+        return daily_usage.get_usage(self.user.pk, [campaign.pk], self.today).get(
+            campaign.pk,
+            0,
+        )
+
+    def test_consume_stops_at_the_limit(self) -> None:
+        campaign = make_campaign()
+
+        consumed = [
+            daily_usage.consume(self.user.pk, campaign.pk, self.today, 2)
+            for _ in range(3)
+        ]
+
+        self.assertEqual(consumed, [True, True, False])  # noqa: PT009
+        self.assertEqual(self._usage(campaign), 2)  # noqa: PT009
+
+    def test_redeem_counts_against_the_limit(self) -> None:
+        for strategy in ("row_lock", "conditional_update", "coalesced"):
+            campaign = make_campaign(name=strategy)
+            with self.settings(CAMPAIGN_REDEEM_STRATEGY=strategy):
+                self._redeem(campaign, f"{strategy}_1")
+                with self.assertRaisesMessage(ValidationError, "Daily redemption"):
+                    self._redeem(campaign, f"{strategy}_2")
+            self.assertEqual(self._usage(campaign), 1)  # noqa: PT009
+
+    def test_rejected_redemption_is_not_counted(self) -> None:
+        campaign = make_campaign(
+            max_transactions_per_user_day=2,
+            total_budget=Decimal("15.00"),
+        )
+        self._redeem(campaign, "order_1")
+
+        with self.assertRaisesMessage(ValidationError, "budget exhausted"):
+            self._redeem(campaign, "order_2")
+
+        self.assertEqual(self._usage(campaign), 1)  # noqa: PT009
+
+    def test_backfill_counts_recent_redemptions(self) -> None:
+        campaign = make_campaign(max_transactions_per_user_day=5)
+        for i, days_ago in enumerate((0, 0, 1, 5)):
+            redemption = Redemption.objects.create(
+                campaign=campaign,
+                user=self.user,
+                order_id=f"order_{i}",
+                applied_discount=Decimal("10.00"),
+            )
+            Redemption.objects.filter(pk=redemption.pk).update(
+                redeemed_at=F("redeemed_at") - timezone.timedelta(days=days_ago),
+            )
+        UserCampaignDailyUsage.objects.create(
+            user=self.user,
+            campaign=campaign,
+            day=self.today,
+            count=9,
+        )
+
+        call_command("backfill_daily_usage", stdout=StringIO())
+
+        usage = dict(UserCampaignDailyUsage.objects.values_list("day", "count"))
+        yesterday = self.today - timezone.timedelta(days=1)
+        self.assertEqual(usage, {self.today: 2, yesterday: 1})  # noqa: PT009
+
+    def test_old_days_are_pruned_once_a_day(self) -> None:
+        campaign = make_campaign()
+        for days_ago in (1, 2, 3):
+            UserCampaignDailyUsage.objects.create(
+                user=self.user,
+                campaign=campaign,
+                day=self.today - timezone.timedelta(days=days_ago),
+                count=1,
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._redeem(campaign, "order_1")
+        stale = UserCampaignDailyUsage.objects.create(
+            user=self.user,
+            campaign=campaign,
+            day=self.today - timezone.timedelta(days=7),
+            count=1,
+        )
+        other = make_campaign(name="Other")
+        with self.captureOnCommitCallbacks(execute=True):
+            self._redeem(other, "order_2")
+
+        days = sorted(UserCampaignDailyUsage.objects.values_list("day", flat=True))
+        yesterday = self.today - timezone.timedelta(days=1)
+        self.assertEqual(days, [stale.day, yesterday, self.today, self.today])  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConcurrentDailyUsageTest(TransactionTestCase):
+    def test_concurrent_consumers_never_exceed_the_limit(self) -> None:
+        user = User.objects.create_user(username="eager")
+        campaign = make_campaign()
+        today = timezone.now().date()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def consume() -> None:
+            barrier.wait()
+            try:
+                results.append(daily_usage.consume(user.pk, campaign.pk, today, 3))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=consume) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results.count(True), 3)  # noqa: PT009
+        usage = UserCampaignDailyUsage.objects.get(user=user, campaign=campaign)
+        self.assertEqual(usage.count, 3)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EndpointBenchmarkTest(TransactionTestCase):
+    def test_reports_every_target_and_cleans_up(self) -> None:
+        out = tempfile.NamedTemporaryFile(suffix=".json", delete=False)  # noqa: SIM115
+        out.close()
+        self.addCleanup(os.unlink, out.name)
+
+        call_command(
+            "benchmark_campaigns",
+            "--threads",
+            "2",
+            "--requests",
+            "6",
+            "--users",
+            "5",
+            "--campaigns",
+            "4",
+            "--json",
+            out.name,
+            stdout=StringIO(),
+        )
+
+        with open(out.name) as fh:  # noqa: PTH123
+            results = json.load(fh)["results"]
+        self.assertEqual(  # noqa: PT009
+            [r["target"] for r in results],
+            ["available", "redeem", "api_available", "api_redeem"],
+        )
+        for result in results:
+            # SQLite may reject concurrent redeems ("database table is
+            # locked"); those count as failed requests.
+            self.assertEqual(result["succeeded"] + result["failed"], 6)  # noqa: PT009
+            self.assertGreater(result["queries_per_request"], 0)  # noqa: PT009
+            self.assertLessEqual(  # noqa: PT009
+                result["latency_ms"]["p50"],
+                result["latency_ms"]["p99"],
+            )
+        self.assertEqual(  # noqa: PT009
+            [r["succeeded"] for r in results if "available" in r["target"]],
+            [6, 6],
+        )
+        self.assertFalse(Campaign.objects.exists())  # noqa: PT009
+        self.assertFalse(User.objects.exists())  # noqa: PT009
+
+    def test_errors_count_as_failed_requests(self) -> None:
+        with mock.patch.object(
+            CampaignService,
+            "get_available_discounts",
+            side_effect=OperationalError("database table is locked"),
+        ):
+            result = benchmarks.run_endpoint_benchmark(
+                "available",
+                threads=2,
+                requests=4,
+                users=3,
+                campaigns=2,
+            )
+
+        self.assertEqual((result["succeeded"], result["failed"]), (0, 4))  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RedemptionArchiveTest(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="loyal")
+        self.campaign = make_campaign()
+        self.this_month = redemption_partitions.current_month()
+
+    def _redeem(self, order_id, month, day=1, user=None):  # noqa: ANN001, ANN202
+        redemption = Redemption.objects.create(
+            campaign=self.campaign,
+            user=user or self.user,
+            order_id=order_id,
+            applied_discount=Decimal("10.00"),
+        )
+        redeemed_at = datetime.datetime(
+            month.year,
+            month.month,
+            day,
+            12,
+            tzinfo=datetime.UTC,
+        )
+        Redemption.objects.filter(pk=redemption.pk).update(redeemed_at=redeemed_at)
+
+    def test_orders_are_unique_per_campaign(self) -> None:
+        Redemption.objects.bulk_create(
+            [
+                Redemption(campaign=self.campaign, user=self.user, order_id=order_id)
+                for order_id in ("order_1", "order_2")
+            ],
+        )
+
+        self.assertEqual(RedeemedOrder.objects.count(), 2)  # noqa: PT009
+        with self.assertRaises(IntegrityError):  # noqa: PT027
+            Redemption.objects.create(
+                campaign=self.campaign,
+                user=self.user,
+                order_id="order_1",
+            )
+
+    def test_old_months_are_rolled_into_daily_summaries(self) -> None:
+        old = redemption_partitions.add_months(self.this_month, -3)
+        other = User.objects.create_user(username="other")
+        self._redeem("old_1", old, day=2)
+        self._redeem("old_2", old, day=2, user=other)
+        self._redeem("old_3", old, day=5)
+        self._redeem("recent", self.this_month)
+
+        out = StringIO()
+        call_command("archive_redemptions", "--keep-months", "1", stdout=out)
+
+        self.assertIn("Archived 2 month(s)", out.getvalue())  # noqa: PT009
+        summaries = RedemptionDailySummary.objects.values_list(
+            "day",
+            "redemptions",
+            "users",
+            "discount_total",
+        )
+        self.assertEqual(  # noqa: PT009
+            sorted(summaries),
+            [
+                (old.replace(day=2), 2, 2, Decimal("20.00")),
+                (old.replace(day=5), 1, 1, Decimal("10.00")),
+            ],
+        )
+        remaining = Redemption.objects.values_list("order_id", flat=True)
+        self.assertEqual(list(remaining), ["recent"])  # noqa: PT009
+        orders = RedeemedOrder.objects.values_list("order_id", flat=True)
+        self.assertEqual(list(orders), ["recent"])  # noqa: PT009
+
+    def test_dry_run_and_unpartitioned_database(self) -> None:
+        self._redeem("old", redemption_partitions.add_months(self.this_month, -2))
+
+        out = StringIO()
+        call_command(
+            "archive_redemptions",
+            "--keep-months",
+            "1",
+            "--dry-run",
+            stdout=out,
+        )
+        call_command("create_redemption_partitions", stdout=out)
+
+        self.assertIn("Would archive 1 month(s)", out.getvalue())  # noqa: PT009
+        self.assertIn("not partitioned", out.getvalue())  # noqa: PT009
+        self.assertEqual(Redemption.objects.count(), 1)  # noqa: PT009
+
+    def test_add_months_wraps_years(self) -> None:
+        month = datetime.date(2026, 11, 1)
+
+        self.assertEqual(  # noqa: PT009
+            redemption_partitions.add_months(month, 2),
+            datetime.date(2027, 1, 1),
+        )
+        self.assertEqual(  # noqa: PT009
+            redemption_partitions.partition_name(month),
+            "app_redemption_p2026_11",
+        )
+
+
+class HyperLogLogTest(SimpleTestCase):
+    def test_estimates_distinct_values(self) -> None:
+        for distinct in (10, 1000, 50000):
+            sketch = HyperLogLog()
+            for value in range(distinct):
+                sketch.add(value)
+                sketch.add(value)
+
+            # Three standard errors.
+            self.assertAlmostEqual(sketch.count(), distinct, delta=distinct * 0.07)  # noqa: PT009
+
+    def test_merge_is_union(self) -> None:
+        evens, odds, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        for value in range(2000):
+            (evens if value % 2 else odds).add(value)
+            both.add(value)
+
+        evens.merge(HyperLogLog(odds.to_bytes()))
+
+        self.assertEqual(evens.count(), both.count())  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CampaignStatsTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.campaign = make_campaign(max_transactions_per_user_day=10)
+        self.users = [User.objects.create_user(username=f"user{i}") for i in range(3)]
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.hour -= timezone.timedelta(hours=3)
+
+    def _redeem(self, user, minutes, amount="10.00"):  # noqa: ANN001, ANN202
+        redemption = Redemption.objects.create(
+            campaign=self.campaign,
+            user=user,
+            order_id=f"order_{Redemption.objects.count()}",
+            applied_discount=Decimal(amount),
+        )
+        Redemption.objects.filter(pk=redemption.pk).update(
+            redeemed_at=self.hour + timezone.timedelta(minutes=minutes),
+        )
+
+    def test_rollup_is_incremental(self) -> None:
+        self._redeem(self.users[0], 5)
+        self._redeem(self.users[0], 10)
+        self._redeem(self.users[1], 70, amount="5.00")
+        campaign_stats.rollup(batch_size=2)
+
+        self._redeem(self.users[2], 20)
+        self._redeem(self.users[0], 300)  # in the future: not rolled up yet
+        rolled = campaign_stats.rollup()
+
+        self.assertEqual(rolled, 1)  # noqa: PT009
+        stats = CampaignHourlyStats.objects.order_by("hour")
+        self.assertEqual(  # noqa: PT009
+            [(s.redemptions, s.discount_total) for s in stats],
+            [(3, Decimal("30.00")), (1, Decimal("5.00"))],
+        )
+        self.assertEqual(HyperLogLog(stats[0].users_sketch).count(), 2)  # noqa: PT009
+
+    def test_stats_endpoint_serves_the_rollup(self) -> None:
+        self._redeem(self.users[0], 5)
+        self._redeem(self.users[1], 10)
+        self._redeem(self.users[0], 70, amount="5.00")
+        call_command("rollup_campaign_stats", stdout=StringIO())
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create_user(username="ops", is_staff=True),
+        )
+
+        # Campaign, stats rows and cursor, however many redemptions there are.
+        with self.assertNumQueries(3):
+            response = client.get(
+                f"/api/campaigns/{self.campaign.pk}/stats/",
+                {
+                    "since": self.hour.isoformat(),
+                    "until": (self.hour + timezone.timedelta(hours=2)).isoformat(),
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)  # noqa: PT009
+        body = response.json()
+        self.assertEqual(  # noqa: PT009
+            [
+                (p["redemptions"], p["discount_total"], p["users"])
+                for p in body["series"]
+            ],
+            [(2, "20.00", 2), (1, "5.00", 1), (0, "0.00", 0)],
+        )
+        self.assertEqual(  # noqa: PT009
+            (body["redemptions"], body["discount_total"], body["users"]),
+            (3, "25.00", 2),
+        )
+
+        response = client.get(
+            f"/api/campaigns/{self.campaign.pk}/stats/",
+            {
+                "bucket": "hour",
+                "since": "2026-01-01T00:00:00Z",
+                "until": "2026-06-01T00:00:00Z",
+            },
+        )
+        self.assertEqual(response.status_code, 400)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RedemptionExportTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username="finance", is_staff=True),
+        )
+        self.user = User.objects.create_user(username="buyer")
+        self.platform = make_campaign(name="Platform")
+        self.vendor = make_campaign(
+            name="Vendor",
+            sponsor_type=Campaign.SPONSOR_VENDOR,
+            vendor_id=42,
+        )
+        for i, campaign in enumerate((self.platform, self.vendor, self.vendor)):
+            Redemption.objects.create(
+                campaign=campaign,
+                user=self.user,
+                order_id=f"order_{i}",
+                applied_discount=Decimal("10.00"),
+            )
+
+    def _export(self, **params):  # noqa: ANN003, ANN202
+        return self.client.get("/api/campaigns/export/", params)
+
+    def test_csv_filtered_by_vendor(self) -> None:
+        response = self._export(vendor=42)
+
+        self.assertTrue(response.streaming)  # noqa: PT009
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")  # noqa: PT009
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], ",".join(redemption_export.COLUMNS))  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            [line.split(",")[5] for line in lines[1:]],
+            ["order_1", "order_2"],
+        )
+
+    def test_ndjson_is_sent_in_chunks(self) -> None:
+        with mock.patch.object(redemption_export, "CHUNK_SIZE", 2):
+            response = self._export(output="ndjson", since="2000-01-01T00:00:00Z")
+            chunks = list(response.streaming_content)
+
+        self.assertEqual(len(chunks), 2)  # noqa: PT009
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        self.assertEqual(  # noqa: PT009
+            rows[0],
+            {
+                **rows[0],
+                "campaign_id": self.platform.pk,
+                "vendor_id": None,
+                "order_id": "order_0",
+                "applied_discount": "10.00",
+            },
+        )
+        self.assertEqual(len(rows), 3)  # noqa: PT009
+
+    def test_admin_only(self) -> None:
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self._export().status_code, 403)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CampaignListTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username="admin", is_staff=True),
+        )
+        self.users = [User.objects.create_user(username=f"user{i}") for i in range(3)]
+
+    def _list(self, **params):  # noqa: ANN003, ANN202
+        return self.client.get("/api/campaigns/", params)
+
+    def test_keyset_pages_cover_every_campaign_once(self) -> None:
+        campaigns = [make_campaign(name=f"Campaign {i}") for i in range(5)]
+        # Ties on created_at must be broken by id.
+        Campaign.objects.filter(pk__in=[c.pk for c in campaigns[1:4]]).update(
+            created_at=campaigns[0].created_at,
+        )
+
+        seen, params = [], {"page_size": 2}
+        while True:
+            body = self._list(**params).json()
+            seen.extend(c["id"] for c in body["results"])
+            if body["next"] is None:
+                break
+            params["cursor"] = parse_qs(urlsplit(body["next"]).query)["cursor"][0]
+
+        expected = Campaign.objects.order_by("-created_at", "-id")
+        self.assertEqual(seen, list(expected.values_list("id", flat=True)))  # noqa: PT009
+
+    def test_query_count_does_not_grow_with_campaigns(self) -> None:
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self._list()
+            self.assertEqual(response.status_code, 200)  # noqa: PT009
+            return len(ctx.captured_queries)
+
+        make_campaign().target_users.set(self.users)
+        few = count_queries()
+        for i in range(10):
+            make_campaign(name=f"More {i}").target_users.set(self.users[:1])
+
+        self.assertEqual(count_queries(), few)  # noqa: PT009
+        results = self._list().json()["results"]
+        self.assertNotIn("target_users", results[0])  # noqa: PT009
+        counts = sorted(c["target_user_count"] for c in results)
+        self.assertEqual(counts, [1] * 10 + [3])  # noqa: PT009
+
+    def test_field_selection(self) -> None:
+        make_campaign(name="Slim")
+
+        response = self._list(fields="id,name")
+        unknown = self._list(fields="id,nope")
+        bad_cursor = self._list(cursor="not-a-cursor")
+
+        self.assertEqual(list(response.json()["results"][0]), ["id", "name"])  # noqa: PT009
+        self.assertEqual(unknown.status_code, 400)  # noqa: PT009
+        self.assertEqual(bad_cursor.status_code, 404)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CampaignBulkApiTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username="admin", is_staff=True),
+        )
+        self.users = [User.objects.create_user(username=f"user{i}") for i in range(3)]
+        now = timezone.now()
+        self.item = {
+            "name": "Imported",
+            "scope": Campaign.SCOPE_CART,
+            "discount_type": Campaign.TYPE_FIXED,
+            "discount_value": "5.00",
+            "total_budget": "100.00",
+            "start_date": now.isoformat(),
+            "end_date": (now + timezone.timedelta(days=7)).isoformat(),
+        }
+
+    def _bulk(self, method, path, data):  # noqa: ANN001, ANN202
+        patcher = mock.patch.object(campaign_bulk, "invalidate_campaign_cache")
+        with patcher as invalidate, self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, data, format="json")
+        return response, invalidate.call_count
+
+    def test_create_writes_in_bulk_and_invalidates_once(self) -> None:
+        targets = [u.pk for u in self.users[:2]]
+        items = [
+            {**self.item, "name": f"Imported {i}", "target_users": targets}
+            for i in range(50)
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response, invalidations = self._bulk(
+                "post",
+                "/api/campaigns/bulk/",
+                {"campaigns": items},
+            )
+
+        self.assertEqual(response.status_code, 201)  # noqa: PT009
+        self.assertEqual(invalidations, 1)  # noqa: PT009
+        self.assertLess(len(ctx.captured_queries), 15)  # noqa: PT009
+        self.assertEqual(Campaign.objects.count(), 50)  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            {c["target_user_count"] for c in response.json()},
+            {2},
+        )
+        self.assertEqual(Campaign.target_users.through.objects.count(), 100)  # noqa: PT009
+
+    def test_one_invalid_item_creates_nothing(self) -> None:
+        items = [
+            self.item,
+            {
+                **self.item,
+                "discount_type": Campaign.TYPE_PERCENTAGE,
+                "discount_value": "150",
+            },
+            {**self.item, "target_users": [self.users[0].pk, 999999]},
+        ]
+
+        response, invalidations = self._bulk(
+            "post",
+            "/api/campaigns/bulk/",
+            {"campaigns": items},
+        )
+
+        self.assertEqual(response.status_code, 400)  # noqa: PT009
+        errors = response.json()["campaigns"]
+        self.assertEqual(errors[0], {})  # noqa: PT009
+        self.assertIn("cannot exceed 100%", str(errors[1]))  # noqa: PT009
+        self.assertIn("999999", str(errors[2]["target_users"]))  # noqa: PT009
+        self.assertEqual(invalidations, 0)  # noqa: PT009
+        self.assertFalse(Campaign.objects.exists())  # noqa: PT009
+
+    def test_update_and_replace_targets(self) -> None:
+        first = make_campaign(name="First")
+        first.target_users.set(self.users)
+        second = make_campaign(name="Second")
+
+        response, invalidations = self._bulk(
+            "patch",
+            "/api/campaigns/bulk/",
+            {
+                "campaigns": [
+                    {"id": first.pk, "target_users": [self.users[0].pk]},
+                    {"id": second.pk, "name": "Renamed", "total_budget": "50.00"},
+                ],
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)  # noqa: PT009
+        self.assertEqual(invalidations, 1)  # noqa: PT009
+        self.assertEqual(list(first.target_users.all()), [self.users[0]])  # noqa: PT009
+        second.refresh_from_db()
+        self.assertEqual((second.name, second.total_budget), ("Renamed", 50))  # noqa: PT009
+
+        missing, _ = self._bulk(
+            "patch",
+            "/api/campaigns/bulk/",
+            {"campaigns": [{"id": 999999, "name": "Ghost"}]},
+        )
+        self.assertEqual(missing.status_code, 400)  # noqa: PT009
+
+    def test_activate_and_deactivate(self) -> None:
+        campaigns = [make_campaign(name=f"C{i}") for i in range(3)]
+        ids = [c.pk for c in campaigns]
+
+        response, invalidations = self._bulk(
+            "post",
+            "/api/campaigns/bulk-deactivate/",
+            {"ids": ids[:2]},
+        )
+        again, unchanged = self._bulk(
+            "post",
+            "/api/campaigns/bulk-deactivate/",
+            {"ids": ids[:2]},
+        )
+        activated, _ = self._bulk("post", "/api/campaigns/bulk-activate/", {"ids": ids})
+
+        self.assertEqual(response.json(), {"updated": 2})  # noqa: PT009
+        self.assertEqual(invalidations, 1)  # noqa: PT009
+        self.assertEqual((again.json(), unchanged), ({"updated": 0}, 0))  # noqa: PT009
+        self.assertEqual(activated.json(), {"updated": 2})  # noqa: PT009
+        self.assertEqual(Campaign.objects.filter(is_active=True).count(), 3)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CampaignLifecycleTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        cache_service.clear_local_snapshot()
+        self.now = timezone.now().replace(microsecond=0)
+        hour = datetime.timedelta(hours=1)
+        self.live = make_campaign(name="Live", start_date=self.now - hour)
+        self.expired = make_campaign(
+            name="Expired",
+            start_date=self.now - 3 * hour,
+            end_date=self.now - hour,
+        )
+        self.exhausted = make_campaign(
+            name="Exhausted",
+            current_spend=Decimal("1000.00"),
+        )
+        self.upcoming = make_campaign(
+            name="Upcoming",
+            start_date=self.now + 2 * hour,
+            end_date=self.now + 3 * hour,
+        )
+
+    def test_sweep_deactivates_expired_and_exhausted(self) -> None:
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            mock.patch.object(
+                campaign_lifecycle,
+                "invalidate_campaign_cache",
+            ) as invalidate,
+        ):
+            result = campaign_lifecycle.sweep(self.now)
+
+        self.assertEqual(  # noqa: PT009
+            result,
+            {"expired": [self.expired.pk], "exhausted": [self.exhausted.pk]},
+        )
+        self.assertEqual(  # noqa: PT009
+            set(Campaign.objects.filter(is_active=True).values_list("pk", flat=True)),
+            {self.live.pk, self.upcoming.pk},
+        )
+        invalidate.assert_called_once()
+
+        self.assertEqual(  # noqa: PT009
+            campaign_lifecycle.sweep(self.now),
+            {"expired": [], "exhausted": []},
+        )
+
+    def test_snapshot_holds_live_campaigns_until_next_boundary(self) -> None:
+        ids = [c["id"] for c in get_cached_active_campaigns()]
+        self.assertEqual(ids, [self.live.pk])  # noqa: PT009
+
+        # Within the TTL, the snapshot expires when the next campaign starts.
+        soon = make_campaign(
+            name="Soon",
+            start_date=timezone.now() + datetime.timedelta(seconds=30),
+        )
+        cache_service.invalidate_campaign_cache()
+        get_cached_active_campaigns()
+        entry = cache_service._local.entry  # noqa: SLF001
+        self.assertEqual(entry["expires_at"], soon.start_date.timestamp())  # noqa: PT009
+
+    def test_sweeper_sleeps_until_next_boundary(self) -> None:
+        clock = [self.now]
+        sleeps = []
+
+        def sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+            clock[0] += datetime.timedelta(seconds=seconds)
+
+        sweeper = campaign_lifecycle.CampaignSweeper(
+            interval=4 * 3600,
+            clock=lambda: clock[0],
+            sleep=sleep,
+        )
+        swept = []
+        sweeper.run(iterations=3, on_sweep=swept.append)
+
+        # Wakes just after the upcoming campaign starts, then after it ends.
+        self.assertEqual([round(s) for s in sleeps], [7200, 3600])  # noqa: PT009
+        self.assertEqual(swept[2]["expired"], [self.upcoming.pk])  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            list(Campaign.objects.filter(is_active=True).values_list("pk", flat=True)),
+            [self.live.pk],
+        )
+
+    def test_command_runs_one_sweep(self) -> None:
+        out = StringIO()
+        call_command("sweep_campaigns", stdout=out)
+
+        self.assertIn("1 expired and 1 exhausted", out.getvalue())  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LoadSampleDataTest(TestCase):
+    def _load(self, *args: str) -> str:
+        out = StringIO()
+        call_command("load_sample_data", *args, stdout=out)
+        return out.getvalue()
+
+    def test_synthetic_data_is_batched_and_topped_up(self) -> None:
+        args = ["--users", "30", "--campaigns", "10", "--redemptions", "120"]
+        self._load(*args, "--targeting-ratio", "1", "--batch-size", "7")
+
+        synthetic = Campaign.objects.filter(name__startswith="Synthetic campaign ")
+        users = User.objects.filter(username__startswith="synthetic_")
+        redemptions = Redemption.objects.filter(order_id__startswith="SYN-")
+        self.assertEqual(users.count(), 30)  # noqa: PT009
+        self.assertEqual(synthetic.count(), 10)  # noqa: PT009
+        self.assertEqual(redemptions.count(), 120)  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            Campaign.target_users.through.objects.filter(
+                campaign__in=synthetic,
+            ).count(),
+            10,
+        )
+        total = Redemption.objects.filter(campaign__in=synthetic).aggregate(
+            total=Sum("applied_discount"),
+        )["total"]
+        spend = synthetic.aggregate(total=Sum("current_spend"))["total"]
+        self.assertEqual(spend, total)  # noqa: PT009
+
+        with CaptureQueriesContext(connection) as queries:
+            output = self._load(*args)
+        self.assertIn("already loaded", output)  # noqa: PT009
+        self.assertLessEqual(len(queries), 4)  # noqa: PT009
+
+        self._load("--users", "30", "--campaigns", "12", "--redemptions", "150")
+        self.assertEqual(synthetic.count(), 12)  # noqa: PT009
+        self.assertEqual(redemptions.count(), 150)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MetricsTest(TestCase):
+    def test_available_request_shows_up_in_metrics(self) -> None:
+        cache.clear()
+        make_campaign()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username="shopper"))
+
+        client.get("/api/campaigns/available/", {"cart_total": "50.00"})
+        client.force_login(User.objects.create_user(username="ops", is_staff=True))
+        body = client.get("/metrics").content.decode()
+
+        self.assertIn(  # noqa: PT009
+            'campaign_request_seconds_count{endpoint="campaigns-available",'
+            'method="GET"} ',
+            body,
+        )
+        self.assertIn(  # noqa: PT009
+            'campaign_requests_total{endpoint="campaigns-available",method="GET",'
+            'status="200"}',
+            body,
+        )
+        for stage in ("cache_load", "targeting", "usage_query", "pricing"):
+            self.assertIn(f'campaign_stage_seconds_count{{stage="{stage}"}}', body)  # noqa: PT009
+        self.assertIn('campaign_cache_lookups_total{cache="spend",result="hit"}', body)  # noqa: PT009
+
+    @override_settings(CAMPAIGN_METRICS_TOKEN="scrape-secret")  # noqa: S106
+    def test_metrics_need_staff_or_the_scrape_token(self) -> None:
+        client = APIClient()
+        self.assertEqual(client.get("/metrics").status_code, 403)  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code,
+            403,
+        )
+        self.assertEqual(  # noqa: PT009
+            client.get(
+                "/metrics",
+                HTTP_AUTHORIZATION="Bearer scrape-secret",
+            ).status_code,
+            200,
+        )
+
+        client.force_login(User.objects.create_user(username="shopper"))
+        self.assertEqual(client.get("/metrics").status_code, 403)  # noqa: PT009
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = metrics.Histogram("h", "Test.", ("kind",), buckets=(1, 5))
+        for value in (0.5, 1, 3, 9):
+            histogram.observe(value, "a")
+
+        self.assertEqual(  # noqa: PT009
+            histogram.collect()[2:],
+            [
+                'h_bucket{kind="a",le="1"} 2',
+                'h_bucket{kind="a",le="5"} 3',
+                'h_bucket{kind="a",le="+Inf"} 4',
+                'h_sum{kind="a"} 13.5',
+                'h_count{kind="a"} 4',
+            ],
+        )
+
+
+class MetricsOverheadTest(SimpleTestCase):
+    # Added cost per request of the middleware plus a dozen stage spans;
+    # typically a fraction of this, and 1% of a 25 ms request.
+    OVERHEAD_BUDGET = 0.00025
+
+    def _best_of(self, handler, request, iterations: int = 2000) -> float:  # noqa: ANN001
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                handler(request)
+            timings.append((time.perf_counter() - started) / iterations)
+        return min(timings)
+
+    def test_instrumentation_stays_within_budget(self) -> None:
+        response = HttpResponse()
+
+        def bare(request):  # noqa: ANN001, ANN202, ARG001
+            return response
+
+        def with_spans(request):  # noqa: ANN001, ANN202, ARG001
+            for _ in range(12):
+                with metrics.span("overhead_test"):
+                    pass
+            return response
+
+        request = RequestFactory().get("/api/campaigns/available/")
+        baseline = self._best_of(bare, request)
+        instrumented = self._best_of(RequestMetricsMiddleware(with_spans), request)
+
+        self.assertLess(instrumented - baseline, self.OVERHEAD_BUDGET)  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SamplingProfilerTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        make_campaign()
+        self.profile_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        self.client = APIClient()
+
+    def _available(self, user, profile: bool = False):  # noqa: ANN001, ANN202, FBT001, FBT002
+        self.client.force_authenticate(user)
+        return self.client.get(
+            "/api/campaigns/available/",
+            {"cart_total": "50.00"},
+            headers={"X-Campaign-Profile": "1"} if profile else {},
+        )
+
+    def _profiles(self) -> list:
+        return sorted(self.profile_dir.glob("*/*.prof"))
+
+    def test_sampled_requests_are_profiled_and_reported(self) -> None:
+        shopper = User.objects.create_user(username="shopper")
+        with override_settings(
+            CAMPAIGN_PROFILE_DIR=str(self.profile_dir),
+            CAMPAIGN_PROFILE_SAMPLE_RATE=1,
+        ):
+            self._available(shopper)
+            self._available(shopper)
+            out = StringIO()
+            call_command("profile_report", "--limit", "200", stdout=out)
+
+        self.assertEqual(  # noqa: PT009
+            [p.parent.name for p in self._profiles()],
+            ["campaigns-available"] * 2,
+        )
+        self.assertIn("campaigns-available: 2 profiled requests", out.getvalue())  # noqa: PT009
+        self.assertIn("get_available_discounts", out.getvalue())  # noqa: PT009
+
+    def test_profile_header_is_honoured_for_staff_only(self) -> None:
+        shopper = User.objects.create_user(username="shopper")
+        staff = User.objects.create_user(username="ops", is_staff=True)
+        with override_settings(CAMPAIGN_PROFILE_DIR=str(self.profile_dir)):
+            self.assertEqual(self._available(shopper).status_code, 200)  # noqa: PT009
+            # Not even profiled and thrown away: that would hold the lock.
+            with mock.patch("app.middleware.cProfile.Profile") as profile:
+                self._available(shopper, profile=True)
+            profile.assert_not_called()
+            self.assertEqual(self._profiles(), [])  # noqa: PT009
+
+            self._available(staff, profile=True)
+            self.assertEqual(len(self._profiles()), 1)  # noqa: PT009
+
+    def test_profiled_requests_still_run_through_the_handler(self) -> None:
+        shopper = User.objects.create_user(username="shopper")
+        with (
+            override_settings(
+                CAMPAIGN_PROFILE_DIR=str(self.profile_dir),
+                CAMPAIGN_PROFILE_SAMPLE_RATE=1,
+            ),
+            mock.patch.object(
+                BaseHandler,
+                "make_view_atomic",
+                autospec=True,
+                side_effect=BaseHandler.make_view_atomic,
+            ) as make_view_atomic,
+        ):
+            self.assertEqual(self._available(shopper).status_code, 200)  # noqa: PT009
+
+        make_view_atomic.assert_called_once()
+        self.assertEqual(len(self._profiles()), 1)  # noqa: PT009
+
+    def test_session_user_is_not_authenticated_again(self) -> None:
+        staff = User.objects.create_user(username="ops", is_staff=True)
+        self.client.force_login(staff)
+        with (
+            override_settings(CAMPAIGN_PROFILE_DIR=str(self.profile_dir)),
+            mock.patch("app.middleware.Request") as drf_request,
+        ):
+            self.client.get(
+                "/api/campaigns/available/",
+                {"cart_total": "50.00"},
+                headers={"X-Campaign-Profile": "1"},
+            )
+
+        drf_request.assert_not_called()
+        self.assertEqual(len(self._profiles()), 1)  # noqa: PT009
+
+    def test_oldest_profiles_are_pruned_beyond_the_cap(self) -> None:
+        directory = self.profile_dir / "campaigns-list"
+        directory.mkdir()
+        for i in range(4):
+            path = directory / f"{i}.prof"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, ns=(i, i))
+
+        prune_profiles(self.profile_dir, 250)
+
+        self.assertEqual([p.name for p in self._profiles()], ["2.prof", "3.prof"])  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AvailableDiscountsQueryTest(TestCase):
+    """The daily-usage check must not issue one query per campaign."""
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="shopper", password="pass")  # noqa: S106
+
+    def _available_query_count(self) -> int:
+        # Warm the campaign cache so only the per-request reads are counted.
+        CampaignService.get_available_discounts(self.user, Decimal("100.00"))
+        with CaptureQueriesContext(connection) as ctx:
+            CampaignService.get_available_discounts(self.user, Decimal("100.00"))
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant_in_number_of_campaigns(self) -> None:
+        for i in range(3):
+            make_campaign(name=f"Small {i}")
+        small = self._available_query_count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(30):
+                make_campaign(name=f"Large {i}")
+        large = self._available_query_count()
+
+        self.assertEqual(small, 1)  # noqa: PT009
+        self.assertEqual(large, small)  # noqa: PT009
+
+    def test_snapshot_version_is_read_once_per_request(self) -> None:
+        make_campaign()
+        CampaignService.get_available_discounts(self.user, Decimal("100.00"))
+
+        with mock.patch.object(
+            cache_service,
+            "_get_version",
+            wraps=cache_service._get_version,  # noqa: SLF001
+        ) as get_version:
+            CampaignService.get_available_discounts(self.user, Decimal("100.00"))
+
+        self.assertEqual(get_version.call_count, 1)  # noqa: PT009
+
+    def test_daily_limit_semantics(self) -> None:
+        limited = make_campaign(name="Limited", max_transactions_per_user_day=1)
+        roomy = make_campaign(name="Roomy", max_transactions_per_user_day=2)
+        for campaign in (limited, roomy):
+            Redemption.objects.create(
+                campaign=campaign,
+                user=self.user,
+                order_id=f"order_{campaign.pk}",
+                applied_discount=Decimal("10.00"),
+            )
+        daily_usage.backfill()
+
+        results = CampaignService.get_available_discounts(
+            self.user,
+            Decimal("100.00"),
+        )
+
+        self.assertEqual([r["id"] for r in results], [roomy.pk])  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SpendCacheLayerTest(TestCase):
+    """Redemptions patch the spend layer without dropping cached config."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        cache_service.clear_local_snapshot()
+
+    def test_redeem_keeps_config_cache(self) -> None:
+        user = User.objects.create_user(username="buyer", password="pass")  # noqa: S106
+        campaign = make_campaign(max_transactions_per_user_day=5)
+        get_cached_active_campaigns()
+        version = cache.get(cache_service.VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CampaignService.redeem_campaign(
+                campaign_id=campaign.id,
+                user=user,
+                order_id="order_1",
+                cart_total=Decimal("100.00"),
+                delivery_fee=Decimal("0.00"),
+            )
+
+        self.assertEqual(cache.get(cache_service.VERSION_KEY), version)  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            get_campaign_spends([campaign.id]),
+            {campaign.id: Decimal("10.00")},
+        )
+
+    def test_out_of_order_commit_callbacks_keep_highest_spend(self) -> None:
+        user = User.objects.create_user(username="buyer", password="pass")  # noqa: S106
+        campaign = make_campaign(max_transactions_per_user_day=5)
+        get_campaign_spends([campaign.id])
+
+        callbacks = []
+        for order_id in ("order_1", "order_2"):
+            with self.captureOnCommitCallbacks() as captured:
+                CampaignService.redeem_campaign(
+                    campaign_id=campaign.id,
+                    user=user,
+                    order_id=order_id,
+                    cart_total=Decimal("100.00"),
+                    delivery_fee=Decimal("0.00"),
+                )
+            callbacks.append(captured)
+
+        # The second commit's callbacks may run before the first one's.
+        for captured in reversed(callbacks):
+            for callback in captured:
+                callback()
+
+        self.assertEqual(  # noqa: PT009
+            get_campaign_spends([campaign.id]),
+            {campaign.id: Decimal("20.00")},
+        )
+
+    def test_fractional_spend_is_rounded_not_truncated(self) -> None:
+        campaign = make_campaign()
+        get_campaign_spends([campaign.id])
+
+        cache_service.adjust_campaign_spend(campaign.id, Decimal("4.129"))
+
+        self.assertEqual(  # noqa: PT009
+            get_campaign_spends([campaign.id]),
+            {campaign.id: Decimal("4.13")},
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SingleFlightRebuildTest(SimpleTestCase):
+    """Concurrent misses on the campaign cache trigger exactly one rebuild."""
+
+    LOADED = [{"id": 1, "starts_at": 0, "ends_at": 0}]  # noqa: RUF012
+
+    def setUp(self) -> None:
+        cache.clear()
+        cache_service.clear_local_snapshot()
+        self.rebuilds = 0
+        self.rebuilds_lock = threading.Lock()
+
+    def _slow_load(self, now) -> tuple:  # noqa: ANN001, ARG002
+        with self.rebuilds_lock:
+            self.rebuilds += 1
+        time.sleep(0.2)
+        return self.LOADED, CampaignTargetingIndex([1], []), None
+
+    def test_steady_state_reads_skip_the_shared_snapshot(self) -> None:
+        with mock.patch.object(
+            cache_service,
+            "_load_active_campaigns",
+            self._slow_load,
+        ):
+            cache_service.get_cached_active_campaigns()
+            # Only the version is consulted while it is unchanged.
+            cache.delete(cache_service.CACHE_KEY)
+            self.assertEqual(cache_service.get_cached_active_campaigns(), self.LOADED)  # noqa: PT009
+            self.assertEqual(self.rebuilds, 1)  # noqa: PT009
+
+            cache_service.invalidate_campaign_cache()
+            cache_service.get_cached_active_campaigns()
+            self.assertEqual(self.rebuilds, 2)  # noqa: PT009
+
+    def _read_concurrently(self, workers: int = 10) -> list:
+        barrier = threading.Barrier(workers)
+        results = [None] * workers
+
+        def read(i: int) -> None:
+            barrier.wait()
+            results[i] = cache_service.get_cached_active_campaigns()
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(workers)]
+        with mock.patch.object(
+            cache_service,
+            "_load_active_campaigns",
+            self._slow_load,
+        ):
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        return results
+
+    def test_cold_misses_rebuild_once(self) -> None:
+        results = self._read_concurrently()
+
+        self.assertEqual(self.rebuilds, 1)  # noqa: PT009
+        self.assertEqual(results, [self.LOADED] * 10)  # noqa: PT009
+
+    def test_invalidated_key_serves_stale_while_rebuilding(self) -> None:
+        outdated = {"version": -1, "campaigns": [{"id": 0}], "expires_at": 0}
+        cache.set(cache_service.CACHE_KEY, outdated)
+
+        results = self._read_concurrently()
+
+        self.assertEqual(self.rebuilds, 1)  # noqa: PT009
+        self.assertEqual(results.count(self.LOADED), 1)  # noqa: PT009
+        self.assertEqual(results.count([{"id": 0}]), 9)  # noqa: PT009
+
+
+class CampaignIntervalIndexTest(SimpleTestCase):
+    def test_live_at_honours_inclusive_bounds(self) -> None:
+        early = {"id": 1, "starts_at": 0.0, "ends_at": 10.0}
+        late = {"id": 2, "starts_at": 5.0, "ends_at": 20.0}
+        index = CampaignIntervalIndex([late, early])
+
+        def live_ids(ts: float) -> list:
+            return sorted(c["id"] for c in index.live_at(ts))
+
+        self.assertEqual(live_ids(-1.0), [])  # noqa: PT009
+        self.assertEqual(live_ids(0.0), [1])  # noqa: PT009
+        self.assertEqual(live_ids(7.0), [1, 2])  # noqa: PT009
+        self.assertEqual(live_ids(8.0), [1, 2])  # noqa: PT009
+        self.assertEqual(live_ids(10.0), [1, 2])  # noqa: PT009
+        self.assertEqual(live_ids(10.5), [2])  # noqa: PT009
+        self.assertEqual(live_ids(21.0), [])  # noqa: PT009
+
+
+class BatchPricingTest(SimpleTestCase):
+    """The vectorised pricer agrees with the per-campaign Decimal path."""
+
+    def _assert_matches_decimal_path(self, campaigns: list, carts: list) -> None:
+        amounts, applicable = batch_pricing.price_campaigns(campaigns, carts)
+
+        for i, campaign in enumerate(campaigns):
+            for k, (cart_total, delivery_fee) in enumerate(carts):
+                expected = CampaignService._calculate_discount_struct(  # noqa: SLF001
+                    campaign,
+                    cart_total,
+                    delivery_fee,
+                )
+                self.assertEqual(bool(applicable[i, k]), expected > 0)  # noqa: PT009
+                if expected > 0:
+                    self.assertEqual(  # noqa: PT009
+                        Decimal(int(amounts[i, k])).scaleb(-2),
+                        expected,
+                    )
+
+    def test_random_campaigns_and_carts(self) -> None:
+        rng = random.Random(12)  # noqa: S311
+
+        def money(high: int) -> Decimal:
+            return Decimal(rng.randint(0, high * 100)).scaleb(-2)
+
+        campaigns = [
+            {
+                "scope": rng.choice([Campaign.SCOPE_CART, Campaign.SCOPE_DELIVERY]),
+                "discount_type": rng.choice(
+                    [Campaign.TYPE_FIXED, Campaign.TYPE_PERCENTAGE],
+                ),
+                "discount_value": money(100),
+                "max_discount_cap": rng.choice([None, money(50)]),
+            }
+            for _ in range(40)
+        ]
+        carts = [(money(500), money(20)) for _ in range(25)]
+
+        self._assert_matches_decimal_path(campaigns, carts)
+
+    def test_half_cent_ties_round_to_even(self) -> None:
+        campaigns = [
+            {
+                "scope": Campaign.SCOPE_CART,
+                "discount_type": Campaign.TYPE_PERCENTAGE,
+                "discount_value": Decimal("50.00"),
+            },
+            {
+                "scope": Campaign.SCOPE_CART,
+                "discount_type": Campaign.TYPE_PERCENTAGE,
+                "discount_value": Decimal("0.01"),
+            },
+        ]
+        # 0.01 / 0.03 at 50% and 50.00 at 0.01% all land on half a cent.
+        carts = [(Decimal("0.01"), 0), (Decimal("0.03"), 0), (Decimal("50.00"), 0)]
+
+        self._assert_matches_decimal_path(campaigns, carts)
+
+
+class CampaignSimulationTest(SimpleTestCase):
+    CAMPAIGNS = [  # noqa: RUF012
+        {
+            "id": 1,
+            "name": "Cart",
+            "scope": Campaign.SCOPE_CART,
+            "discount_type": Campaign.TYPE_FIXED,
+            "discount_value": "10.00",
+            "start_date": "2026-11-01T00:00:00+00:00",
+            "end_date": "2026-11-30T00:00:00+00:00",
+            "total_budget": "25.00",
+            "max_transactions_per_user_day": 1,
+        },
+        {
+            "id": 2,
+            "name": "VIP delivery",
+            "scope": Campaign.SCOPE_DELIVERY,
+            "discount_type": Campaign.TYPE_PERCENTAGE,
+            "discount_value": "50.00",
+            "start_date": "2026-11-01T00:00:00+00:00",
+            "end_date": "2026-11-30T00:00:00+00:00",
+            "total_budget": "100.00",
+            "max_transactions_per_user_day": 5,
+            "target_users": [7],
+        },
+    ]
+
+    def _write_log(self, events: list) -> str:
+        log = tempfile.NamedTemporaryFile(  # noqa: SIM115
+            "w",
+            suffix=".jsonl",
+            delete=False,
+        )
+        with log:
+            for event in events:
+                log.write(json.dumps(event) + "\n")
+        self.addCleanup(os.unlink, log.name)
+        return log.name
+
+    def _redeem(self, minute: int, user_id: int, campaign_id: int, **extra) -> dict:  # noqa: ANN003
+        return {
+            "ts": f"2026-11-02T10:{minute:02d}:00Z",
+            "type": "redeem",
+            "user_id": user_id,
+            "campaign_id": campaign_id,
+            "order_id": f"o-{minute}",
+            "cart_total": "40.00",
+            "delivery_fee": "6.00",
+            **extra,
+        }
+
+    def test_projects_spend_exhaustion_and_rejections(self) -> None:
+        path = self._write_log(
+            [
+                {"ts": "2026-11-02T09:59:00Z", "type": "available", "user_id": 7},
+                self._redeem(0, 1, 1),
+                self._redeem(1, 1, 1),  # second today
+                self._redeem(2, 2, 1),
+                self._redeem(3, 3, 1),  # only 5.00 left
+                self._redeem(4, 1, 2),  # not targeted
+                self._redeem(5, 7, 2),
+                self._redeem(6, 7, 2, order_id="o-5"),
+                self._redeem(7, 7, 9),
+            ],
+        )
+
+        result = campaign_simulation.simulate(path, self.CAMPAIGNS)
+
+        cart, delivery = result["campaigns"][1], result["campaigns"][2]
+        self.assertEqual(cart["spend"], Decimal("20.00"))  # noqa: PT009
+        self.assertEqual(cart["exhausted_at"], "2026-11-02T10:03:00+00:00")  # noqa: PT009
+        self.assertEqual(cart["rejections"], {"daily_limit": 1, "budget_exhausted": 1})  # noqa: PT009
+        self.assertEqual(delivery["spend"], Decimal("3.00"))  # noqa: PT009
+        self.assertIsNone(delivery["exhausted_at"])  # noqa: PT009
+        # The "available" event carried no cart, so nothing was on offer.
+        self.assertEqual(delivery["offered"], 0)  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            result["rejections"],
+            {
+                "daily_limit": 1,
+                "budget_exhausted": 1,
+                "not_eligible": 1,
+                "duplicate_order": 1,
+                "unknown_campaign": 1,
+            },
+        )
+        self.assertEqual(result["events"], {"available": 1, "redeem": 8})  # noqa: PT009
+
+    def test_sharded_run_matches_single_process(self) -> None:
+        rng = random.Random(3)  # noqa: S311
+        events = []
+        for minute in range(60):
+            events.append(
+                {
+                    "ts": f"2026-11-02T11:{minute:02d}:00Z",
+                    "type": "available",
+                    "user_id": rng.randint(1, 8),
+                    "cart_total": "30.00",
+                    "delivery_fee": "4.00",
+                },
+            )
+            events.append(
+                self._redeem(
+                    minute,
+                    rng.randint(1, 8),
+                    rng.randint(1, 3),
+                    ts=f"2026-11-02T11:{minute:02d}:30Z",
+                ),
+            )
+        path = self._write_log(events)
+
+        self.assertEqual(  # noqa: PT009
+            campaign_simulation.simulate(path, self.CAMPAIGNS, workers=2),
+            campaign_simulation.simulate(path, self.CAMPAIGNS),
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TargetingIndexTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.insider = User.objects.create_user(username="insider", password="pass")  # noqa: S106
+        self.outsider = User.objects.create_user(username="outsider", password="pass")  # noqa: S106
+        self.open_campaign = make_campaign(name="Open")
+        self.targeted = make_campaign(name="Targeted", max_transactions_per_user_day=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.targeted.target_users.set([self.insider])
+
+    def test_available_respects_targeting(self) -> None:
+        def available_ids(user) -> list:  # noqa: ANN001
+            results = CampaignService.get_available_discounts(user, Decimal("50.00"))
+            return sorted(r["id"] for r in results)
+
+        self.assertEqual(  # noqa: PT009
+            available_ids(self.insider),
+            [self.open_campaign.pk, self.targeted.pk],
+        )
+        self.assertEqual(available_ids(self.outsider), [self.open_campaign.pk])  # noqa: PT009
+
+    def test_redeem_rejects_untargeted_user(self) -> None:
+        redeem = {
+            "campaign_id": self.targeted.pk,
+            "cart_total": Decimal("50.00"),
+            "delivery_fee": Decimal("0.00"),
+        }
+        with self.assertRaisesMessage(ValidationError, "User is not eligible."):
+            CampaignService.redeem_campaign(user=self.outsider, order_id="o1", **redeem)
+
+        amount = CampaignService.redeem_campaign(
+            user=self.insider,
+            order_id="o2",
+            **redeem,
+        )
+        self.assertEqual(amount, Decimal("10.00"))  # noqa: PT009
+
+    def test_redeem_checks_targeting_against_the_database(self) -> None:
+        get_cached_active_campaigns()
+        # Retargeted, but the commit hook that invalidates the snapshot has
+        # not run: the cached index still lists the insider.
+        self.targeted.target_users.set([self.outsider])
+
+        with self.assertRaisesMessage(ValidationError, "User is not eligible."):
+            CampaignService.redeem_campaign(
+                campaign_id=self.targeted.pk,
+                user=self.insider,
+                order_id="o1",
+                cart_total=Decimal("50.00"),
+                delivery_fee=Decimal("0.00"),
+            )
+
+    def test_targeting_change_refreshes_index(self) -> None:
+        get_cached_active_campaigns()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.targeted.target_users.add(self.outsider)
+
+        results = CampaignService.get_available_discounts(
+            self.outsider,
+            Decimal("50.00"),
+        )
+        self.assertIn(self.targeted.pk, [r["id"] for r in results])  # noqa: PT009
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RedeemBatchApiTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username="checkout", password="pass")  # noqa: S106
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cart = make_campaign(name="Cart")
+        self.delivery = make_campaign(
+            name="Delivery",
+            scope=Campaign.SCOPE_DELIVERY,
+            discount_value=Decimal("5.00"),
+        )
+
+    def _redeem_batch(self, campaign_ids: list, order_id: str = "order_1"):  # noqa: ANN202
+        return self.client.post(
+            "/api/campaigns/redeem-batch/",
+            {
+                "campaign_ids": campaign_ids,
+                "order_id": order_id,
+                "cart_total": "100.00",
+                "delivery_fee": "8.00",
+            },
+            format="json",
+        )
+
+    def test_redeems_all_campaigns_in_one_order(self) -> None:
+        response = self._redeem_batch([self.delivery.pk, self.cart.pk])
+
+        self.assertEqual(response.status_code, 200)  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            response.json()["redemptions"],
+            [
+                {"campaign_id": self.cart.pk, "discount_applied": "10.00"},
+                {"campaign_id": self.delivery.pk, "discount_applied": "5.00"},
+            ],
+        )
+        self.delivery.refresh_from_db()
+        self.assertEqual(self.delivery.current_spend, Decimal("5.00"))  # noqa: PT009
+        self.assertEqual(Redemption.objects.filter(order_id="order_1").count(), 2)  # noqa: PT009
+
+    def test_one_failure_redeems_nothing(self) -> None:
+        Campaign.objects.filter(pk=self.delivery.pk).update(
+            current_spend=F("total_budget"),
+        )
+
+        response = self._redeem_batch([self.cart.pk, self.delivery.pk])
+
+        self.assertEqual(response.status_code, 400)  # noqa: PT009
+        self.assertIn("budget exhausted", response.json()["error"])  # noqa: PT009
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.current_spend, Decimal("0.00"))  # noqa: PT009
+        self.assertFalse(Redemption.objects.exists())  # noqa: PT009
+
+    def test_retried_batch_returns_stored_redemptions(self) -> None:
+        first = self._redeem_batch([self.cart.pk, self.delivery.pk])
+        retry = self._redeem_batch([self.delivery.pk, self.cart.pk])
+
+        self.assertEqual(retry.status_code, 200)  # noqa: PT009
+        self.assertEqual(retry.json(), first.json())  # noqa: PT009
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.current_spend, Decimal("10.00"))  # noqa: PT009
+        self.assertEqual(Redemption.objects.count(), 2)  # noqa: PT009
+
+        # Only part of the batch was stored under this order id.
+        other = make_campaign(name="Other")
+        response = self._redeem_batch([self.cart.pk, other.pk])
+        self.assertEqual(response.status_code, 400)  # noqa: PT009
+        self.assertIn("already been redeemed", response.json()["error"])  # noqa: PT009
+
+    @override_settings(CAMPAIGN_REDEEM_STRATEGY="sharded")
+    def test_sharded_campaign_is_debited_on_its_shards(self) -> None:
+        Campaign.objects.filter(pk=self.delivery.pk).update(
+            total_budget=Decimal("10.00"),
+            max_transactions_per_user_day=5,
+        )
+        budget_shards.provision(self.delivery.pk, shards=2)
+
+        statuses = [
+            self._redeem_batch([self.delivery.pk], order_id=f"order_{i}").status_code
+            for i in range(3)
+        ]
+
+        self.assertEqual(statuses, [200, 200, 400])  # noqa: PT009
+        self.assertEqual(  # noqa: PT009
+            sorted(self.delivery.budget_shards.values_list("spend", flat=True)),
+            [Decimal("5.00"), Decimal("5.00")],
+        )
+        budget_shards.rollup([self.delivery.pk])
+        self.delivery.refresh_from_db()
+        self.assertEqual(self.delivery.current_spend, Decimal("10.00"))  # noqa: PT009
+
+    def test_available_batch_prices_every_cart(self) -> None:
+        response = self.client.post(
+            "/api/campaigns/available-batch/",
+            {
+                "carts": [
+                    {"cart_total": "100.00", "delivery_fee": "8.00"},
+                    {"cart_total": "0.00", "delivery_fee": "3.00"},
+                ],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)  # noqa: PT009
+        first, second = response.json()
+        self.assertEqual(  # noqa: PT009
+            {d["id"]: d["amount"] for d in first["discounts"]},
+            {self.cart.pk: "10.00", self.delivery.pk: "5.00"},
+        )
+        self.assertEqual(  # noqa: PT009
+            {d["id"]: d["amount"] for d in second["discounts"]},
+            {self.delivery.pk: "3.00"},
+        )
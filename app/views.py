@@ -1,17 +1,42 @@
+import secrets
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.http import HttpRequest
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
 from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.response import Response
 
+from . import metrics
 from .models import Campaign
+from .pagination import CreatedAtKeysetPagination
 from .serializers import (
+    AvailableBatchRequestSerializer,
+    AvailableBatchResultSerializer,
     AvailableDiscountRequestSerializer,
+    CampaignBulkRequestSerializer,
+    CampaignIdsRequestSerializer,
+    CampaignListSerializer,
     CampaignSerializer,
+    CampaignStatsRequestSerializer,
+    CampaignStatsSerializer,
     DiscountResponseSerializer,
+    RedeemBatchRequestSerializer,
+    RedeemBatchResultSerializer,
     RedeemRequestSerializer,
+    RedemptionExportRequestSerializer,
+    validate_bulk_campaigns,
 )
+from .services import campaign_bulk, campaign_stats, redemption_export
 from .services.campaign_service import CampaignService
 from .throttles import RedeemRateThrottle
 
@@ -20,19 +45,55 @@ class CampaignViewSet(viewsets.ModelViewSet):
     """
     Management of Campaigns.
 
-    Standard CRUD is protected by IsAdminUser.
-    Public actions 'available' and 'redeem' are accessible to authenticated users.
+    Standard CRUD, the bulk actions, 'stats' and 'export' are protected by
+    IsAdminUser.
+    Public actions 'available', 'available_batch', 'redeem' and 'redeem_batch'
+    are accessible to authenticated users.
     """
 
     queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
     permission_classes = [permissions.IsAdminUser]  # noqa: RUF012
+    pagination_class = CreatedAtKeysetPagination
+    # Requests may be sampled by SamplingProfilerMiddleware.
+    profiled = True
 
     def get_permissions(self):  # noqa: ANN201
-        if self.action in ["available", "redeem"]:
+        if self.action in ["available", "available_batch", "redeem", "redeem_batch"]:
             return [permissions.IsAuthenticated()]
         return super().get_permissions()
 
+    def get_serializer_class(self):  # noqa: ANN201
+        if self.action == "list":
+            return CampaignListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):  # noqa: ANN201
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+
+        # Only load the columns and counts the client asked for.
+        selected = CampaignListSerializer.selected_fields(self.request)
+        if selected is not None:
+            columns = {f.name for f in Campaign._meta.concrete_fields} & selected  # noqa: SLF001
+            queryset = queryset.only("id", "created_at", *columns)
+        if selected is None or "target_user_count" in selected:
+            targets = Campaign.target_users.through.objects.filter(
+                campaign_id=OuterRef("pk"),
+            )
+            queryset = queryset.annotate(
+                target_user_count=Coalesce(
+                    Subquery(
+                        targets.values("campaign_id")
+                        .annotate(count=Count("*"))
+                        .values("count"),
+                    ),
+                    0,
+                ),
+            )
+        return queryset
+
     # ------------- AVAILABLE DISCOUNTS -----------------------------
 
     @extend_schema(
@@ -55,7 +116,10 @@ class CampaignViewSet(viewsets.ModelViewSet):
             description="List of discounts that can be applied",
         ),
         summary="Fetch applicable discounts",
-        description="Calculates potential discounts based on the provided cart context. Does not reserve funds.",
+        description=(
+            "Calculates potential discounts based on the provided cart context. Does "
+            "not reserve funds."
+        ),
     )
     @action(
         detail=False,
@@ -77,6 +141,48 @@ class CampaignViewSet(viewsets.ModelViewSet):
 
         return Response(DiscountResponseSerializer(results, many=True).data)
 
+    # ------------- PRICE SEVERAL CARTS -----------------------------
+
+    @extend_schema(
+        request=AvailableBatchRequestSerializer,
+        responses=OpenApiResponse(
+            response=AvailableBatchResultSerializer(many=True),
+            description="Applicable discounts for each cart, in request order",
+        ),
+        summary="Fetch applicable discounts for several carts",
+        description=(
+            "Resolves eligibility once and prices up to 50 (cart_total, delivery_fee) "
+            "pairs in one pass. Does not reserve funds."
+        ),
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="available-batch",
+    )
+    def available_batch(self, request: HttpRequest) -> Response:
+        input_serializer = AvailableBatchRequestSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        carts = [
+            (cart["cart_total"], cart.get("delivery_fee", 0))
+            for cart in input_serializer.validated_data["carts"]
+        ]
+
+        results = CampaignService.get_available_discounts_batch(
+            user=request.user,
+            carts=carts,
+        )
+
+        return Response(
+            AvailableBatchResultSerializer(
+                [
+                    {"cart_total": total, "delivery_fee": fee, "discounts": discounts}
+                    for (total, fee), discounts in zip(carts, results, strict=True)
+                ],
+                many=True,
+            ).data,
+        )
+
     # ------------- REDEEM DISCOUNT -----------------------------
 
     @extend_schema(
@@ -101,7 +207,10 @@ class CampaignViewSet(viewsets.ModelViewSet):
             ),
         },
         summary="Redeem a discount",
-        description="Atomic operation. Locks the campaign, checks limits, applies discount, and logs redemption.",
+        description=(
+            "Atomic operation. Locks the campaign, checks limits, applies discount, "
+            "and logs redemption."
+        ),
     )
     @action(
         detail=False,
@@ -128,3 +237,314 @@ class CampaignViewSet(viewsets.ModelViewSet):
             )
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # ------------- REDEEM SEVERAL DISCOUNTS -----------------------------
+
+    @extend_schema(
+        request=RedeemBatchRequestSerializer,
+        responses={
+            200: OpenApiResponse(
+                response={
+                    "type": "object",
+                    "properties": {
+                        "status": {"type": "string"},
+                        "redemptions": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "campaign_id": {"type": "integer"},
+                                    "discount_applied": {"type": "string"},
+                                },
+                            },
+                        },
+                    },
+                },
+                description="All discounts successfully redeemed",
+            ),
+            400: OpenApiResponse(
+                response={
+                    "type": "object",
+                    "properties": {"error": {"type": "string"}},
+                },
+                description="Invalid redemption attempt; nothing was redeemed",
+            ),
+        },
+        summary="Redeem several discounts for one order",
+        description=(
+            "Atomic operation. Locks all campaigns in ascending id order, "
+            "validates every one, then applies all discounts in a single "
+            "transaction, or none. Budgets are debited as "
+            "CAMPAIGN_REDEEM_STRATEGY does for a single redeem. Retrying an "
+            "order that was already redeemed returns the stored redemptions."
+        ),
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="redeem-batch",
+        throttle_classes=[RedeemRateThrottle],
+    )
+    def redeem_batch(self, request: HttpRequest) -> Response:
+        input_serializer = RedeemBatchRequestSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        data = input_serializer.validated_data
+
+        try:
+            redemptions = CampaignService.redeem_campaigns(
+                campaign_ids=data["campaign_ids"],
+                user=request.user,
+                order_id=data["order_id"],
+                cart_total=data["cart_total"],
+                delivery_fee=data.get("delivery_fee", 0),
+            )
+            return Response(
+                {
+                    "status": "success",
+                    "redemptions": RedeemBatchResultSerializer(
+                        redemptions,
+                        many=True,
+                    ).data,
+                },
+                status=status.HTTP_200_OK,
+            )
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # ------------- BULK MANAGEMENT -----------------------------
+
+    @extend_schema(
+        request=CampaignBulkRequestSerializer,
+        responses=CampaignListSerializer(many=True),
+        summary="Create or update many campaigns",
+        description=(
+            "POST creates every campaign in 'campaigns'; PATCH applies partial updates "
+            "to the campaigns named by each item's 'id'. All items are validated first "
+            "(including the model rules) and written in one transaction, or none are; "
+            "errors come back as one object per item. The campaign cache is refreshed "
+            "once."
+        ),
+    )
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request: HttpRequest) -> Response:
+        input_serializer = CampaignBulkRequestSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        items = input_serializer.validated_data["campaigns"]
+
+        if request.method == "POST":
+            campaigns = campaign_bulk.create_campaigns(validate_bulk_campaigns(items))
+            response_status = status.HTTP_201_CREATED
+        else:
+            campaigns = self._get_bulk_instances(items)
+            campaigns = campaign_bulk.update_campaigns(
+                campaigns,
+                validate_bulk_campaigns(items, campaigns),
+            )
+            response_status = status.HTTP_200_OK
+
+        return Response(
+            CampaignListSerializer(campaigns, many=True).data,
+            status=response_status,
+        )
+
+    def _get_bulk_instances(self, items: list) -> list:
+        """Load the campaigns named by the items' ids, in item order."""
+        ids = [item.get("id") for item in items]
+        if not all(isinstance(pk, int) for pk in ids) or len(set(ids)) != len(ids):
+            raise DRFValidationError(
+                {"campaigns": "Every item needs a unique integer 'id'."},
+            )
+        campaigns = Campaign.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in campaigns]
+        if missing:
+            msg = f"Unknown campaign(s): {', '.join(map(str, missing))}."
+            raise DRFValidationError({"campaigns": msg})
+        return [campaigns[pk] for pk in ids]
+
+    @extend_schema(
+        request=CampaignIdsRequestSerializer,
+        responses={
+            200: OpenApiResponse(
+                response={
+                    "type": "object",
+                    "properties": {"updated": {"type": "integer"}},
+                },
+                description="Number of campaigns whose state changed",
+            ),
+        },
+        summary="Activate many campaigns",
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-activate")
+    def bulk_activate(self, request: HttpRequest) -> Response:
+        return self._set_active(request, is_active=True)
+
+    @extend_schema(
+        request=CampaignIdsRequestSerializer,
+        responses={
+            200: OpenApiResponse(
+                response={
+                    "type": "object",
+                    "properties": {"updated": {"type": "integer"}},
+                },
+                description="Number of campaigns whose state changed",
+            ),
+        },
+        summary="Deactivate many campaigns",
+    )
+    @action(detail=False, methods=["post"], url_path="bulk-deactivate")
+    def bulk_deactivate(self, request: HttpRequest) -> Response:
+        return self._set_active(request, is_active=False)
+
+    def _set_active(self, request: HttpRequest, *, is_active: bool) -> Response:
+        input_serializer = CampaignIdsRequestSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        updated = campaign_bulk.set_active(
+            input_serializer.validated_data["ids"],
+            is_active=is_active,
+        )
+        return Response({"updated": updated})
+
+    # ------------- STATS -----------------------------
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                description="Start of the range (default: 24 hours before until)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="until",
+                description="End of the range (default: now)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="bucket",
+                description="Bucket size: hour (up to 31 days) or day (up to 366 days)",
+                required=False,
+                type=str,
+            ),
+        ],
+        responses=CampaignStatsSerializer,
+        summary="Redemption time series of a campaign",
+        description=(
+            "Redemptions, discount spent and approximate distinct users per hour or "
+            "day, from the incremental rollup (see rollup_campaign_stats); the latest "
+            "minute or so is not included yet."
+        ),
+    )
+    @action(detail=True, methods=["get"], url_path="stats")
+    def stats(self, request: HttpRequest, pk: str | None = None) -> Response:  # noqa: ARG002
+        campaign = self.get_object()
+        input_serializer = CampaignStatsRequestSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        params = input_serializer.validated_data
+
+        stats = campaign_stats.get_series(
+            campaign.pk,
+            params["since"],
+            params["until"],
+            params["bucket"],
+        )
+
+        return Response(
+            CampaignStatsSerializer(
+                {
+                    **stats,
+                    "campaign_id": campaign.pk,
+                    "bucket": params["bucket"],
+                    "rolled_up_at": campaign_stats.rolled_up_at(),
+                },
+            ).data,
+        )
+
+    # ------------- EXPORT -----------------------------
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="campaign",
+                description="Only this campaign id",
+                required=False,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="vendor",
+                description="Only campaigns of this vendor id",
+                required=False,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="since",
+                description="Redeemed at or after",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="until",
+                description="Redeemed before",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="output",
+                description="csv (default) or ndjson",
+                required=False,
+                type=str,
+            ),
+        ],
+        responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+        summary="Export redemptions",
+        description=(
+            "Streams matching redemptions, oldest first, without loading them into "
+            "memory."
+        ),
+    )
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request: HttpRequest) -> StreamingHttpResponse:
+        input_serializer = RedemptionExportRequestSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        params = input_serializer.validated_data
+        output = params["output"]
+
+        rows = redemption_export.get_rows(
+            campaign_id=params.get("campaign"),
+            vendor_id=params.get("vendor"),
+            since=params.get("since"),
+            until=params.get("until"),
+        )
+
+        response = StreamingHttpResponse(
+            redemption_export.STREAMS[output](rows),
+            content_type=redemption_export.CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="redemptions.{output}"'
+        return response
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Prometheus scrape endpoint for this process's metrics.
+
+    Served to staff users, and to scrapers that send
+    ``Authorization: Bearer <CAMPAIGN_METRICS_TOKEN>`` when that setting is
+    set. Everyone else gets a 403.
+    """
+    token = getattr(settings, "CAMPAIGN_METRICS_TOKEN", "")
+    scheme, _, offered = request.headers.get("Authorization", "").partition(" ")
+    if not (
+        request.user.is_staff
+        or (
+            token
+            and scheme == "Bearer"
+            and secrets.compare_digest(offered.encode(), token.encode())
+        )
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        metrics.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,6 +57,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.middleware.SamplingProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "campaign_management.urls"
@@ -95,6 +97,7 @@ DATABASES = {
 
 # Rest Framework
 REST_FRAMEWORK = {
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.UserRateThrottle",
     ],
@@ -115,6 +118,26 @@ CACHES = {
     },
 }
 
+# Campaigns
+# Budget protection used by CampaignService.redeem_campaign:
+#   "row_lock"          - SELECT ... FOR UPDATE on the campaign row
+#   "redis_reservation" - atomic reservation in Redis, Postgres written after
+#   "sharded"           - lock one CampaignBudgetShard row per redemption
+#   "conditional_update" - one guarded UPDATE, no SELECT ... FOR UPDATE
+#   "coalesced"         - group-commit concurrent redemptions of one campaign
+CAMPAIGN_REDEEM_STRATEGY = os.getenv("CAMPAIGN_REDEEM_STRATEGY", "row_lock")
+# How long the "coalesced" strategy waits to gather a batch (milliseconds).
+CAMPAIGN_COALESCE_WINDOW_MS = int(os.getenv("CAMPAIGN_COALESCE_WINDOW_MS", "5"))
+# Profile one in N campaign API requests with cProfile (0 = off; staff can
+# still ask for a profile with the "X-Campaign-Profile: 1" header).
+CAMPAIGN_PROFILE_SAMPLE_RATE = int(os.getenv("CAMPAIGN_PROFILE_SAMPLE_RATE", "0"))
+CAMPAIGN_PROFILE_DIR = os.getenv("CAMPAIGN_PROFILE_DIR", str(BASE_DIR / "profiles"))
+# Oldest profiles are deleted beyond this total size.
+CAMPAIGN_PROFILE_MAX_MB = int(os.getenv("CAMPAIGN_PROFILE_MAX_MB", "200"))
+# Bearer token a Prometheus scraper sends to read /metrics (staff users can
+# always read it; empty = staff only).
+CAMPAIGN_METRICS_TOKEN = os.getenv("CAMPAIGN_METRICS_TOKEN", "")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -151,7 +174,3 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = "static/"
-
-REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-}
@@ -22,7 +22,7 @@ from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework import routers
 
-from app.views import CampaignViewSet
+from app.views import CampaignViewSet, metrics_view
 
 router = routers.DefaultRouter()
 router.register(r"campaigns", CampaignViewSet, basename="campaigns")
@@ -30,6 +30,7 @@ router.register(r"campaigns", CampaignViewSet, basename="campaigns")
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
+    path("metrics", metrics_view, name="metrics"),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
         "api/docs/",